@@ -15,7 +15,11 @@ import sys
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 
 from config import Config
-from langgraph_workflow import PriorAuthWorkflow
+from langgraph_workflow import PriorAuthWorkflow, WORKFLOW_STEPS
+from utils.decision_store import get_decision_store
+from utils.model_registry import model_registry
+from utils.patient_fields import row_to_patient
+from utils.patient_store import get_patient_store, normalize_patient_frame, patient_overview
 
 # Configure Streamlit page
 st.set_page_config(**Config.STREAMLIT_CONFIG)
@@ -23,23 +27,22 @@ st.set_page_config(**Config.STREAMLIT_CONFIG)
 # Initialize session state
 if 'workflow' not in st.session_state:
     st.session_state.workflow = PriorAuthWorkflow()
-if 'processed_requests' not in st.session_state:
-    st.session_state.processed_requests = []
+if 'dashboard_page' not in st.session_state:
+    st.session_state.dashboard_page = 0
 
 def load_sample_data():
     """Load or generate sample patient data"""
     try:
-        if os.path.exists(Config.SYNTHETIC_PATIENTS_FILE):
-            df = pd.read_csv(Config.SYNTHETIC_PATIENTS_FILE)
-        else:
+        store = get_patient_store()
+        if not store.exists():
             # Create sample data if file doesn't exist
-            df = pd.DataFrame(Config.SAMPLE_PATIENTS)
             os.makedirs(Config.DATA_DIR, exist_ok=True)
-            df.to_csv(Config.SYNTHETIC_PATIENTS_FILE, index=False)
-        return df
+            pd.DataFrame(Config.SAMPLE_PATIENTS).to_csv(Config.SYNTHETIC_PATIENTS_FILE, index=False)
+        # Converted to a typed columnar file once; reruns reuse the in-memory table
+        return store.load()
     except Exception as e:
         st.error(f"Error loading data: {str(e)}")
-        return pd.DataFrame(Config.SAMPLE_PATIENTS)
+        return normalize_patient_frame(pd.DataFrame(Config.SAMPLE_PATIENTS))
 
 def display_patient_selector():
     """Display patient selection interface"""
@@ -84,7 +87,7 @@ def display_patient_selector():
         
         if not selected_patients.empty:
             selected_id = selected_patients.iloc[0]['patient_id']
-            patient_data = df[df['patient_id'] == selected_id].iloc[0].to_dict()
+            patient_data = row_to_patient(df[df['patient_id'] == selected_id].iloc[0].to_dict())
             return patient_data
     
     else:
@@ -173,31 +176,40 @@ def process_pa_request(patient_data):
             st.write(f"**Est. Cost:** ${patient_data.get('cost_per_month', 0):,}/month")
             st.write(f"**Allergies:** {patient_data.get('allergies', 'None')}")
     
-    # Process through workflow
+    # Process through workflow, advancing the progress bar as each node completes
     progress_bar, status_text = display_workflow_progress()
+    route = st.session_state.workflow.planned_route(patient_data)
+    status_text.text(WORKFLOW_STEPS[route[0]])
+    
+    completed_nodes = set()
+    node_timings = []
+    result = None
+    start_time = time.perf_counter()
+    
+    for node_name, node_seconds, state in st.session_state.workflow.stream_pa_request(patient_data):
+        node_timings.append({'node': node_name, 'seconds': round(node_seconds, 3)})
+        result = state
+        completed_nodes.add(node_name)
+        remaining = [node for node in route if node not in completed_nodes]
+        # A memo hit decides the request right after extraction
+        if remaining and not state.get('final_decision'):
+            progress_bar.progress((len(route) - len(remaining)) / len(route))
+            status_text.text(WORKFLOW_STEPS[remaining[0]])
+        else:
+            progress_bar.progress(1.0)
     
-    # Simulate processing steps
-    steps = [
-        ("Extracting medical information...", 0.25),
-        ("Checking clinical guidelines...", 0.50),
-        ("Assessing clinical and financial risks...", 0.75),
-        ("Making final decision...", 1.0)
-    ]
-    
-    for step_text, progress in steps:
-        status_text.text(step_text)
-        progress_bar.progress(progress)
-        time.sleep(1)  # Simulate processing time
-    
-    # Process the request
-    result = st.session_state.workflow.process_pa_request(patient_data)
+    total_seconds = time.perf_counter() - start_time
     
     # Store result
     result_with_timestamp = {
         **result,
         'processed_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
     }
-    st.session_state.processed_requests.append(result_with_timestamp)
+    get_decision_store().append(result_with_timestamp)
+    
+    with st.expander("Processing Time"):
+        st.write(f"**End-to-end:** {total_seconds:.3f} s")
+        st.dataframe(pd.DataFrame(node_timings), hide_index=True)
     
     status_text.text("Processing completed!")
     progress_bar.progress(1.0)
@@ -231,19 +243,23 @@ def display_decision_result(result):
         <p style="margin: 10px 0; font-size: 16px;">{reason}</p>
         <p style="margin: 0; color: #666;">
             <strong>Confidence:</strong> {confidence:.1%} | 
-            <strong>Decision Time:</strong> {final_decision.get('decision_date', 'Unknown')}
+            <strong>Decision Time:</strong> {final_decision.get('decision_date', 'Unknown')} |
+            <strong>Guidelines Version:</strong> {final_decision.get('guidelines_version', 'Unknown')}
         </p>
     </div>
     """, unsafe_allow_html=True)
     
-    # Detailed analysis
+    # Detailed analysis (fast-path emergency results get it from the deferred analysis instead)
+    analysis_deferred = result.get('deferred_analysis') is not None
     col1, col2 = st.columns(2)
     
     with col1:
         st.write("**Clinical Guidelines Compliance:**")
         guideline_compliance = result.get('guideline_compliance', {})
         
-        if guideline_compliance.get('overall_compliant', False):
+        if analysis_deferred and not guideline_compliance:
+            st.info("⏳ Analysis deferred (emergency fast path) - see the audit section below")
+        elif guideline_compliance.get('overall_compliant', False):
             st.success("✅ Compliant with clinical guidelines")
         else:
             st.error("❌ Non-compliant with clinical guidelines")
@@ -270,17 +286,20 @@ def display_decision_result(result):
         overall_risk = risk_assessment.get('overall_risk', 'Unknown')
         
         risk_color = Config.get_risk_color(overall_risk)
-        st.markdown(f"""
-        <div style="
-            background: {risk_color}22;
-            border: 1px solid {risk_color};
-            padding: 10px;
-            border-radius: 5px;
-            text-align: center;
-        ">
-            <strong style="color: {risk_color};">Overall Risk: {overall_risk}</strong>
-        </div>
-        """, unsafe_allow_html=True)
+        if analysis_deferred and not risk_assessment:
+            st.info("⏳ Analysis deferred (emergency fast path) - see the audit section below")
+        else:
+            st.markdown(f"""
+            <div style="
+                background: {risk_color}22;
+                border: 1px solid {risk_color};
+                padding: 10px;
+                border-radius: 5px;
+                text-align: center;
+            ">
+                <strong style="color: {risk_color};">Overall Risk: {overall_risk}</strong>
+            </div>
+            """, unsafe_allow_html=True)
         
         # Clinical risk details
         clinical_risk = risk_assessment.get('clinical_risk', {})
@@ -305,6 +324,22 @@ def display_decision_result(result):
         else:
             st.write("No BERT entities extracted.")
     
+    # Emergency requests are decided on the fast path; the full analysis follows for audit
+    deferred_analysis = result.get('deferred_analysis')
+    if deferred_analysis is not None:
+        with st.expander("Deferred Emergency Analysis (audit)"):
+            analysis = deferred_analysis.to_dict()
+            if analysis['status'] == 'completed':
+                st.write(f"**Completed:** {analysis['completed_at']}")
+                st.write(f"**Guidelines compliant:** {analysis['guideline_compliance'].get('overall_compliant', False)}")
+                st.write(f"**Overall risk:** {analysis['risk_assessment'].get('overall_risk', 'Unknown')}")
+                for step in analysis['reasoning_chain']:
+                    st.write(f"• {step}")
+            elif analysis['status'] == 'failed':
+                st.error(f"Deferred analysis failed: {analysis['error_message']}")
+            else:
+                st.info("Analysis still running - reopen this result to see it.")
+    
     # Recommendations
     recommendations = final_decision.get('recommendations', [])
     if recommendations:
@@ -318,34 +353,71 @@ def display_decision_result(result):
         for i, step in enumerate(reasoning_chain, 1):
             st.write(f"{i}. {step}")
 
+def display_node_performance():
+    """Chart rolling per-node latency percentiles recorded by the workflow profiler"""
+    node_stats = st.session_state.workflow.get_node_statistics()
+    if not node_stats:
+        return
+    
+    st.write("**Workflow Node Performance:**")
+    rows = []
+    for node_name, stats in node_stats.items():
+        for metric in ('wall_ms', 'cpu_ms', 'peak_alloc_kb'):
+            for pct, value in stats.get(metric, {}).items():
+                rows.append({'node': node_name, 'metric': metric, 'percentile': pct, 'value': value})
+    perf_df = pd.DataFrame(rows)
+    
+    wall_df = perf_df[perf_df['metric'] == 'wall_ms']
+    fig = px.bar(
+        wall_df,
+        x='node',
+        y='value',
+        color='percentile',
+        barmode='group',
+        title="Node Wall Time (ms)"
+    )
+    fig.update_layout(xaxis_title="Workflow Node", yaxis_title="Milliseconds")
+    st.plotly_chart(fig, use_container_width=True)
+    
+    with st.expander("Node Timing Details"):
+        st.dataframe(
+            perf_df.pivot_table(index=['node', 'metric'], columns='percentile', values='value').reset_index(),
+            use_container_width=True,
+            hide_index=True
+        )
+    
+    memo_stats = st.session_state.workflow.get_memo_statistics()
+    if memo_stats:
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Decision Memo Hit Rate", f"{memo_stats['hit_rate']:.1%}")
+        col2.metric("Memo Hits", memo_stats['hits'])
+        col3.metric("Memo Entries", memo_stats['entries'])
+
 def display_analytics_dashboard(df):
     """Display analytics dashboard"""
     st.subheader("📊 Analytics Dashboard")
     
-    if st.session_state.processed_requests:
-        # Convert processed requests to DataFrame
-        processed_df = pd.DataFrame([
-            {
-                'patient_id': req.get('patient_data', {}).get('patient_id', 'Unknown'),
-                'diagnosis': req.get('patient_data', {}).get('diagnosis', 'Unknown'),
-                'decision': req.get('final_decision', {}).get('decision', 'Unknown'),
-                'confidence': req.get('final_decision', {}).get('confidence', 0.0),
-                'risk_level': req.get('risk_assessment', {}).get('overall_risk', 'Unknown'),
-                'cost': req.get('patient_data', {}).get('cost_per_month', 0),
-                'processed_at': req.get('processed_at', '')
-            }
-            for req in st.session_state.processed_requests
-        ])
+    # Running aggregates kept by the store: reading them does not scan the decision history
+    store = get_decision_store()
+    aggregates = store.get_aggregates()
+    total_requests = aggregates['total']
+    
+    if total_requests:
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Processed Requests", f"{total_requests:,}")
+        col2.metric("Avg Monthly Cost", f"${aggregates['mean_cost']:,.0f}")
+        col3.metric("Avg Confidence", f"{aggregates['mean_confidence']:.1%}")
         
         col1, col2 = st.columns(2)
         
         with col1:
             # Decision distribution
-            decision_counts = processed_df['decision'].value_counts()
+            decision_counts = aggregates['decision']
             fig1 = px.pie(
-                values=decision_counts.values,
-                names=decision_counts.index,
+                values=list(decision_counts.values()),
+                names=list(decision_counts.keys()),
                 title="Decision Distribution",
+                color=list(decision_counts.keys()),
                 color_discrete_map={
                     'APPROVED': Config.COLORS['success'],
                     'DENIED': Config.COLORS['danger'],
@@ -356,12 +428,13 @@ def display_analytics_dashboard(df):
             st.plotly_chart(fig1, use_container_width=True)
         
         with col2:
-            # Cost distribution
-            fig2 = px.histogram(
-                processed_df,
-                x='cost',
+            # Cost distribution in fixed-width bins
+            width = aggregates['cost_bin_width']
+            cost_bins = aggregates['cost_bin']
+            fig2 = px.bar(
+                x=[f"${low:,.0f}-${low + width:,.0f}" for low in cost_bins],
+                y=list(cost_bins.values()),
                 title="Cost Distribution",
-                nbins=10,
                 color_discrete_sequence=[Config.COLORS['primary']]
             )
             fig2.update_layout(
@@ -370,32 +443,86 @@ def display_analytics_dashboard(df):
             )
             st.plotly_chart(fig2, use_container_width=True)
         
-        # Detailed results table
-        st.write("**Processed Requests:**")
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            # Confidence distribution
+            width = aggregates['confidence_bin_width']
+            confidence_bins = aggregates['confidence_bin']
+            fig3 = px.bar(
+                x=[f"{low:.0%}-{low + width:.0%}" for low in confidence_bins],
+                y=list(confidence_bins.values()),
+                title="Confidence Distribution",
+                color_discrete_sequence=[Config.COLORS['info']]
+            )
+            fig3.update_layout(
+                xaxis_title="Decision Confidence",
+                yaxis_title="Number of Requests"
+            )
+            st.plotly_chart(fig3, use_container_width=True)
+        
+        with col2:
+            # Risk distribution
+            risk_counts = aggregates['risk_level']
+            fig4 = px.bar(
+                x=list(risk_counts.keys()),
+                y=list(risk_counts.values()),
+                title="Risk Distribution",
+                color=list(risk_counts.keys()),
+                color_discrete_map={level: Config.get_risk_color(level) for level in risk_counts}
+            )
+            fig4.update_layout(
+                xaxis_title="Overall Risk",
+                yaxis_title="Number of Requests",
+                showlegend=False
+            )
+            st.plotly_chart(fig4, use_container_width=True)
+        
+        # Requests per diagnosis
+        diagnosis_df = pd.DataFrame(
+            sorted(aggregates['diagnosis'].items(), key=lambda item: item[1], reverse=True),
+            columns=['diagnosis', 'requests']
+        )
+        st.write("**Requests by Diagnosis:**")
+        st.dataframe(diagnosis_df, use_container_width=True, hide_index=True)
+        
+        # Detailed results table, one page at a time
+        page_size = Config.DASHBOARD_PAGE_SIZE
+        page_count = (total_requests + page_size - 1) // page_size
+        page = st.number_input("Page", min_value=1, max_value=page_count,
+                               value=min(st.session_state.dashboard_page + 1, page_count), step=1) - 1
+        st.session_state.dashboard_page = page
+        processed_df = pd.DataFrame(store.fetch_page(page, page_size))[
+            ['patient_id', 'diagnosis', 'decision', 'confidence', 'risk_level', 'cost', 'processed_at']
+        ]
         st.dataframe(processed_df, use_container_width=True)
     
     else:
         st.info("No requests processed yet. Process some prior authorization requests to see analytics.")
     
+    # Workflow node performance
+    display_node_performance()
+    
     # Sample data analytics
     st.write("**Sample Data Overview:**")
     
+    # Computed once per loaded table rather than on every rerun
+    patient_store = get_patient_store()
+    overview = patient_store.overview() if patient_store.load() is df else patient_overview(df)
+    
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        st.metric("Total Patients", len(df))
+        st.metric("Total Patients", overview['total_patients'])
     
     with col2:
-        avg_age = df['age'].mean() if 'age' in df.columns else 0
-        st.metric("Average Age", f"{avg_age:.1f}")
+        st.metric("Average Age", f"{overview['average_age']:.1f}")
     
     with col3:
-        avg_cost = df['cost_per_month'].mean() if 'cost_per_month' in df.columns else 0
-        st.metric("Avg Monthly Cost", f"${avg_cost:,.0f}")
+        st.metric("Avg Monthly Cost", f"${overview['average_cost']:,.0f}")
     
     with col4:
-        urgent_count = len(df[df['urgency'] == 'Urgent']) if 'urgency' in df.columns else 0
-        st.metric("Urgent Cases", urgent_count)
+        st.metric("Urgent Cases", overview['urgent_count'])
 
 def main():
     """Main application function"""
@@ -458,7 +585,8 @@ def main():
                 "App Version": Config.APP_VERSION,
                 "Processing Time Target": f"{Config.PERFORMANCE_TARGETS['processing_time_seconds']} seconds",
                 "Accuracy Target": f"{Config.PERFORMANCE_TARGETS['accuracy_threshold']:.1%}",
-                "Sample Patients": len(Config.SAMPLE_PATIENTS)
+                "Sample Patients": len(Config.SAMPLE_PATIENTS),
+                "Model Registry": model_registry.get_stats()
             })
 
 if __name__ == "__main__":
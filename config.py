@@ -19,11 +19,57 @@ class Config:
     SYNTHETIC_PATIENTS_FILE = os.path.join(DATA_DIR, "synthetic_patients.csv")
     PA_GUIDELINES_FILE = os.path.join(DATA_DIR, "pa_guidelines.json")
     DRUG_FORMULARY_FILE = os.path.join(DATA_DIR, "drug_formulary.csv")
+    DECISION_STORE_FILE = os.path.join(DATA_DIR, "decisions.sqlite")
     
     # Workflow Settings
     MAX_PROCESSING_TIME = 300  # seconds
     DEFAULT_CONFIDENCE_THRESHOLD = 0.7
-    EMERGENCY_OVERRIDE_ENABLED = True
+    EMERGENCY_OVERRIDE_ENABLED = True  # route Emergency requests through the fast path
+    EMERGENCY_LATENCY_BUDGET_MS = 50  # fast-path decisions slower than this are logged (not cut short)
+    DEFERRED_ANALYSIS_WORKERS = 2  # threads running the full analysis of fast-pathed requests
+    DEFERRED_ANALYSIS_MAX_PENDING = 500  # queued analyses beyond this are skipped
+    
+    GUIDELINES_RELOAD_INTERVAL = 5  # seconds between guideline file change checks
+    
+    # Decision Memo Settings
+    DECISION_MEMO_ENABLED = os.getenv("DECISION_MEMO_ENABLED", "true").lower() == "true"
+    DECISION_MEMO_MAX_ENTRIES = 10000
+    DECISION_MEMO_TTL_SECONDS = 3600  # memoized rule outcomes expire after an hour
+    
+    # NER Settings
+    NER_MODEL_NAME = "d4data/biomedical-ner-all"
+    NER_BACKEND = os.getenv("NER_BACKEND", "torch")  # torch, quantized or onnx
+    ONNX_EXPORT_DIR = os.path.join(DATA_DIR, "onnx")  # models exported once for the onnx backend
+    
+    # NER Cache Settings
+    NER_CACHE_MAX_ENTRIES = 10000
+    NER_CACHE_DISK_ENABLED = os.getenv("NER_CACHE_DISK_ENABLED", "false").lower() == "true"
+    NER_CACHE_DB_FILE = os.path.join(DATA_DIR, "ner_cache.sqlite")
+    NER_CACHE_MAX_DISK_BYTES = 256 * 1024 * 1024
+    
+    # Profiling Settings
+    PROFILE_WINDOW_SIZE = 1000  # node runs kept per node for p50/p95/p99
+    PROFILE_TRACK_MEMORY = os.getenv("PROFILE_TRACK_MEMORY", "false").lower() == "true"
+    
+    # Decision Store Settings
+    DECISION_STORE_BATCH_SIZE = 100  # buffered decisions written per transaction
+    DECISION_STORE_FLUSH_SECONDS = 2.0  # flush a partial batch after this long
+    DASHBOARD_PAGE_SIZE = 50  # rows per page in the processed requests table
+    DASHBOARD_COST_BIN_WIDTH = 250  # dollars per cost histogram bin
+    DASHBOARD_CONFIDENCE_BIN_WIDTH = 0.1
+    
+    # Batch Processing Settings
+    BATCH_WORKERS = 4
+    BATCH_CHUNK_SIZE = 1000  # rows read from the patient file at a time
+    BATCH_REPORT_EVERY = 100  # print throughput every N requests
+    
+    # Async Processing Settings
+    ASYNC_MAX_CONCURRENCY = 32  # requests in flight per event loop
+    ASYNC_CPU_WORKERS = 4  # threads running the CPU-heavy extraction node
+    
+    # Synthetic Data Settings
+    SYNTHETIC_PATIENT_COUNT = 1000  # rows DataLoader generates when no patient file exists
+    SYNTHETIC_CHUNK_SIZE = 100000  # rows sampled and written at a time
     
     # UI Settings
     STREAMLIT_CONFIG = {
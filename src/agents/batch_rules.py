@@ -0,0 +1,222 @@
+from typing import Dict, List, Any, Optional
+import numpy as np
+import pandas as pd
+
+from agents.guideline_index import GuidelineSnapshot
+from agents.guidelines_checker import GuidelinesCheckerAgent
+from utils.patient_fields import PATIENT_CSV_OPTIONS, normalize_names, parse_previous_treatments
+
+class BatchRuleEvaluator:
+    """Columnar version of the guidelines, risk and decision rules
+
+    Applies the same rules as GuidelinesCheckerAgent, RiskAssessorAgent and
+    DecisionMakerAgent to a whole DataFrame of patient rows at once. Missing
+    cells take the same defaults the per-request agents use.
+    """
+
+    # Same thresholds as RiskAssessorAgent / DecisionMakerAgent
+    TIER_MULTIPLIER = {'Tier 1': 1, 'Tier 2': 1.5, 'Tier 3': 2, 'Tier 4': 3}
+    AUTO_APPROVE_MAX_COST = 2000
+
+    def __init__(self, guidelines_checker: Optional[GuidelinesCheckerAgent] = None):
+        self.guidelines_checker = guidelines_checker or GuidelinesCheckerAgent()
+        self.snapshot = None
+        self.refresh()
+
+    def _compile_guidelines(self, snapshot: GuidelineSnapshot):
+        """Turn the compiled guideline index into tables for vectorized membership tests"""
+        self.snapshot = snapshot
+        self.index = index = snapshot.index
+        self.formulary = snapshot.formulary
+        self.step_required_diagnoses = [
+            diagnosis for diagnosis, rule in index.rules.items() if rule.step_therapy_required
+        ]
+        self.first_line_pairs = pd.MultiIndex.from_tuples(
+            [(diagnosis, med) for diagnosis, rule in index.rules.items() for med in rule.first_line]
+            or [("", "")]
+        )
+        self.second_line_pairs = pd.MultiIndex.from_tuples(
+            [(diagnosis, med) for diagnosis, rule in index.rules.items() for med in rule.second_line]
+            or [("", "")]
+        )
+        self.first_line_reason = {
+            diagnosis: f"Must try first-line therapy: {', '.join(rule.first_line_names)}"
+            for diagnosis, rule in index.rules.items()
+        }
+        self.max_cost_per_month = {
+            diagnosis: rule.max_cost_per_month
+            for diagnosis, rule in index.rules.items() if rule.max_cost_per_month is not None
+        }
+        self.max_cost_tier_4 = index.general_rules.get("max_cost_tier_4", 3000)
+
+    def refresh(self):
+        """Re-compile the tables if a new guideline/formulary snapshot was installed"""
+        snapshot = self.guidelines_checker.store.current()
+        if snapshot is not self.snapshot:
+            self._compile_guidelines(snapshot)
+
+    @staticmethod
+    def _column(df: pd.DataFrame, name: str, default: Any) -> pd.Series:
+        """Column with missing values replaced by the agents' default"""
+        if name not in df.columns:
+            return pd.Series(default, index=df.index)
+        return df[name].where(df[name].notna(), default)
+
+    def evaluate(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Evaluate every rule for every row and return one result row per input row"""
+        self.refresh()
+        diagnosis = normalize_names(self._column(df, 'diagnosis', ''))
+        medication = normalize_names(self._column(df, 'requested_medication', ''))
+        tier = self._column(df, 'insurance_tier', '').astype(str)
+        urgency = self._column(df, 'urgency', 'Routine').astype(str)
+        allergies = self._column(df, 'allergies', 'None').astype(str)
+        prior_auth = self._column(df, 'prior_auth_history', 'None').astype(str)
+        age = pd.to_numeric(self._column(df, 'age', 0), errors='coerce').fillna(0).to_numpy()
+        cost = pd.to_numeric(self._column(df, 'cost_per_month', 0), errors='coerce').fillna(0).to_numpy()
+
+        # Step therapy: second-line request without any first-line drug tried
+        step_required = diagnosis.isin(self.step_required_diagnoses).to_numpy()
+        is_second_line = pd.MultiIndex.from_arrays([diagnosis, medication]).isin(self.second_line_pairs)
+
+        if 'previous_treatments' in df.columns:
+            treatments = df['previous_treatments'].map(parse_previous_treatments).explode().dropna()
+        else:
+            treatments = pd.Series([], dtype=object)
+        tried = pd.MultiIndex.from_arrays([
+            diagnosis.loc[treatments.index].to_numpy(), normalize_names(treatments).to_numpy()
+        ]).isin(self.first_line_pairs)
+        first_line_tried = (
+            pd.Series(tried, index=treatments.index).groupby(level=0).any()
+            .reindex(df.index, fill_value=False).to_numpy()
+        )
+        step_compliant = ~(step_required & is_second_line & ~first_line_tried)
+
+        # Formulary fallback when a row carries no cost or tier
+        formulary = self.formulary.lookup_many(self._column(df, 'requested_medication', ''))
+        found = formulary['found'].to_numpy()
+        resolved_cost = np.where((cost == 0) & found, formulary['cost'].to_numpy(), cost)
+        resolved_tier = np.where((tier.to_numpy() == '') & found, formulary['tier'].to_numpy(), tier.to_numpy())
+
+        # Cost limits: global tier-4 cap and per-diagnosis monthly cap
+        diagnosis_max = diagnosis.map(self.max_cost_per_month).astype(float).to_numpy()
+        cost_compliant = (
+            ~((resolved_tier == 'Tier 4') & (resolved_cost > self.max_cost_tier_4))
+            & ~(resolved_cost > np.nan_to_num(diagnosis_max, nan=np.inf))
+        )
+        overall_compliant = step_compliant & cost_compliant
+
+        # Clinical risk
+        urgency_values = urgency.to_numpy()
+        clinical_score = (
+            np.where(age >= 65, 2, 0)
+            + np.where(np.isin(urgency_values, ['Emergency', 'Urgent']), 3, 0)
+            + np.where(~allergies.isin(['None', 'NKDA']).to_numpy(), 1, 0)
+            + np.where(prior_auth.to_numpy() == 'Denied', 2, 0)
+        )
+        clinical_level = np.select([clinical_score >= 5, clinical_score >= 3], ['High', 'Moderate'], 'Low')
+
+        # Financial risk
+        financial_risk = np.select([resolved_cost > 2000, resolved_cost > 500], ['High', 'Moderate'], 'Low')
+        adjusted_cost = resolved_cost * pd.Series(resolved_tier).map(self.TIER_MULTIPLIER).fillna(1).to_numpy()
+
+        overall_risk = np.select(
+            [
+                (clinical_level == 'High') | (financial_risk == 'High'),
+                (clinical_level == 'Moderate') | (financial_risk == 'Moderate')
+            ],
+            ['High', 'Moderate'],
+            'Low'
+        )
+
+        # Final decision, in the same precedence order as DecisionMakerAgent
+        conditions = [
+            urgency_values == 'Emergency',
+            overall_compliant & (overall_risk != 'High') & (cost <= self.AUTO_APPROVE_MAX_COST),
+            overall_compliant & (overall_risk == 'High'),
+            ~overall_compliant & (urgency_values == 'Urgent'),
+            ~overall_compliant
+        ]
+        decision = np.select(
+            conditions,
+            ['APPROVED', 'APPROVED', 'APPROVED_WITH_CONDITIONS', 'PENDING_REVIEW', 'DENIED'],
+            'PENDING_REVIEW'
+        )
+        confidence = np.select(conditions, [0.95, 0.90, 0.75, 0.60, 0.85], 0.50)
+
+        step_reason = np.where(
+            step_compliant,
+            np.where(step_required, "Step therapy requirements met", "Step therapy not required"),
+            diagnosis.map(self.first_line_reason).fillna('').to_numpy()
+        )
+
+        return pd.DataFrame({
+            'patient_id': self._column(df, 'patient_id', '').to_numpy(),
+            'step_therapy_compliant': step_compliant,
+            'step_therapy_reason': step_reason,
+            'cost_compliant': cost_compliant,
+            'generic_available': formulary['generic_available'].to_numpy(),
+            'overall_compliant': overall_compliant,
+            'clinical_risk_score': clinical_score,
+            'clinical_risk_level': clinical_level,
+            'financial_risk': financial_risk,
+            'adjusted_cost': adjusted_cost,
+            'overall_risk': overall_risk,
+            'decision': decision,
+            'confidence': confidence,
+            'guidelines_version': self.snapshot.version
+        }, index=df.index)
+
+    def compare_with_agents(self, df: pd.DataFrame) -> List[Dict]:
+        """Run the per-request agents row by row and report rows that disagree"""
+        from agents.medical_extractor import MedicalExtractorAgent
+        from agents.risk_assessor import RiskAssessorAgent
+        from agents.decision_maker import DecisionMakerAgent
+
+        extractor = MedicalExtractorAgent()
+        risk_assessor = RiskAssessorAgent()
+        decision_maker = DecisionMakerAgent()
+        vectorized = self.evaluate(df)
+
+        mismatches = []
+        for (index, row), (_, expected) in zip(df.iterrows(), vectorized.iterrows()):
+            patient = {k: v for k, v in row.items() if not (isinstance(v, float) and pd.isna(v))}
+            if 'previous_treatments' in patient:
+                patient['previous_treatments'] = parse_previous_treatments(patient['previous_treatments'])
+            # Structured fields only; NER does not feed any of these rules
+            evidence = extractor._build_extracted_info(patient)
+            compliance = self.guidelines_checker.check(evidence)
+            risk = risk_assessor.assess(evidence, compliance.guidelines_version)
+            decision = decision_maker.decide(compliance, risk, evidence, compliance.guidelines_version)
+
+            actual = {
+                'overall_compliant': compliance.overall_compliant,
+                'clinical_risk_score': risk.clinical_risk.clinical_risk_score,
+                'clinical_risk_level': risk.clinical_risk.risk_level,
+                'overall_risk': risk.overall_risk,
+                'decision': decision.decision,
+                'confidence': decision.confidence
+            }
+            diffs = {k: (v, expected[k]) for k, v in actual.items() if v != expected[k]}
+            if diffs:
+                mismatches.append({'index': index, 'differences': diffs})
+
+        return mismatches
+
+
+# Parity check against the per-request agents (run from src/: python -m agents.batch_rules [patients.csv])
+if __name__ == "__main__":
+    import os
+    import sys
+
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+    from config import Config
+
+    path = sys.argv[1] if len(sys.argv) > 1 else Config.SYNTHETIC_PATIENTS_FILE
+    patients_df = pd.read_csv(path, **PATIENT_CSV_OPTIONS) if os.path.exists(path) else pd.DataFrame(Config.SAMPLE_PATIENTS)
+
+    evaluator = BatchRuleEvaluator()
+    mismatches = evaluator.compare_with_agents(patients_df)
+    print(f"Compared {len(patients_df)} rows, {len(mismatches)} mismatches")
+    for mismatch in mismatches[:10]:
+        print(mismatch)
+    sys.exit(1 if mismatches else 0)
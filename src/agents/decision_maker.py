@@ -1,5 +1,11 @@
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 from datetime import datetime, timedelta
+from utils.pa_records import ExtractedEvidence, FinalDecision, GuidelineCompliance, RiskAssessment
+
+# Stand-in for a request whose extraction failed
+_UNKNOWN_EVIDENCE = ExtractedEvidence(primary_diagnosis='Unknown', medication='Unknown', urgency='Unknown')
+# Supporting-evidence risk level of a decision whose analysis runs after it
+DEFERRED_RISK_LEVEL = 'Deferred'
 
 class DecisionMakerAgent:
     """Make final prior authorization decisions based on all available information"""
@@ -17,14 +23,15 @@ class DecisionMakerAgent:
             }
         }
     
-    def make_decision(self, guideline_compliance: Dict, risk_assessment: Dict, extracted_info: Dict) -> Dict:
+    def make_decision(self, guideline_compliance: Optional[GuidelineCompliance],
+                      risk_assessment: Optional[RiskAssessment], extracted_info: ExtractedEvidence) -> Dict:
         """Make final PA decision based on all available information"""
         
-        # Get key decision factors
-        is_compliant = guideline_compliance.get('overall_compliant', False)
-        overall_risk = risk_assessment.get('overall_risk', 'High')
-        urgency = extracted_info.get('current_request', {}).get('urgency', 'Routine')
-        estimated_cost = extracted_info.get('insurance_info', {}).get('estimated_cost', 0)
+        # Get key decision factors (a missing section counts against the request)
+        is_compliant = guideline_compliance is not None and guideline_compliance.overall_compliant
+        overall_risk = risk_assessment.overall_risk if risk_assessment is not None else 'High'
+        urgency = extracted_info.urgency
+        estimated_cost = extracted_info.estimated_cost
         
         # Decision logic
         if urgency == 'Emergency':
@@ -59,7 +66,8 @@ class DecisionMakerAgent:
             'decision_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         }
     
-    def generate_recommendations(self, decision_data: Dict, extracted_info: Dict, guideline_compliance: Dict) -> List[str]:
+    def generate_recommendations(self, decision_data: Dict, extracted_info: ExtractedEvidence,
+                                 guideline_compliance: Optional[GuidelineCompliance]) -> List[str]:
         """Generate actionable recommendations based on decision"""
         recommendations = []
         
@@ -67,10 +75,10 @@ class DecisionMakerAgent:
         
         if decision == 'DENIED':
             # Suggest alternatives
-            if not guideline_compliance.get('step_therapy', {}).get('compliant', True):
+            if guideline_compliance is not None and not guideline_compliance.step_therapy.compliant:
                 recommendations.append("Try first-line therapy as recommended in clinical guidelines")
             
-            if not guideline_compliance.get('cost_limits', {}).get('compliant', True):
+            if guideline_compliance is not None and not guideline_compliance.cost_limits.compliant:
                 recommendations.append("Consider generic alternatives or patient assistance programs")
         
         elif decision == 'APPROVED_WITH_CONDITIONS':
@@ -83,11 +91,16 @@ class DecisionMakerAgent:
         
         return recommendations
     
-    def process(self, state: Dict) -> Dict:
-        """Process final decision making"""
-        guideline_compliance = state.get('guideline_compliance', {})
-        risk_assessment = state.get('risk_assessment', {})
-        extracted_info = state.get('extracted_evidence', {})
+    def decide(self, guideline_compliance: Optional[GuidelineCompliance], risk_assessment: Optional[RiskAssessment],
+               extracted_info: Optional[ExtractedEvidence], guidelines_version: str = '',
+               analysis_deferred: bool = False) -> FinalDecision:
+        """Final decision with recommendations and supporting evidence
+
+        Compliance is None when the guidelines were not checked; with
+        ``analysis_deferred`` the risk level is Deferred rather than Unknown.
+        """
+        if extracted_info is None:
+            extracted_info = _UNKNOWN_EVIDENCE
         
         # Make decision
         decision_data = self.make_decision(guideline_compliance, risk_assessment, extracted_info)
@@ -95,21 +108,41 @@ class DecisionMakerAgent:
         # Generate recommendations
         recommendations = self.generate_recommendations(decision_data, extracted_info, guideline_compliance)
         
-        final_decision = {
-            **decision_data,
-            'recommendations': recommendations,
-            'supporting_evidence': {
-                'guideline_compliant': guideline_compliance.get('overall_compliant', False),
-                'risk_level': risk_assessment.get('overall_risk', 'Unknown'),
-                'key_factors': [
-                    f"Diagnosis: {extracted_info.get('medical_history', {}).get('primary_diagnosis', 'Unknown')}",
-                    f"Medication: {extracted_info.get('current_request', {}).get('medication', 'Unknown')}",
-                    f"Urgency: {extracted_info.get('current_request', {}).get('urgency', 'Unknown')}"
-                ]
-            }
-        }
+        guideline_compliant = guideline_compliance.overall_compliant if guideline_compliance is not None else None
+        if analysis_deferred:
+            risk_level = DEFERRED_RISK_LEVEL
+        else:
+            risk_level = risk_assessment.overall_risk if risk_assessment is not None else 'Unknown'
+        
+        return FinalDecision(
+            decision=decision_data['decision'],
+            reason=decision_data['reason'],
+            confidence=decision_data['confidence'],
+            decision_date=decision_data['decision_date'],
+            recommendations=recommendations,
+            guidelines_version=guidelines_version,
+            guideline_compliant=guideline_compliant,
+            risk_level=risk_level,
+            key_factors=[
+                f"Diagnosis: {extracted_info.primary_diagnosis}",
+                f"Medication: {extracted_info.medication}",
+                f"Urgency: {extracted_info.urgency}"
+            ]
+        )
+    
+    @staticmethod
+    def describe(final_decision: FinalDecision) -> str:
+        """Reasoning chain entry for a decision"""
+        return f"Final decision: {final_decision.decision} - {final_decision.reason}"
+    
+    def process(self, state: Dict) -> Dict:
+        """Process final decision making"""
+        final_decision = self.decide(
+            state.get('guideline_compliance'), state.get('risk_assessment'),
+            state.get('extracted_evidence'), state.get('guidelines_version', '')
+        )
         
         state['final_decision'] = final_decision
-        state['reasoning_chain'].append(f"Final decision: {decision_data['decision']} - {decision_data['reason']}")
+        state['reasoning_chain'].append(self.describe(final_decision))
         
-        return state
\ No newline at end of file
+        return state
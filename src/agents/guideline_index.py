@@ -0,0 +1,233 @@
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from collections import OrderedDict
+from datetime import datetime
+import json
+import logging
+import threading
+import time
+from config import Config
+from utils.formulary import FormularyService
+from utils.patient_fields import normalize_name
+from utils.versioned_file import load_if_changed
+
+logger = logging.getLogger(__name__)
+
+# Raised while parsing or compiling a malformed guideline JSON or formulary CSV
+# (JSONDecodeError and pandas parser errors are ValueErrors)
+PARSE_ERRORS = (ValueError, KeyError, TypeError, AttributeError, UnicodeDecodeError)
+
+# Fallback guidelines if the guideline file is not found
+FALLBACK_GUIDELINES = {
+    "guidelines": {
+        "Rheumatoid Arthritis": {
+            "first_line": ["Methotrexate"],
+            "second_line": ["Adalimumab", "Etanercept"],
+            "step_therapy_required": True,
+            "duration_limit": "6 months initial"
+        },
+        "Type 2 Diabetes": {
+            "first_line": ["Metformin"],
+            "second_line": ["Insulin", "Semaglutide"],
+            "step_therapy_required": True,
+            "duration_limit": "12 months"
+        }
+    },
+    "general_rules": {
+        "max_cost_tier_4": 3000,
+        "emergency_override": True
+    }
+}
+
+class DiagnosisRule(NamedTuple):
+    """Compiled step-therapy rule for one diagnosis"""
+    diagnosis: str
+    first_line: frozenset
+    second_line: frozenset
+    first_line_names: Tuple[str, ...]
+    step_therapy_required: bool
+    max_cost_per_month: Optional[float]
+
+class GuidelineIndex:
+    """Guideline JSON compiled into hash lookups
+
+    Diagnoses and drugs are keyed by their normalized names, so every check is
+    a constant number of dict/frozenset lookups however many diagnoses and
+    drugs the guideline file holds.
+    """
+
+    def __init__(self, guidelines: Dict, version: str = "builtin"):
+        self.guidelines = guidelines
+        self.version = version
+        self.general_rules = guidelines.get("general_rules", {})
+        self.rules: Dict[str, DiagnosisRule] = {}
+        # normalized drug -> ((diagnosis, 'first_line' | 'second_line'), ...)
+        self.drug_lines: Dict[str, Tuple[Tuple[str, str], ...]] = {}
+
+        drug_lines: Dict[str, List[Tuple[str, str]]] = {}
+        for diagnosis, rule in guidelines.get("guidelines", {}).items():
+            first_line = rule.get("first_line", [])
+            second_line = rule.get("second_line", [])
+            self.rules[normalize_name(diagnosis)] = DiagnosisRule(
+                diagnosis=diagnosis,
+                first_line=frozenset(normalize_name(med) for med in first_line),
+                second_line=frozenset(normalize_name(med) for med in second_line),
+                first_line_names=tuple(first_line),
+                step_therapy_required=bool(rule.get("step_therapy_required", False)),
+                max_cost_per_month=rule.get("max_cost_per_month")
+            )
+            for line, meds in (("first_line", first_line), ("second_line", second_line)):
+                for med in meds:
+                    drug_lines.setdefault(normalize_name(med), []).append((diagnosis, line))
+
+        self.drug_lines = {drug: tuple(lines) for drug, lines in drug_lines.items()}
+
+    def rule_for(self, diagnosis: str) -> Optional[DiagnosisRule]:
+        """Compiled rule for a diagnosis, or None if it has no guideline"""
+        return self.rules.get(normalize_name(diagnosis))
+
+    def lines_for_drug(self, drug: str) -> Tuple[Tuple[str, str], ...]:
+        """Every (diagnosis, line) a drug appears in"""
+        return self.drug_lines.get(normalize_name(drug), ())
+
+def _build_index(raw: bytes, digest: str) -> GuidelineIndex:
+    return GuidelineIndex(json.loads(raw), version=digest[:12])
+
+def load_guideline_index(path: str) -> Optional[GuidelineIndex]:
+    """Return the compiled index for a guideline file, rebuilding only when it changed
+
+    Returns None if the file does not exist.
+    """
+    return load_if_changed(path, _build_index)
+
+class GuidelineSnapshot(NamedTuple):
+    """One immutable, versioned view of the guidelines and formulary"""
+    version: str
+    index: GuidelineIndex
+    formulary: FormularyService
+    loaded_at: str
+
+class GuidelineStore:
+    """Current guideline/formulary snapshot, swapped atomically when either file changes
+
+    Requests pin the snapshot version they started with and look it up again
+    with ``get(version)``, so a reload mid-request never mixes two policies.
+    File checks are throttled to ``check_interval`` seconds; a background
+    watcher thread can be started for processes that sit idle. A file that
+    is missing or fails to parse leaves the last good snapshot in place.
+    """
+
+    def __init__(self, path: str, formulary_path: Optional[str] = None,
+                 fallback: Optional[Dict] = None, check_interval: float = 5.0,
+                 history_size: int = 8):
+        self.path = path
+        self.formulary_path = formulary_path
+        self.fallback = fallback if fallback is not None else FALLBACK_GUIDELINES
+        self.check_interval = check_interval
+        self.history_size = history_size
+
+        self._lock = threading.Lock()
+        self._history: "OrderedDict[str, GuidelineSnapshot]" = OrderedDict()
+        self._current: Optional[GuidelineSnapshot] = None
+        self._last_check = 0.0
+        self._watcher: Optional[threading.Thread] = None
+        self._stop_watcher = threading.Event()
+        self.refresh(force=True)
+
+    def _install(self, index: GuidelineIndex, formulary: FormularyService):
+        snapshot = GuidelineSnapshot(
+            version=f"{index.version}-{formulary.version}" if self.formulary_path else index.version,
+            index=index,
+            formulary=formulary,
+            loaded_at=datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        )
+        self._history[snapshot.version] = snapshot
+        self._history.move_to_end(snapshot.version)
+        while len(self._history) > self.history_size:
+            self._history.popitem(last=False)
+        # Single reference assignment: readers see either the old or the new snapshot
+        self._current = snapshot
+
+    @staticmethod
+    def _load(loader, path: str):
+        """``loader(path)``, or None if the file is missing or malformed (e.g. caught mid-write)"""
+        try:
+            return loader(path)
+        except PARSE_ERRORS as e:
+            logger.error("Could not load %s, keeping the last good snapshot: %s", path, e)
+            return None
+
+    def refresh(self, force: bool = False) -> bool:
+        """Reload the files if they changed; returns True when a new snapshot was installed"""
+        now = time.monotonic()
+        if not force and now - self._last_check < self.check_interval:
+            return False
+
+        with self._lock:
+            self._last_check = now
+            current = self._current
+            index = self._load(load_guideline_index, self.path)
+            if index is None:
+                # Keep serving the last good snapshot if the file disappears or does not parse
+                index = current.index if current is not None else GuidelineIndex(self.fallback)
+            formulary = self._load(FormularyService.from_csv, self.formulary_path) if self.formulary_path else None
+            if formulary is None:
+                formulary = current.formulary if current is not None else FormularyService()
+            if current is not None and index is current.index and formulary is current.formulary:
+                return False
+            self._install(index, formulary)
+            return True
+
+    def current(self) -> GuidelineSnapshot:
+        """Latest snapshot (checks the file at most once per check_interval)"""
+        self.refresh()
+        return self._current
+
+    def get(self, version: Optional[str]) -> GuidelineSnapshot:
+        """Snapshot for a pinned version, falling back to the current one"""
+        if version:
+            snapshot = self._history.get(version)
+            if snapshot is not None:
+                return snapshot
+        return self.current()
+
+    def start_watcher(self, interval: Optional[float] = None):
+        """Poll the files from a daemon thread so idle workers stay current"""
+        if self._watcher is not None and self._watcher.is_alive():
+            return
+        interval = interval or self.check_interval
+        self._stop_watcher.clear()
+
+        def watch():
+            while not self._stop_watcher.wait(interval):
+                self.refresh(force=True)
+
+        self._watcher = threading.Thread(target=watch, name="guideline-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watcher(self):
+        """Stop the background watcher thread"""
+        self._stop_watcher.set()
+
+_stores: Dict[tuple, GuidelineStore] = {}
+_stores_lock = threading.Lock()
+
+def get_guideline_store(path: Optional[str] = None, formulary_path: Optional[str] = None) -> GuidelineStore:
+    """Process-wide store for a guideline file, shared by every agent and workflow
+
+    Defaults to Config.PA_GUIDELINES_FILE and Config.DRUG_FORMULARY_FILE.
+    """
+    path = path or Config.PA_GUIDELINES_FILE
+    formulary_path = formulary_path or Config.DRUG_FORMULARY_FILE
+    key = (path, formulary_path)
+    store = _stores.get(key)
+    if store is None:
+        with _stores_lock:
+            store = _stores.get(key)
+            if store is None:
+                store = GuidelineStore(
+                    path,
+                    formulary_path=formulary_path,
+                    check_interval=Config.GUIDELINES_RELOAD_INTERVAL
+                )
+                _stores[key] = store
+    return store
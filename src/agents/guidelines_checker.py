@@ -1,96 +1,110 @@
-from typing import Dict, List, Any
-import json
+from typing import Dict, List, Any, Optional
+from config import Config
+from agents.guideline_index import GuidelineIndex, get_guideline_store, normalize_name
+from utils.formulary import FormularyService
+from utils.pa_records import CheckResult, ExtractedEvidence, GuidelineCompliance
 
 class GuidelinesCheckerAgent:
     """Check medical requests against clinical guidelines and formulary rules"""
     
-    def __init__(self, guidelines_path: str = "data/pa_guidelines.json"):
-        self.guidelines = self.load_guidelines(guidelines_path)
+    def __init__(self, guidelines_path: Optional[str] = None):
+        self.guidelines_path = guidelines_path or Config.PA_GUIDELINES_FILE
+        # Shared, hot-reloadable snapshots of the guideline and formulary files
+        self.store = get_guideline_store(self.guidelines_path)
     
-    def load_guidelines(self, path: str) -> Dict:
-        """Load clinical guidelines from JSON file"""
-        try:
-            with open(path, 'r') as f:
-                return json.load(f)
-        except FileNotFoundError:
-            # Fallback guidelines if file not found
-            return {
-                "guidelines": {
-                    "Rheumatoid Arthritis": {
-                        "first_line": ["Methotrexate"],
-                        "second_line": ["Adalimumab", "Etanercept"],
-                        "step_therapy_required": True,
-                        "duration_limit": "6 months initial"
-                    },
-                    "Type 2 Diabetes": {
-                        "first_line": ["Metformin"],
-                        "second_line": ["Insulin", "Semaglutide"],
-                        "step_therapy_required": True,
-                        "duration_limit": "12 months"
-                    }
-                },
-                "general_rules": {
-                    "max_cost_tier_4": 3000,
-                    "emergency_override": True
-                }
-            }
+    @property
+    def index(self) -> GuidelineIndex:
+        """Compiled index of the current guideline snapshot"""
+        return self.store.current().index
     
-    def check_step_therapy(self, diagnosis: str, requested_med: str, previous_treatments: List[str]) -> Dict:
+    @property
+    def guidelines(self) -> Dict:
+        """Raw guideline JSON of the current snapshot"""
+        return self.index.guidelines
+    
+    @property
+    def version(self) -> str:
+        """Version id of the current guideline snapshot"""
+        return self.store.current().version
+    
+    def check_step_therapy(self, diagnosis: str, requested_med: str, previous_treatments: List[str],
+                           index: Optional[GuidelineIndex] = None) -> CheckResult:
         """Check if step therapy requirements are met"""
-        guideline = self.guidelines["guidelines"].get(diagnosis, {})
-        
-        if not guideline.get("step_therapy_required", False):
-            return {"compliant": True, "reason": "Step therapy not required"}
+        rule = (index or self.index).rule_for(diagnosis)
         
-        first_line = guideline.get("first_line", [])
-        second_line = guideline.get("second_line", [])
+        if rule is None or not rule.step_therapy_required:
+            return CheckResult(True, "Step therapy not required")
         
         # Check if requesting second-line without trying first-line
-        if requested_med in second_line:
-            first_line_tried = any(med in previous_treatments for med in first_line)
+        if normalize_name(requested_med) in rule.second_line:
+            first_line_tried = not rule.first_line.isdisjoint(
+                normalize_name(med) for med in previous_treatments
+            )
             if not first_line_tried:
-                return {
-                    "compliant": False,
-                    "reason": f"Must try first-line therapy: {', '.join(first_line)}"
-                }
+                return CheckResult(False, f"Must try first-line therapy: {', '.join(rule.first_line_names)}")
         
-        return {"compliant": True, "reason": "Step therapy requirements met"}
+        return CheckResult(True, "Step therapy requirements met")
     
-    def check_cost_limits(self, insurance_tier: str, estimated_cost: int) -> Dict:
-        """Check if medication cost exceeds tier limits"""
-        max_cost = self.guidelines["general_rules"].get("max_cost_tier_4", 3000)
+    def check_cost_limits(self, insurance_tier: str, estimated_cost: int,
+                          index: Optional[GuidelineIndex] = None, diagnosis: str = '',
+                          medication: str = '', formulary: Optional[FormularyService] = None) -> CheckResult:
+        """Check if medication cost exceeds the tier and per-diagnosis limits"""
+        index = index or self.index
+        if formulary is None:
+            formulary = self.store.current().formulary
+        
+        # Fall back to the formulary when the request carries no cost or tier
+        entry = formulary.lookup(medication) if medication else None
+        if entry:
+            estimated_cost = estimated_cost or entry['cost']
+            insurance_tier = insurance_tier or entry['tier']
+        
+        max_cost = index.general_rules.get("max_cost_tier_4", 3000)
         
         if insurance_tier == "Tier 4" and estimated_cost > max_cost:
-            return {
-                "compliant": False,
-                "reason": f"Cost ${estimated_cost} exceeds Tier 4 limit ${max_cost}"
-            }
+            return CheckResult(False, f"Cost ${estimated_cost} exceeds Tier 4 limit ${max_cost}")
+        
+        rule = index.rule_for(diagnosis) if diagnosis else None
+        if rule is not None and rule.max_cost_per_month is not None and estimated_cost > rule.max_cost_per_month:
+            return CheckResult(False, f"Cost ${estimated_cost} exceeds {rule.diagnosis} limit ${rule.max_cost_per_month}")
         
-        return {"compliant": True, "reason": "Cost within acceptable limits"}
+        return CheckResult(True, "Cost within acceptable limits")
     
-    def process(self, state: Dict) -> Dict:
-        """Process guidelines checking"""
-        extracted_info = state.get('extracted_evidence', {})
+    def check(self, extracted_info: Optional[ExtractedEvidence],
+              guidelines_version: Optional[str] = None) -> GuidelineCompliance:
+        """Check a request against one guideline snapshot (the current one by default)"""
+        # Use the snapshot the request was pinned to, so a reload mid-request can't mix policies
+        snapshot = self.store.get(guidelines_version)
+        if extracted_info is None:
+            extracted_info = ExtractedEvidence()
         
-        diagnosis = extracted_info.get('medical_history', {}).get('primary_diagnosis', '')
-        requested_med = extracted_info.get('current_request', {}).get('medication', '')
-        previous_treatments = extracted_info.get('medical_history', {}).get('previous_treatments', [])
-        insurance_tier = extracted_info.get('insurance_info', {}).get('tier', '')
-        estimated_cost = extracted_info.get('insurance_info', {}).get('estimated_cost', 0)
+        diagnosis = extracted_info.primary_diagnosis
+        requested_med = extracted_info.medication
         
         # Check step therapy
-        step_therapy_result = self.check_step_therapy(diagnosis, requested_med, previous_treatments)
+        step_therapy_result = self.check_step_therapy(
+            diagnosis, requested_med, extracted_info.previous_treatments, snapshot.index
+        )
         
         # Check cost limits
-        cost_result = self.check_cost_limits(insurance_tier, estimated_cost)
+        cost_result = self.check_cost_limits(
+            extracted_info.insurance_tier, extracted_info.estimated_cost, snapshot.index,
+            diagnosis=diagnosis, medication=requested_med, formulary=snapshot.formulary
+        )
         
-        guidelines_compliance = {
-            'step_therapy': step_therapy_result,
-            'cost_limits': cost_result,
-            'overall_compliant': step_therapy_result['compliant'] and cost_result['compliant']
-        }
+        return GuidelineCompliance(step_therapy_result, cost_result, snapshot.version)
+    
+    @staticmethod
+    def describe(compliance: GuidelineCompliance) -> str:
+        """Reasoning chain entry for a guidelines check"""
+        return f"Guidelines check: {'Compliant' if compliance.overall_compliant else 'Non-compliant'}"
+    
+    def process(self, state: Dict) -> Dict:
+        """Process guidelines checking"""
+        guidelines_compliance = self.check(state.get('extracted_evidence'), state.get('guidelines_version'))
         
+        state['guidelines_version'] = guidelines_compliance.guidelines_version
         state['guideline_compliance'] = guidelines_compliance
-        state['reasoning_chain'].append(f"Guidelines check: {'Compliant' if guidelines_compliance['overall_compliant'] else 'Non-compliant'}")
+        state['reasoning_chain'].append(self.describe(guidelines_compliance))
         
-        return state
\ No newline at end of file
+        return state
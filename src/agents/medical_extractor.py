@@ -1,17 +1,22 @@
-from typing import Dict, List, Any
-from transformers import pipeline
-import torch
+from typing import Dict, List, Any, Optional
+from config import Config
+from utils.model_registry import model_registry
+from utils.ner_cache import get_ner_cache, make_cache_key
+from utils.pa_records import ExtractedEvidence
+
+# Number of clinical notes sent through the NER model per forward pass
+DEFAULT_NER_BATCH_SIZE = 16
 
 class MedicalExtractorAgent:
     """Lightweight medical information extractor using rule-based NLP and BioMedicalNER"""
     
-    def __init__(self):
-        # Use a model fine-tuned for medical NER
-        self.ner_pipeline = pipeline(
-            "ner",
-            model="d4data/biomedical-ner-all",
-            aggregation_strategy="simple"
-        )
+    def __init__(self, backend: Optional[str] = None):
+        # Use a model fine-tuned for medical NER (loaded lazily, shared per process)
+        self.ner_model_name = Config.NER_MODEL_NAME
+        self.ner_backend = backend or Config.NER_BACKEND
+        # Quantized/ONNX outputs can differ slightly, so they get their own cache keys
+        self.ner_cache_model_id = f"{self.ner_model_name}:{self.ner_backend}"
+        self.ner_cache = get_ner_cache()
         self.medical_terms = {
             'conditions': [
                 'diabetes', 'hypertension', 'arthritis', 'asthma', 'copd',
@@ -27,49 +32,97 @@ class MedicalExtractorAgent:
             ]
         }
     
-    def extract_medical_info(self, patient_data: Dict) -> Dict:
+    @property
+    def ner_pipeline(self):
+        """Shared NER pipeline, loaded on first use"""
+        return model_registry.get_pipeline(
+            "ner",
+            model=self.ner_model_name,
+            backend=self.ner_backend,
+            aggregation_strategy="simple"
+        )
+    
+    def _run_ner(self, clinical_note: str) -> List[Dict]:
+        """Run NER on one note, serving repeats from the cache"""
+        key = make_cache_key(clinical_note, self.ner_cache_model_id)
+        entities = self.ner_cache.get(key)
+        if entities is None:
+            entities = self.ner_pipeline(clinical_note)
+            self.ner_cache.put(key, entities)
+        return entities
+    
+    def _build_extracted_info(self, patient_data: Dict) -> ExtractedEvidence:
+        """Structure the tabular patient fields before any NER is applied"""
+        return ExtractedEvidence.from_patient(patient_data)
+    
+    def _apply_entities(self, extracted_info: ExtractedEvidence, entities: List[Dict]) -> ExtractedEvidence:
+        """Merge BERT NER entities for one clinical note into the extracted info"""
+        diagnosis = [e['word'] for e in entities if e['entity_group'] in ('DISEASE', 'DISORDER')]
+        medications = [e['word'] for e in entities if e['entity_group'] in ('CHEMICAL', 'DRUG')]
+        extracted_info.bert_entities = entities
+        extracted_info.diagnosis_bert = diagnosis
+        extracted_info.medications_bert = medications
+        # Optionally, merge with main fields if empty
+        if not extracted_info.primary_diagnosis and diagnosis:
+            extracted_info.primary_diagnosis = diagnosis[0]
+        if not extracted_info.medication and medications:
+            extracted_info.medication = medications[0]
+        return extracted_info
+    
+    def extract_medical_info(self, patient_data: Dict) -> ExtractedEvidence:
         """Extract and structure medical information from patient data"""
-        
-        extracted_info = {
-            'patient_id': patient_data.get('patient_id', ''),
-            'demographics': {
-                'age': patient_data.get('age', 0),
-                'gender': patient_data.get('gender', ''),
-            },
-            'medical_history': {
-                'primary_diagnosis': patient_data.get('diagnosis', ''),
-                'icd_code': patient_data.get('icd_code', ''),
-                'previous_treatments': patient_data.get('previous_treatments', []),
-                'allergies': patient_data.get('allergies', 'None'),
-            },
-            'current_request': {
-                'medication': patient_data.get('requested_medication', ''),
-                'dosage': patient_data.get('dosage', ''),
-                'duration': patient_data.get('duration', ''),
-                'urgency': patient_data.get('urgency', 'Routine'),
-            },
-            'insurance_info': {
-                'tier': patient_data.get('insurance_tier', ''),
-                'prior_auth_history': patient_data.get('prior_auth_history', 'None'),
-                'estimated_cost': patient_data.get('cost_per_month', 0)
-            }
-        }
+        extracted_info = self._build_extracted_info(patient_data)
         # NEW: If clinical note exists, use BERT
         clinical_note = patient_data.get('clinical_note', '')
         if clinical_note:
-            entities = self.ner_pipeline(clinical_note)
-            diagnosis = [e['word'] for e in entities if e['entity_group'] in ('DISEASE', 'DISORDER')]
-            medications = [e['word'] for e in entities if e['entity_group'] in ('CHEMICAL', 'DRUG')]
-            extracted_info['bert_entities'] = entities
-            extracted_info['diagnosis_bert'] = diagnosis
-            extracted_info['medications_bert'] = medications
-            # Optionally, merge with main fields if empty
-            if not extracted_info['medical_history']['primary_diagnosis'] and diagnosis:
-                extracted_info['medical_history']['primary_diagnosis'] = diagnosis[0]
-            if not extracted_info['current_request']['medication'] and medications:
-                extracted_info['current_request']['medication'] = medications[0]
+            entities = self._run_ner(clinical_note)
+            self._apply_entities(extracted_info, entities)
         return extracted_info
     
+    def extract_medical_info_batch(self, patients: List[Dict],
+                                   batch_size: int = DEFAULT_NER_BATCH_SIZE) -> List[ExtractedEvidence]:
+        """Extract medical information for many patients with batched NER inference
+        
+        Clinical notes are sorted by length and grouped into batches of similar
+        size so padding inside each forward pass stays small. Notes already in
+        the NER cache, and duplicates within the batch, skip the model. Results
+        are returned in the same order as ``patients``.
+        """
+        results = [self._build_extracted_info(patient) for patient in patients]
+        
+        # Serve cached notes first; only unique misses go through the model
+        pending = {}
+        for i, patient in enumerate(patients):
+            clinical_note = patient.get('clinical_note', '')
+            if not isinstance(clinical_note, str) or not clinical_note:
+                continue
+            key = make_cache_key(clinical_note, self.ner_cache_model_id)
+            if key in pending:
+                pending[key][1].append(i)
+                continue
+            entities = self.ner_cache.get(key)
+            if entities is not None:
+                self._apply_entities(results[i], entities)
+            else:
+                pending[key] = (clinical_note, [i])
+        
+        notes = sorted(pending.items(), key=lambda item: len(item[1][0]))
+        
+        for start in range(0, len(notes), batch_size):
+            bucket = notes[start:start + batch_size]
+            batch_entities = self.ner_pipeline([note for _, (note, _) in bucket], batch_size=len(bucket))
+            for (key, (_, indices)), entities in zip(bucket, batch_entities):
+                self.ner_cache.put(key, entities)
+                for i in indices:
+                    self._apply_entities(results[i], [dict(e) for e in entities])
+        
+        return results
+    
+    @staticmethod
+    def describe(extracted_info: ExtractedEvidence) -> str:
+        """Reasoning chain entry for an extraction"""
+        return "Medical info extracted (BERT applied if clinical note provided)"
+    
     def process(self, state: Dict) -> Dict:
         """Process patient data and extract medical information"""
         patient_data = state.get('patient_data', {})
@@ -77,7 +130,7 @@ class MedicalExtractorAgent:
         
         state['extracted_evidence'] = extracted_info
         state['reasoning_chain'] = state.get('reasoning_chain', [])
-        state['reasoning_chain'].append("Medical info extracted (BERT applied if clinical note provided)")
+        state['reasoning_chain'].append(self.describe(extracted_info))
         
         return state
         
\ No newline at end of file
@@ -1,55 +1,66 @@
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 import random
+from agents.guideline_index import GuidelineStore, get_guideline_store
+from utils.formulary import FormularyService
+from utils.pa_records import ClinicalRisk, ExtractedEvidence, FinancialRisk, RiskAssessment
 
 class RiskAssessorAgent:
     """Assess clinical and financial risks of prior authorization requests"""
     
-    def __init__(self):
+    def __init__(self, store: Optional[GuidelineStore] = None):
+        # Formulary lookups come from the shared guideline/formulary snapshot
+        self.store = store or get_guideline_store()
         self.risk_factors = {
             'age_high_risk': [65, 85],
             'high_cost_threshold': 2000,
             'urgent_conditions': ['Emergency', 'Urgent']
         }
     
-    def calculate_clinical_risk(self, patient_info: Dict) -> Dict:
+    def calculate_clinical_risk(self, patient_info: ExtractedEvidence) -> ClinicalRisk:
         """Calculate clinical risk score based on patient factors"""
         risk_score = 0
         risk_factors = []
         
         # Age-based risk
-        age = patient_info.get('demographics', {}).get('age', 0)
+        age = patient_info.age
         if age >= 65:
             risk_score += 2
             risk_factors.append("Advanced age (≥65)")
         
         # Urgency-based risk
-        urgency = patient_info.get('current_request', {}).get('urgency', 'Routine')
+        urgency = patient_info.urgency
         if urgency in ['Emergency', 'Urgent']:
             risk_score += 3
             risk_factors.append(f"High urgency: {urgency}")
         
         # Allergy considerations
-        allergies = patient_info.get('medical_history', {}).get('allergies', 'None')
+        allergies = patient_info.allergies
         if allergies != 'None' and allergies != 'NKDA':
             risk_score += 1
             risk_factors.append(f"Drug allergies: {allergies}")
         
         # Previous authorization history
-        prior_auth = patient_info.get('insurance_info', {}).get('prior_auth_history', 'None')
+        prior_auth = patient_info.prior_auth_history
         if prior_auth == 'Denied':
             risk_score += 2
             risk_factors.append("Previous PA denial")
         
-        return {
-            'clinical_risk_score': risk_score,
-            'risk_level': self.get_risk_level(risk_score),
-            'risk_factors': risk_factors
-        }
+        return ClinicalRisk(risk_score, self.get_risk_level(risk_score), risk_factors)
     
-    def calculate_financial_risk(self, patient_info: Dict) -> Dict:
+    def calculate_financial_risk(self, patient_info: ExtractedEvidence,
+                                 formulary: Optional[FormularyService] = None) -> FinancialRisk:
         """Calculate financial risk and cost-effectiveness"""
-        estimated_cost = patient_info.get('insurance_info', {}).get('estimated_cost', 0)
-        tier = patient_info.get('insurance_info', {}).get('tier', 'Tier 1')
+        estimated_cost = patient_info.estimated_cost
+        tier = patient_info.insurance_tier
+        
+        # Fall back to the formulary when the request carries no cost or tier
+        if formulary is None:
+            formulary = self.store.current().formulary
+        medication = patient_info.medication
+        entry = formulary.lookup(medication) if medication else None
+        if entry:
+            estimated_cost = estimated_cost or entry['cost']
+            tier = tier or entry['tier']
         
         # Cost-based risk
         if estimated_cost > 2000:
@@ -63,12 +74,8 @@ class RiskAssessorAgent:
         tier_multiplier = {'Tier 1': 1, 'Tier 2': 1.5, 'Tier 3': 2, 'Tier 4': 3}
         adjusted_cost = estimated_cost * tier_multiplier.get(tier, 1)
         
-        return {
-            'financial_risk': cost_risk,
-            'estimated_monthly_cost': estimated_cost,
-            'adjusted_cost': adjusted_cost,
-            'tier': tier
-        }
+        return FinancialRisk(cost_risk, estimated_cost, adjusted_cost, tier,
+                             entry['generic_available'] if entry else None)
     
     def get_risk_level(self, score: int) -> str:
         """Convert risk score to risk level"""
@@ -79,24 +86,32 @@ class RiskAssessorAgent:
         else:
             return "Low"
     
-    def process(self, state: Dict) -> Dict:
-        """Process risk assessment"""
-        extracted_info = state.get('extracted_evidence', {})
+    def assess(self, extracted_info: Optional[ExtractedEvidence],
+               guidelines_version: Optional[str] = None) -> RiskAssessment:
+        """Assess clinical and financial risk against one formulary snapshot"""
+        if extracted_info is None:
+            # Without extracted evidence the tier defaults to Tier 1
+            extracted_info = ExtractedEvidence(insurance_tier='Tier 1')
+        snapshot = self.store.get(guidelines_version)
         
         clinical_risk = self.calculate_clinical_risk(extracted_info)
-        financial_risk = self.calculate_financial_risk(extracted_info)
+        financial_risk = self.calculate_financial_risk(extracted_info, snapshot.formulary)
         
         # Overall risk assessment
-        overall_risk = "High" if clinical_risk['risk_level'] == "High" or financial_risk['financial_risk'] == "High" else "Moderate" if clinical_risk['risk_level'] == "Moderate" or financial_risk['financial_risk'] == "Moderate" else "Low"
+        overall_risk = "High" if clinical_risk.risk_level == "High" or financial_risk.financial_risk == "High" else "Moderate" if clinical_risk.risk_level == "Moderate" or financial_risk.financial_risk == "Moderate" else "Low"
         
-        risk_assessment = {
-            'clinical_risk': clinical_risk,
-            'financial_risk': financial_risk,
-            'overall_risk': overall_risk,
-            'assessment_summary': f"Clinical: {clinical_risk['risk_level']}, Financial: {financial_risk['financial_risk']}"
-        }
+        return RiskAssessment(clinical_risk, financial_risk, overall_risk)
+    
+    @staticmethod
+    def describe(risk_assessment: RiskAssessment) -> str:
+        """Reasoning chain entry for a risk assessment"""
+        return f"Risk assessment completed: {risk_assessment.overall_risk} risk"
+    
+    def process(self, state: Dict) -> Dict:
+        """Process risk assessment"""
+        risk_assessment = self.assess(state.get('extracted_evidence'), state.get('guidelines_version'))
         
         state['risk_assessment'] = risk_assessment
-        state['reasoning_chain'].append(f"Risk assessment completed: {overall_risk} risk")
+        state['reasoning_chain'].append(self.describe(risk_assessment))
         
-        return state
\ No newline at end of file
+        return state
@@ -0,0 +1,261 @@
+# src/batch_processor.py
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime
+from typing import Dict, List, Any, Iterator, Optional, Set, Union
+
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from config import Config
+from agents.decision_maker import DEFERRED_RISK_LEVEL
+from langgraph_workflow import EMERGENCY_NODE, PriorAuthWorkflow
+from utils.decision_store import DecisionStore, get_decision_store
+from utils.patient_fields import PATIENT_CSV_OPTIONS, row_to_patient
+from utils.text_processor import PARequestValidator
+
+
+def _field(section: Any, name: str, default: Any) -> Any:
+    """Read a field from a result section given as a dict, a record or None"""
+    if section is None:
+        return default
+    if isinstance(section, dict):
+        return section.get(name, default)
+    return getattr(section, name, default)
+
+
+def summarize_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Flatten a workflow result (dict or record sections) into one output record"""
+    final_decision = result.get('final_decision')
+    # Fast-path decisions have no compliance or risk sections until their analysis lands
+    fast_path = EMERGENCY_NODE in (result.get('node_metrics') or {})
+    deferred = result.get('deferred_analysis') is not None
+    return {
+        'patient_id': result.get('patient_data', {}).get('patient_id', ''),
+        'decision': _field(final_decision, 'decision', ''),
+        'reason': _field(final_decision, 'reason', ''),
+        'confidence': _field(final_decision, 'confidence', 0.0),
+        'guideline_compliant': _field(result.get('guideline_compliance'), 'overall_compliant',
+                                      None if fast_path else False),
+        'overall_risk': _field(result.get('risk_assessment'), 'overall_risk',
+                               DEFERRED_RISK_LEVEL if deferred else ''),
+        'recommendations': _field(final_decision, 'recommendations', []),
+        'guidelines_version': _field(final_decision, 'guidelines_version', ''),
+        'emergency_fast_path': fast_path,
+        'workflow_status': result.get('workflow_status', ''),
+        'error_message': result.get('error_message', ''),
+        'processed_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    }
+
+
+class BatchProcessor:
+    """Run PriorAuthWorkflow over a whole patient file with a worker pool
+
+    Rows are streamed from the source, decisions are appended to a JSON Lines
+    output as they complete, and every completed ``patient_id`` is recorded
+    in a checkpoint file so an interrupted run can be resumed. Failed rows
+    (including a row whose processing raises) are written out but not
+    checkpointed, so a resumed run retries them. With a ``validator``, each
+    chunk is validated column-wise first and rows missing a required field
+    are dropped before they reach the workflow. With a ``store``, every
+    result is also appended to the decision store; a row whose append fails
+    keeps its decision in the output, is counted in ``store_errors`` and is
+    left out of the checkpoint. The full analysis of Emergency requests is
+    only deferred when there is a store to write it to, and ``run`` waits
+    for the deferred analyses it started (closing the workflow's executors)
+    before it reports, so they are part of the measured run.
+    """
+
+    def __init__(self, workflow: Optional[PriorAuthWorkflow] = None,
+                 workers: int = Config.BATCH_WORKERS,
+                 chunk_size: int = Config.BATCH_CHUNK_SIZE,
+                 report_every: int = Config.BATCH_REPORT_EVERY,
+                 validator: Optional[PARequestValidator] = None,
+                 store: Optional[DecisionStore] = None):
+        # Deferred emergency analyses are only read back through the store
+        self.workflow = workflow or PriorAuthWorkflow(defer_emergency_analysis=store is not None)
+        self.workers = max(1, workers)
+        self.chunk_size = chunk_size
+        self.report_every = report_every
+        self.validator = validator
+        self.store = store
+        self.invalid_rows = 0
+
+    def iter_chunks(self, source: Union[str, pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        """Stream a DataFrame or a CSV/Parquet path as DataFrame chunks"""
+        if isinstance(source, pd.DataFrame):
+            for start in range(0, len(source), self.chunk_size):
+                yield source.iloc[start:start + self.chunk_size]
+            return
+
+        if source.endswith('.parquet'):
+            try:
+                import pyarrow.parquet as pq
+            except ImportError:
+                # Without pyarrow's batch reader the file is read in one go
+                yield from self.iter_chunks(pd.read_parquet(source))
+                return
+            for batch in pq.ParquetFile(source).iter_batches(batch_size=self.chunk_size):
+                yield batch.to_pandas()
+            return
+
+        yield from pd.read_csv(source, chunksize=self.chunk_size, **PATIENT_CSV_OPTIONS)
+
+    def iter_patients(self, source: Union[str, pd.DataFrame]) -> Iterator[Dict[str, Any]]:
+        """Stream patient dicts from a DataFrame or a CSV/Parquet path"""
+        for chunk in self.iter_chunks(source):
+            if self.validator is not None:
+                is_valid = self.validator.validate_batch(chunk)['is_valid']
+                self.invalid_rows += int((~is_valid).sum())
+                chunk = chunk[is_valid]
+            for row in chunk.to_dict('records'):
+                yield row_to_patient(row)
+
+    @staticmethod
+    def load_checkpoint(checkpoint_path: Optional[str]) -> Set[str]:
+        """Read the set of already processed patient ids"""
+        if not checkpoint_path or not os.path.exists(checkpoint_path):
+            return set()
+        with open(checkpoint_path, 'r') as f:
+            return {line.strip() for line in f if line.strip()}
+
+    def run(self, source: Union[str, pd.DataFrame], output_path: str,
+            checkpoint_path: Optional[str] = None, limit: Optional[int] = None) -> Dict[str, Any]:
+        """Process every pending row of ``source`` and return run statistics"""
+        checkpoint_path = checkpoint_path or f"{output_path}.checkpoint"
+        completed = self.load_checkpoint(checkpoint_path)
+
+        stats = {
+            'processed': 0,
+            'failed': 0,
+            'skipped': 0,
+            'invalid': 0,
+            'store_errors': 0,
+            'decisions': {},
+        }
+        self.invalid_rows = 0
+        deferred_before = self.workflow.get_deferred_statistics()
+        start = time.perf_counter()
+        # Bound the number of rows in flight so memory does not grow with the file
+        max_in_flight = self.workers * 4
+
+        def record(future, patient, output, checkpoint):
+            stored = True
+            try:
+                result = future.result()
+                summary = summarize_result(result)
+                line = json.dumps(summary)
+            except Exception as e:
+                # One bad row is recorded as failed instead of ending the run
+                result = None
+                summary = summarize_result({
+                    'patient_data': patient,
+                    'workflow_status': "Failed",
+                    'error_message': f"Batch processing error: {str(e)}"
+                })
+                line = json.dumps(summary, default=str)
+            if result is not None and self.store is not None:
+                try:
+                    self.store.append(result)
+                except Exception as e:
+                    # The decision itself is fine; report the store failure on its own
+                    stored = False
+                    stats['store_errors'] += 1
+                    print(f"Could not store decision for {summary['patient_id']}: {e}")
+            output.write(line + '\n')
+            output.flush()
+            # Only completed, stored decisions are checkpointed, so a resume retries the rest
+            if summary['workflow_status'] == 'Completed' and stored:
+                checkpoint.write(str(summary['patient_id']) + '\n')
+                checkpoint.flush()
+
+            stats['processed'] += 1
+            if summary['workflow_status'] != 'Completed':
+                stats['failed'] += 1
+            stats['decisions'][summary['decision']] = stats['decisions'].get(summary['decision'], 0) + 1
+
+            if self.report_every and stats['processed'] % self.report_every == 0:
+                elapsed = time.perf_counter() - start
+                print(f"Processed {stats['processed']} requests "
+                      f"({stats['processed'] / elapsed:.1f} req/s)")
+
+        os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+        with open(output_path, 'a') as output, open(checkpoint_path, 'a') as checkpoint, \
+                ThreadPoolExecutor(max_workers=self.workers) as executor:
+            # future -> patient it is processing
+            in_flight = {}
+            submitted = 0
+
+            for patient in self.iter_patients(source):
+                if limit is not None and submitted >= limit:
+                    break
+                patient_id = str(patient.get('patient_id', ''))
+                if patient_id and patient_id in completed:
+                    stats['skipped'] += 1
+                    continue
+
+                # Only a few fields are written out, so skip converting the records to dicts
+                in_flight[executor.submit(self.workflow.process_pa_request, patient, as_dict=False)] = patient
+                submitted += 1
+
+                if len(in_flight) >= max_in_flight:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        record(future, in_flight.pop(future), output, checkpoint)
+
+            for future, patient in in_flight.items():
+                record(future, patient, output, checkpoint)
+
+        # Wait for the deferred analyses before flushing, so the store gets them
+        self.workflow.close()
+        deferred_after = self.workflow.get_deferred_statistics()
+        stats['deferred_analyses'] = deferred_after['submitted'] - deferred_before['submitted']
+        stats['deferred_skipped'] = deferred_after['skipped'] - deferred_before['skipped']
+        if self.store is not None:
+            self.store.flush()
+
+        stats['invalid'] = self.invalid_rows
+        elapsed = time.perf_counter() - start
+        stats['elapsed_seconds'] = round(elapsed, 3)
+        stats['requests_per_second'] = round(stats['processed'] / elapsed, 2) if elapsed > 0 else 0.0
+        return stats
+
+
+def main(argv: Optional[List[str]] = None):
+    """Command line entry point for batch adjudication"""
+    parser = argparse.ArgumentParser(description="Run prior authorization decisions over a patient file")
+    parser.add_argument("input", nargs="?", default=Config.SYNTHETIC_PATIENTS_FILE,
+                        help="Patient CSV or Parquet file")
+    parser.add_argument("-o", "--output", default=os.path.join(Config.DATA_DIR, "batch_decisions.jsonl"),
+                        help="JSON Lines file the decisions are appended to")
+    parser.add_argument("--checkpoint", default=None,
+                        help="File of completed patient ids (default: <output>.checkpoint)")
+    parser.add_argument("-w", "--workers", type=int, default=Config.BATCH_WORKERS,
+                        help="Number of worker threads")
+    parser.add_argument("--limit", type=int, default=None, help="Only process this many new rows")
+    parser.add_argument("--validate", action="store_true",
+                        help="Drop rows missing a required field before processing")
+    parser.add_argument("--store", action="store_true",
+                        help="Also append every decision to the decision store (Config.DECISION_STORE_FILE)")
+    args = parser.parse_args(argv)
+
+    processor = BatchProcessor(workers=args.workers,
+                               validator=PARequestValidator() if args.validate else None,
+                               store=get_decision_store() if args.store else None)
+    stats = processor.run(args.input, args.output, checkpoint_path=args.checkpoint, limit=args.limit)
+
+    print(f"Processed {stats['processed']} requests in {stats['elapsed_seconds']}s "
+          f"({stats['requests_per_second']} req/s), skipped {stats['skipped']}, "
+          f"invalid {stats['invalid']}, failed {stats['failed']}, store errors {stats['store_errors']}")
+    print(f"Deferred emergency analyses: {stats['deferred_analyses']} run, {stats['deferred_skipped']} skipped")
+    print("Decisions:", stats['decisions'])
+
+
+if __name__ == "__main__":
+    main()
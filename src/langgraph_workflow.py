@@ -1,32 +1,126 @@
 # src/langgraph_workflow.py
 
-from typing import Dict, List, Any, TypedDict
+import asyncio
+import dataclasses
+import logging
+import operator
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Annotated, Dict, List, Any, Iterable, Iterator, Optional, Tuple, TypedDict
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import StateGraph
-from langgraph.graph import END
+from langgraph.graph import START, END
+from config import Config
 from agents.medical_extractor import MedicalExtractorAgent
 from agents.guidelines_checker import GuidelinesCheckerAgent
 from agents.risk_assessor import RiskAssessorAgent
 from agents.decision_maker import DecisionMakerAgent
+from utils.pa_records import (
+    DeferredAnalysis, ExtractedEvidence, FinalDecision, GuidelineCompliance, RiskAssessment, state_to_dict
+)
+from utils.decision_memo import DecisionMemo, decision_features
+from utils.profiling import get_workflow_profiler, profile_call
+
+logger = logging.getLogger(__name__)
+
+def _merge_dicts(left: Dict[str, Any], right: Dict[str, Any]) -> Dict[str, Any]:
+    return {**(left or {}), **(right or {})}
+
+def _last_value(left: str, right: str) -> str:
+    return right
+
+def _join_errors(left: str, right: str) -> str:
+    return "; ".join(message for message in (left, right) if message)
 
 class PAState(TypedDict):
-    """State definition for Prior Authorization workflow"""
+    """State definition for Prior Authorization workflow
+    
+    Nodes return only the keys they change. Keys that parallel branches may
+    both write carry a reducer, and LangGraph applies the writes of one step
+    in a fixed order, so the merged state is deterministic. The four result
+    sections are slotted records (None until their node succeeds); results
+    leave the workflow converted with ``state_to_dict``.
+    """
     patient_data: Dict[str, Any]
-    extracted_evidence: Dict[str, Any]
-    guideline_compliance: Dict[str, Any]
-    risk_assessment: Dict[str, Any]
-    final_decision: Dict[str, Any]
-    reasoning_chain: List[str]
-    workflow_status: str
-    error_message: str
+    extracted_evidence: Optional[ExtractedEvidence]
+    guideline_compliance: Optional[GuidelineCompliance]
+    risk_assessment: Optional[RiskAssessment]
+    final_decision: Optional[FinalDecision]
+    reasoning_chain: Annotated[List[str], operator.add]
+    workflow_status: Annotated[str, _last_value]
+    error_message: Annotated[str, _join_errors]
+    node_metrics: Annotated[Dict[str, Any], _merge_dicts]
+    guidelines_version: str
+    # Set only for requests decided on the emergency fast path
+    deferred_analysis: Optional[DeferredAnalysis]
+    # Canonical features of the extracted request, the decision memo key
+    memo_key: Optional[Tuple]
+
+# Reducers for the annotated keys, used to fold streamed node updates into a full state
+STATE_REDUCERS = {
+    'reasoning_chain': operator.add,
+    'workflow_status': _last_value,
+    'error_message': _join_errors,
+    'node_metrics': _merge_dicts
+}
+
+def merge_state_update(state: Dict[str, Any], update: Dict[str, Any]) -> Dict[str, Any]:
+    """Apply one node's partial update to a state dict the way the graph does"""
+    for key, value in (update or {}).items():
+        reducer = STATE_REDUCERS.get(key)
+        state[key] = reducer(state[key], value) if reducer and key in state else value
+    return state
+
+# Node that decides Emergency requests without extraction, guidelines or risk analysis
+EMERGENCY_NODE = "emergency_decision"
+
+# Status shown while each node runs
+WORKFLOW_STEPS = {
+    "extract_medical_info": "Extracting medical information...",
+    "check_guidelines": "Checking clinical guidelines...",
+    "assess_risk": "Assessing clinical and financial risks...",
+    "make_decision": "Making final decision...",
+    EMERGENCY_NODE: "Approving emergency request (full analysis deferred)..."
+}
+
+# Nodes of each route in execution order (check_guidelines and assess_risk run
+# in parallel; a decision memo hit ends the full route after extraction)
+FULL_ROUTE = ("extract_medical_info", "check_guidelines", "assess_risk", "make_decision")
+EMERGENCY_ROUTE = (EMERGENCY_NODE,)
+
+# Nodes that do model inference; under ainvoke they run on a dedicated executor,
+# the rule-only nodes run inline on the event loop
+CPU_BOUND_NODES = frozenset({"extract_medical_info"})
 
 class PriorAuthWorkflow:
-    """LangGraph workflow for Prior Authorization processing"""
+    """LangGraph workflow for Prior Authorization processing
+
+    Emergency requests are decided on a fast path. Their full analysis runs
+    in the background only with ``defer_emergency_analysis`` (for callers
+    that read ``deferred_analysis``), and is skipped once
+    DEFERRED_ANALYSIS_MAX_PENDING analyses are queued.
+    """
     
-    def __init__(self):
+    def __init__(self, defer_emergency_analysis: bool = True):
         self.medical_extractor = MedicalExtractorAgent()
         self.guidelines_checker = GuidelinesCheckerAgent()
-        self.risk_assessor = RiskAssessorAgent()
+        self.risk_assessor = RiskAssessorAgent(self.guidelines_checker.store)
         self.decision_maker = DecisionMakerAgent()
+        self.profiler = get_workflow_profiler()
+        # Rule outcomes (guidelines, risk, decision) for identical normalized requests
+        self.memo = DecisionMemo(Config.DECISION_MEMO_MAX_ENTRIES, Config.DECISION_MEMO_TTL_SECONDS) \
+            if Config.DECISION_MEMO_ENABLED else None
+        
+        self._cpu_executor: Optional[ThreadPoolExecutor] = None
+        self._deferred_executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        self.defer_emergency_analysis = defer_emergency_analysis
+        self._deferred_lock = threading.Lock()
+        self._deferred_stats = {'pending': 0, 'submitted': 0, 'skipped': 0}
+        # One semaphore per event loop (asyncio primitives are loop-bound)
+        self._semaphores: Dict[asyncio.AbstractEventLoop, asyncio.Semaphore] = {}
         
         # Build the workflow graph
         self.workflow = self._build_workflow()
@@ -37,108 +131,388 @@ class PriorAuthWorkflow:
         # Define the workflow graph
         workflow = StateGraph(PAState)
         
-        # Add nodes
-        workflow.add_node("extract_medical_info", self._extract_medical_info_node)
-        workflow.add_node("check_guidelines", self._check_guidelines_node)
-        workflow.add_node("assess_risk", self._assess_risk_node)
-        workflow.add_node("make_decision", self._make_decision_node)
+        # Add nodes (each one timed by the profiler)
+        nodes = {
+            "extract_medical_info": self._extract_medical_info_node,
+            "check_guidelines": self._check_guidelines_node,
+            "assess_risk": self._assess_risk_node,
+            "make_decision": self._make_decision_node,
+            EMERGENCY_NODE: self._emergency_decision_node
+        }
+        for node_name, node_func in nodes.items():
+            workflow.add_node(node_name, self._node_runnable(node_name, self.profiler.instrument(node_name, node_func)))
         
-        # Define the workflow edges
-        workflow.add_edge("extract_medical_info", "check_guidelines")
-        workflow.add_edge("check_guidelines", "assess_risk")
-        workflow.add_edge("assess_risk", "make_decision")
+        # Define the workflow edges: guidelines and risk only depend on the
+        # extracted evidence, so they fan out in parallel and join at the decision
+        # (unless the decision memo already answered the request)
+        workflow.add_conditional_edges("extract_medical_info", self._route_after_extraction,
+                                       ["check_guidelines", "assess_risk", END])
+        workflow.add_edge(["check_guidelines", "assess_risk"], "make_decision")
         workflow.add_edge("make_decision", END)
+        workflow.add_edge(EMERGENCY_NODE, END)
         
-        # Set entry point
-        workflow.set_entry_point("extract_medical_info")
+        # Set entry point: Emergency requests skip straight to the decision
+        workflow.add_conditional_edges(START, self._route_request, ["extract_medical_info", EMERGENCY_NODE])
         
         return workflow.compile()
     
-    def _extract_medical_info_node(self, state: PAState) -> PAState:
+    def _node_runnable(self, node_name: str, node_func) -> RunnableLambda:
+        """Wrap a node so invoke calls it directly and ainvoke avoids the default thread hop"""
+        if node_name in CPU_BOUND_NODES:
+            async def anode(state: PAState) -> PAState:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(self._get_cpu_executor(), node_func, state)
+        else:
+            async def anode(state: PAState) -> PAState:
+                return node_func(state)
+        return RunnableLambda(node_func, afunc=anode, name=node_name)
+    
+    def _get_cpu_executor(self) -> ThreadPoolExecutor:
+        """Executor for CPU-heavy nodes, created on first async use"""
+        if self._cpu_executor is None:
+            with self._executor_lock:
+                if self._cpu_executor is None:
+                    self._cpu_executor = ThreadPoolExecutor(max_workers=Config.ASYNC_CPU_WORKERS,
+                                                            thread_name_prefix="pa-extract")
+        return self._cpu_executor
+    
+    def _get_deferred_executor(self) -> ThreadPoolExecutor:
+        """Executor for the background analysis of fast-pathed requests"""
+        if self._deferred_executor is None:
+            with self._executor_lock:
+                if self._deferred_executor is None:
+                    self._deferred_executor = ThreadPoolExecutor(max_workers=Config.DEFERRED_ANALYSIS_WORKERS,
+                                                                 thread_name_prefix="pa-deferred")
+        return self._deferred_executor
+    
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        """Concurrency cap for the running event loop"""
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            # Drop semaphores of loops that have since closed
+            self._semaphores = {l: s for l, s in self._semaphores.items() if not l.is_closed()}
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(Config.ASYNC_MAX_CONCURRENCY)
+        return semaphore
+    
+    @staticmethod
+    def _error_update(error_label: str, error: Exception) -> Dict[str, Any]:
+        return {
+            'error_message': f"Error in {error_label}: {str(error)}",
+            'workflow_status': "Error"
+        }
+    
+    def _extract_medical_info_node(self, state: PAState) -> Dict[str, Any]:
         """Node for medical information extraction"""
         try:
-            state['workflow_status'] = "Extracting medical information..."
-            updated_state = self.medical_extractor.process(dict(state))
-            state.update(updated_state)
-            return state
+            evidence = self.medical_extractor.extract_medical_info(state['patient_data'])
         except Exception as e:
-            state['error_message'] = f"Error in medical extraction: {str(e)}"
-            state['workflow_status'] = "Error"
-            return state
+            return self._error_update("medical extraction", e)
+        update = {'extracted_evidence': evidence, 'reasoning_chain': [self.medical_extractor.describe(evidence)]}
+        
+        if self.memo is not None:
+            memo_key = decision_features(evidence)
+            memoized = self.memo.get(memo_key, state['guidelines_version'])
+            if memoized is None:
+                update['memo_key'] = memo_key
+            else:
+                # Same features under the same snapshot: reuse the rule outcomes, re-date the decision
+                compliance, risk, decision = memoized
+                decision = dataclasses.replace(decision, decision_date=datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+                update.update({
+                    'guideline_compliance': compliance,
+                    'risk_assessment': risk,
+                    'final_decision': decision,
+                    'workflow_status': "Completed"
+                })
+                # Same order the parallel branches append in
+                update['reasoning_chain'] += [
+                    self.risk_assessor.describe(risk),
+                    self.guidelines_checker.describe(compliance),
+                    "Rule evaluation served from the decision memo",
+                    self.decision_maker.describe(decision)
+                ]
+        return update
     
-    def _check_guidelines_node(self, state: PAState) -> PAState:
+    def _check_guidelines_node(self, state: PAState) -> Dict[str, Any]:
         """Node for guidelines compliance checking"""
         try:
-            state['workflow_status'] = "Checking clinical guidelines..."
-            updated_state = self.guidelines_checker.process(dict(state))
-            state.update(updated_state)
-            return state
+            compliance = self.guidelines_checker.check(state['extracted_evidence'], state['guidelines_version'])
         except Exception as e:
-            state['error_message'] = f"Error in guidelines check: {str(e)}"
-            state['workflow_status'] = "Error"
-            return state
+            return self._error_update("guidelines check", e)
+        return {
+            'guideline_compliance': compliance,
+            'guidelines_version': compliance.guidelines_version,
+            'reasoning_chain': [self.guidelines_checker.describe(compliance)]
+        }
     
-    def _assess_risk_node(self, state: PAState) -> PAState:
+    def _assess_risk_node(self, state: PAState) -> Dict[str, Any]:
         """Node for risk assessment"""
         try:
-            state['workflow_status'] = "Assessing clinical and financial risks..."
-            updated_state = self.risk_assessor.process(dict(state))
-            state.update(updated_state)
-            return state
+            risk = self.risk_assessor.assess(state['extracted_evidence'], state['guidelines_version'])
         except Exception as e:
-            state['error_message'] = f"Error in risk assessment: {str(e)}"
-            state['workflow_status'] = "Error"
-            return state
+            return self._error_update("risk assessment", e)
+        return {'risk_assessment': risk, 'reasoning_chain': [self.risk_assessor.describe(risk)]}
     
-    def _make_decision_node(self, state: PAState) -> PAState:
+    def _make_decision_node(self, state: PAState) -> Dict[str, Any]:
         """Node for final decision making"""
         try:
-            state['workflow_status'] = "Making final decision..."
-            updated_state = self.decision_maker.process(dict(state))
-            state.update(updated_state)
-            state['workflow_status'] = "Completed"
-            return state
+            decision = self.decision_maker.decide(
+                state['guideline_compliance'], state['risk_assessment'],
+                state['extracted_evidence'], state['guidelines_version']
+            )
         except Exception as e:
-            state['error_message'] = f"Error in decision making: {str(e)}"
-            state['workflow_status'] = "Error"
-            return state
+            return self._error_update("decision making", e)
+        
+        compliance, risk = state['guideline_compliance'], state['risk_assessment']
+        if state['memo_key'] is not None and compliance is not None and risk is not None:
+            self.memo.put(state['memo_key'], state['guidelines_version'], (compliance, risk, decision))
+        return {
+            'final_decision': decision,
+            'reasoning_chain': [self.decision_maker.describe(decision)],
+            'workflow_status': "Completed"
+        }
     
-    def process_pa_request(self, patient_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Process a prior authorization request through the workflow"""
+    @staticmethod
+    def _route_after_extraction(state: PAState) -> List[str]:
+        """Fan out to the rule nodes, or finish if the memo already supplied the decision"""
+        if state['final_decision'] is not None:
+            return [END]
+        return ["check_guidelines", "assess_risk"]
+    
+    @staticmethod
+    def _route_request(state: PAState) -> str:
+        """Entry router: Emergency requests are approved unconditionally, so they take the fast path"""
+        if Config.EMERGENCY_OVERRIDE_ENABLED and state['patient_data'].get('urgency') == 'Emergency':
+            return EMERGENCY_NODE
+        return "extract_medical_info"
+    
+    def planned_route(self, patient_data: Dict[str, Any]) -> Tuple[str, ...]:
+        """Nodes a request will run through, in order (before any memo hit shortens it)"""
+        return EMERGENCY_ROUTE if self._route_request({'patient_data': patient_data}) == EMERGENCY_NODE \
+            else FULL_ROUTE
+    
+    def _emergency_decision_node(self, state: PAState) -> Dict[str, Any]:
+        """Node approving an Emergency request from its tabular fields, deferring the full analysis"""
+        started = time.perf_counter()
+        try:
+            # Tabular fields only: the decision does not depend on NER, guidelines or risk
+            evidence = ExtractedEvidence.from_patient(state['patient_data'])
+            deferred = self._submit_deferred(state['patient_data'], state['guidelines_version']) \
+                if self.defer_emergency_analysis else None
+            decision = self.decision_maker.decide(None, None, evidence, state['guidelines_version'],
+                                                 analysis_deferred=deferred is not None)
+        except Exception as e:
+            return self._error_update("emergency decision", e)
         
-        # Initialize state
-        initial_state = PAState(
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        budget_exceeded = elapsed_ms > Config.EMERGENCY_LATENCY_BUDGET_MS
+        if budget_exceeded:
+            logger.warning("Emergency fast path took %.1fms (budget %sms) for %s",
+                           elapsed_ms, Config.EMERGENCY_LATENCY_BUDGET_MS, evidence.patient_id)
+        if deferred is not None:
+            analysis_status, analysis_note = 'queued', "deferred for audit"
+        elif self.defer_emergency_analysis:
+            analysis_status, analysis_note = 'skipped', "skipped (deferred analysis queue full)"
+        else:
+            analysis_status, analysis_note = 'disabled', "not run (deferral disabled)"
+        return {
+            'final_decision': decision,
+            'deferred_analysis': deferred,
+            # Merged with the profiler's timings for this node
+            'node_metrics': {EMERGENCY_NODE: {
+                'elapsed_ms': round(elapsed_ms, 3),
+                'latency_budget_ms': Config.EMERGENCY_LATENCY_BUDGET_MS,
+                'budget_exceeded': budget_exceeded,
+                'deferred_analysis': analysis_status
+            }},
+            'reasoning_chain': [
+                f"Emergency fast path: extraction, guidelines and risk analysis {analysis_note}",
+                self.decision_maker.describe(decision)
+            ],
+            'workflow_status': "Completed"
+        }
+    
+    def _submit_deferred(self, patient_data: Dict[str, Any],
+                         guidelines_version: str) -> Optional[DeferredAnalysis]:
+        """Queue the full analysis of a fast-pathed request, or return None if the queue is full"""
+        with self._deferred_lock:
+            if self._deferred_stats['pending'] >= Config.DEFERRED_ANALYSIS_MAX_PENDING:
+                self._deferred_stats['skipped'] += 1
+                return None
+            self._deferred_stats['pending'] += 1
+            self._deferred_stats['submitted'] += 1
+        try:
+            future = self._get_deferred_executor().submit(self._deferred_analysis, patient_data, guidelines_version)
+        except Exception:
+            self._deferred_finished(None)
+            raise
+        future.add_done_callback(self._deferred_finished)
+        return DeferredAnalysis(future)
+    
+    def _deferred_finished(self, _future):
+        with self._deferred_lock:
+            self._deferred_stats['pending'] -= 1
+    
+    def _deferred_analysis(self, patient_data: Dict[str, Any], guidelines_version: str) -> Dict[str, Any]:
+        """Extraction, guidelines check and risk assessment for a request already decided"""
+        evidence = self.medical_extractor.extract_medical_info(patient_data)
+        compliance = self.guidelines_checker.check(evidence, guidelines_version)
+        risk = self.risk_assessor.assess(evidence, guidelines_version)
+        return {
+            'extracted_evidence': evidence,
+            'guideline_compliance': compliance,
+            'risk_assessment': risk,
+            'reasoning_chain': [
+                self.medical_extractor.describe(evidence),
+                self.guidelines_checker.describe(compliance),
+                self.risk_assessor.describe(risk)
+            ],
+            'completed_at': time.strftime('%Y-%m-%d %H:%M:%S')
+        }
+    
+    def _initial_state(self, patient_data: Dict[str, Any]) -> PAState:
+        """Build the starting state for a request"""
+        guidelines_version = self.guidelines_checker.version
+        if self.memo is not None:
+            # A new guideline snapshot invalidates every memoized outcome
+            self.memo.sync_version(guidelines_version)
+        return PAState(
             patient_data=patient_data,
-            extracted_evidence={},
-            guideline_compliance={},
-            risk_assessment={},
-            final_decision={},
+            extracted_evidence=None,
+            guideline_compliance=None,
+            risk_assessment=None,
+            final_decision=None,
             reasoning_chain=[],
             workflow_status="Starting workflow...",
-            error_message=""
+            error_message="",
+            node_metrics={},
+            # Pin the guideline snapshot for the whole request
+            guidelines_version=guidelines_version,
+            deferred_analysis=None,
+            memo_key=None
         )
+    
+    @staticmethod
+    def _failed_result(patient_data: Dict[str, Any], initial_state: Optional[PAState], message: str,
+                       convert=state_to_dict) -> Dict[str, Any]:
+        """Failed result for a request, also when the failure came before its initial state was built"""
+        state = initial_state if initial_state is not None else {'patient_data': patient_data}
+        return {
+            **convert(state),
+            'error_message': message,
+            'workflow_status': "Failed"
+        }
+    
+    def process_pa_request(self, patient_data: Dict[str, Any], as_dict: bool = True) -> Dict[str, Any]:
+        """Process a prior authorization request through the workflow
+        
+        With ``as_dict=False`` the result sections stay slotted records, for
+        callers that only read a few fields (see batch_processor).
+        """
+        convert = state_to_dict if as_dict else dict
+        initial_state = None
         
         # Run the workflow
         try:
+            initial_state = self._initial_state(patient_data)
             final_state = self.workflow.invoke(initial_state)
-            return dict(final_state)
+            return convert(final_state)
+        except Exception as e:
+            return self._failed_result(patient_data, initial_state, f"Workflow execution error: {str(e)}", convert)
+    
+    async def aprocess_pa_request(self, patient_data: Dict[str, Any],
+                                  timeout: Optional[float] = Config.MAX_PROCESSING_TIME) -> Dict[str, Any]:
+        """Async process_pa_request: waits for a concurrency slot, then runs the graph with ainvoke
+        
+        A request that takes longer than ``timeout`` seconds (queueing excluded)
+        is returned with workflow_status "Failed".
+        """
+        initial_state = None
+        
+        async with self._get_semaphore():
+            try:
+                initial_state = self._initial_state(patient_data)
+                final_state = await asyncio.wait_for(self.workflow.ainvoke(initial_state), timeout)
+                return state_to_dict(final_state)
+            except asyncio.TimeoutError:
+                return self._failed_result(patient_data, initial_state, f"Workflow timed out after {timeout}s")
+            except Exception as e:
+                return self._failed_result(patient_data, initial_state, f"Workflow execution error: {str(e)}")
+    
+    async def aprocess_many(self, patients: Iterable[Dict[str, Any]],
+                            timeout: Optional[float] = Config.MAX_PROCESSING_TIME) -> List[Dict[str, Any]]:
+        """Process many requests concurrently (capped by ASYNC_MAX_CONCURRENCY), results in input order"""
+        return await asyncio.gather(*(self.aprocess_pa_request(patient, timeout) for patient in patients))
+    
+    def close(self):
+        """Shut down the extraction executor and wait for pending deferred analyses"""
+        with self._executor_lock:
+            for name in ('_cpu_executor', '_deferred_executor'):
+                executor = getattr(self, name)
+                if executor is not None:
+                    executor.shutdown(wait=True)
+                    setattr(self, name, None)
+    
+    def stream_pa_request(self, patient_data: Dict[str, Any]) -> Iterator[Tuple[str, float, Dict[str, Any]]]:
+        """Process a request and yield (node name, node seconds, state) as each node completes
+        
+        The state in the last event is the final result, the same dict
+        process_pa_request would return. Node seconds come from the node's
+        own timing, since the parallel branches overlap.
+        """
+        state = {'patient_data': patient_data}
+        
+        try:
+            initial_state = self._initial_state(patient_data)
+            state = dict(initial_state)
+            started = time.perf_counter()
+            for update in self.workflow.stream(initial_state, stream_mode="updates"):
+                for node_name, node_state in update.items():
+                    finished = time.perf_counter()
+                    merge_state_update(state, node_state)
+                    node_timing = state['node_metrics'].get(node_name, {})
+                    node_seconds = node_timing['wall_ms'] / 1000 if 'wall_ms' in node_timing else finished - started
+                    yield node_name, node_seconds, state_to_dict(state)
+                    started = time.perf_counter()
         except Exception as e:
-            return {
-                **initial_state,
+            state.update({
                 'error_message': f"Workflow execution error: {str(e)}",
                 'workflow_status': "Failed"
-            }
+            })
+            yield "error", 0.0, state_to_dict(state)
+    
+    def profile_pa_request(self, patient_data: Dict[str, Any], output_path: Optional[str] = None,
+                           engine: str = 'cprofile') -> Dict[str, Any]:
+        """Process a single request under cProfile/pyinstrument and dump the profile"""
+        profiled = profile_call(self.process_pa_request, patient_data, output_path=output_path, engine=engine)
+        result = profiled['result']
+        result['profile_report'] = profiled['report']
+        return result
+    
+    def get_node_statistics(self) -> Dict[str, Dict[str, Any]]:
+        """Rolling p50/p95/p99 wall time, CPU time and allocation per node"""
+        return self.profiler.get_percentiles()
+    
+    def get_memo_statistics(self) -> Dict[str, Any]:
+        """Decision memo hit rate and size (empty when the memo is disabled)"""
+        return self.memo.get_stats() if self.memo is not None else {}
+    
+    def get_deferred_statistics(self) -> Dict[str, int]:
+        """Deferred emergency analyses pending now, and submitted or skipped so far"""
+        with self._deferred_lock:
+            return dict(self._deferred_stats)
     
     def get_workflow_visualization(self) -> str:
         """Get a text representation of the workflow"""
         return """
         Prior Authorization Workflow:
         
+        Emergency → Emergency Decision (analysis deferred)
+        
         1. Extract Medical Info
            ↓
-        2. Check Guidelines
-           ↓
-        3. Assess Risk
+        2. Check Guidelines  ∥  3. Assess Risk
            ↓
         4. Make Decision
            ↓
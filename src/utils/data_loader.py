@@ -3,17 +3,22 @@
 import pandas as pd
 import json
 import os
-from typing import Dict, List, Optional, Union
+from typing import Dict, List, Iterator, Optional, Union
 import streamlit as st
-from datetime import datetime, timedelta
 import random
 
+from config import Config
+from utils.patient_index import PatientIndex
+from utils.patient_store import get_patient_store
+from utils.synthetic_generator import COST_MAP, DOSAGE_MAP, generate_patients
+
 class DataLoader:
     """Utility class for loading and managing data sources"""
     
     def __init__(self, data_dir: str = "data"):
         self.data_dir = data_dir
         self.patients_df = None
+        self.patient_index = None
         self.guidelines_data = None
         self._ensure_data_exists()
     
@@ -33,105 +38,9 @@ class DataLoader:
     
     def _generate_synthetic_patients(self):
         """Generate synthetic patient data for testing"""
-        
-        # Medical conditions with realistic treatment patterns
-        medical_scenarios = [
-            {
-                'diagnosis': 'Rheumatoid Arthritis',
-                'icd_code': 'M05.9',
-                'medications': ['Methotrexate', 'Adalimumab', 'Etanercept', 'Rituximab'],
-                'typical_age_range': (25, 70),
-                'common_allergies': ['None', 'Penicillin', 'Sulfa']
-            },
-            {
-                'diagnosis': 'Type 2 Diabetes',
-                'icd_code': 'E11.9',
-                'medications': ['Metformin', 'Insulin', 'Semaglutide', 'Liraglutide'],
-                'typical_age_range': (35, 80),
-                'common_allergies': ['None', 'NKDA']
-            },
-            {
-                'diagnosis': 'Hypertension',
-                'icd_code': 'I10',
-                'medications': ['Lisinopril', 'Amlodipine', 'Losartan', 'Metoprolol'],
-                'typical_age_range': (40, 85),
-                'common_allergies': ['None', 'ACE inhibitor allergy']
-            },
-            {
-                'diagnosis': 'Asthma',
-                'icd_code': 'J45.9',
-                'medications': ['Albuterol', 'Fluticasone', 'Montelukast', 'Budesonide'],
-                'typical_age_range': (5, 75),
-                'common_allergies': ['None', 'Aspirin', 'Beta-blocker allergy']
-            },
-            {
-                'diagnosis': 'Depression',
-                'icd_code': 'F32.9',
-                'medications': ['Sertraline', 'Escitalopram', 'Bupropion', 'Venlafaxine'],
-                'typical_age_range': (18, 80),
-                'common_allergies': ['None', 'SSRI intolerance']
-            },
-            {
-                'diagnosis': 'COPD',
-                'icd_code': 'J44.1',
-                'medications': ['Tiotropium', 'Budesonide/Formoterol', 'Albuterol', 'Roflumilast'],
-                'typical_age_range': (45, 85),
-                'common_allergies': ['None', 'Beta-agonist allergy']
-            },
-            {
-                'diagnosis': 'Migraine',
-                'icd_code': 'G43.9',
-                'medications': ['Sumatriptan', 'Topiramate', 'Propranolol', 'Botox'],
-                'typical_age_range': (15, 65),
-                'common_allergies': ['None', 'Triptan allergy']
-            },
-            {
-                'diagnosis': 'High Cholesterol',
-                'icd_code': 'E78.5',
-                'medications': ['Atorvastatin', 'Simvastatin', 'Rosuvastatin', 'Ezetimibe'],
-                'typical_age_range': (30, 80),
-                'common_allergies': ['None', 'Statin intolerance']
-            }
-        ]
-        
-        patients = []
-        for i in range(1000):
-            scenario = random.choice(medical_scenarios)
-            age_min, age_max = scenario['typical_age_range']
-            
-            # Create realistic patient profile
-            patient = {
-                'patient_id': f'PT{i+1:06d}',
-                'name': f'Patient {i+1}',
-                'age': random.randint(age_min, age_max),
-                'gender': random.choice(['M', 'F']),
-                'diagnosis': scenario['diagnosis'],
-                'icd_code': scenario['icd_code'],
-                'requested_medication': random.choice(scenario['medications']),
-                'dosage': self._get_realistic_dosage(scenario['medications'][0]),
-                'duration': random.choice(['3 months', '6 months', '12 months', '18 months']),
-                'previous_treatments': random.sample(scenario['medications'], 
-                                                   min(random.randint(0, 3), len(scenario['medications']))),
-                'allergies': random.choice(scenario['common_allergies']),
-                'insurance_tier': random.choices(['Tier 1', 'Tier 2', 'Tier 3', 'Tier 4'], 
-                                               weights=[40, 30, 20, 10])[0],
-                'prior_auth_history': random.choices(['None', 'Approved', 'Denied', 'Pending'], 
-                                                   weights=[50, 30, 15, 5])[0],
-                'cost_per_month': self._get_realistic_cost(scenario['medications'][0]),
-                'urgency': random.choices(['Routine', 'Urgent', 'Emergency'], 
-                                        weights=[80, 15, 5])[0],
-                'provider_name': f'Dr. {random.choice(["Smith", "Johnson", "Williams", "Brown", "Jones"])}',
-                'submission_date': (datetime.now() - timedelta(days=random.randint(0, 30))).strftime('%Y-%m-%d'),
-                'member_id': f'MBR{random.randint(100000, 999999)}',
-                # Add a clinical note (simple or patterned)
-                'clinical_note': f"Patient with {scenario['diagnosis']} on {random.choice(scenario['medications'])}. Prior treatments: {', '.join(random.sample(scenario['medications'], min(2, len(scenario['medications']))))}. Allergies: {random.choice(scenario['common_allergies'])}."
-            }
-            patients.append(patient)
-        
-        # Save to CSV
-        df = pd.DataFrame(patients)
-        df.to_csv(f"{self.data_dir}/synthetic_patients.csv", index=False)
-        print(f"Generated {len(patients)} synthetic patient records")
+        n_rows = Config.SYNTHETIC_PATIENT_COUNT
+        generate_patients(f"{self.data_dir}/synthetic_patients.csv", n_rows)
+        print(f"Generated {n_rows} synthetic patient records")
     
     def _generate_pa_guidelines(self):
         """Generate comprehensive PA guidelines"""
@@ -276,42 +185,31 @@ class DataLoader:
     
     def _get_realistic_dosage(self, medication: str) -> str:
         """Get realistic dosage for medication"""
-        dosage_map = {
-            'Methotrexate': '15mg weekly',
-            'Adalimumab': '40mg subcutaneous bi-weekly',
-            'Metformin': '500mg twice daily',
-            'Insulin': '20 units subcutaneous daily',
-            'Semaglutide': '1mg subcutaneous weekly',
-            'Lisinopril': '10mg daily',
-            'Amlodipine': '5mg daily',
-            'Albuterol': '2 puffs every 4-6 hours as needed',
-            'Sertraline': '50mg daily',
-            'Atorvastatin': '20mg daily'
-        }
-        return dosage_map.get(medication, '1 tablet daily')
+        return DOSAGE_MAP.get(medication, '1 tablet daily')
     
     def _get_realistic_cost(self, medication: str) -> int:
         """Get realistic monthly cost for medication"""
-        cost_map = {
-            'Methotrexate': 25,
-            'Adalimumab': 2500,
-            'Metformin': 15,
-            'Insulin': 200,
-            'Semaglutide': 800,
-            'Lisinopril': 10,
-            'Amlodipine': 12,
-            'Albuterol': 30,
-            'Sertraline': 20,
-            'Atorvastatin': 18
-        }
-        return cost_map.get(medication, random.randint(20, 500))
+        return COST_MAP.get(medication, random.randint(20, 500))
     
     def load_patients(self) -> pd.DataFrame:
-        """Load patient data"""
+        """Load patient data (typed, from the columnar store shared by every loader)"""
         if self.patients_df is None:
-            self.patients_df = pd.read_csv(f"{self.data_dir}/synthetic_patients.csv")
+            self.patients_df = self._store().load()
         return self.patients_df
     
+    def _store(self):
+        return get_patient_store(f"{self.data_dir}/synthetic_patients.csv")
+    
+    def get_index(self) -> PatientIndex:
+        """Hash/inverted index over the patient table (shared by loaders of the same file)"""
+        if self.patient_index is None:
+            df = self.load_patients()
+            index = self._store().index()
+            if index is None or index.df is not df:
+                index = PatientIndex(df)
+            self.patient_index = index
+        return self.patient_index
+    
     def load_guidelines(self) -> Dict:
         """Load PA guidelines"""
         if self.guidelines_data is None:
@@ -321,11 +219,11 @@ class DataLoader:
     
     def get_patient_by_id(self, patient_id: str) -> Optional[Dict]:
         """Get patient data by ID"""
-        df = self.load_patients()
-        patient_row = df[df['patient_id'] == patient_id]
-        if not patient_row.empty:
-            return patient_row.iloc[0].to_dict()
-        return None
+        return self.get_index().get(patient_id)
+    
+    def get_patient_by_member_id(self, member_id: str) -> Optional[Dict]:
+        """Get patient data by member ID"""
+        return self.get_index().get(member_id, column='member_id')
     
     def get_random_patients(self, n: int = 10) -> List[Dict]:
         """Get random patient samples for testing"""
@@ -333,18 +231,14 @@ class DataLoader:
         sample_df = df.sample(n=min(n, len(df)))
         return sample_df.to_dict('records')
     
-    def search_patients(self, **criteria) -> List[Dict]:
-        """Search patients by criteria"""
-        df = self.load_patients()
-        
-        for key, value in criteria.items():
-            if key in df.columns:
-                if isinstance(value, str):
-                    df = df[df[key].str.contains(value, case=False, na=False)]
-                else:
-                    df = df[df[key] == value]
+    def search_patients(self, prefix: bool = False, **criteria) -> Iterator[Dict]:
+        """Search patients by criteria, lazily yielding matching records
         
-        return df.to_dict('records')
+        Diagnosis, medication, tier, urgency and ID criteria use the index
+        (exact or ``prefix`` match, case-insensitive); other columns are
+        filtered on the indexed candidates only.
+        """
+        return self.get_index().search(prefix=prefix, **criteria)
     
     @st.cache_data
     def get_summary_statistics(_self) -> Dict:
@@ -373,8 +267,8 @@ if __name__ == "__main__":
     print(f"Loaded {len(patients)} patients")
     
     # Test patient search
-    diabetes_patients = loader.search_patients(diagnosis="Type 2 Diabetes")
-    print(f"Found {len(diabetes_patients)} diabetes patients")
+    diabetes_patients = sum(1 for _ in loader.search_patients(diagnosis="Type 2 Diabetes"))
+    print(f"Found {diabetes_patients} diabetes patients")
     
     # Test statistics
     stats = loader.get_summary_statistics()
@@ -0,0 +1,115 @@
+# src/utils/decision_memo.py
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Hashable, Optional, Tuple
+
+from utils.pa_records import ExtractedEvidence
+from utils.patient_fields import normalize_name
+
+
+def decision_features(evidence: ExtractedEvidence) -> Tuple:
+    """Canonical tuple of every extracted field the guideline, risk and decision rules read
+
+    Previous treatments only matter as a set of normalized names and age only
+    as the >=65 bucket. Fields echoed into the output (diagnosis, medication,
+    urgency, allergies) are kept verbatim so a memoized result reads exactly
+    like a fresh one.
+    """
+    try:
+        age_bucket = evidence.age >= 65
+    except TypeError:
+        age_bucket = evidence.age
+    return (
+        evidence.primary_diagnosis,
+        evidence.medication,
+        frozenset(normalize_name(str(treatment)) for treatment in evidence.previous_treatments),
+        evidence.insurance_tier,
+        evidence.estimated_cost,
+        evidence.urgency,
+        age_bucket,
+        evidence.allergies,
+        evidence.prior_auth_history
+    )
+
+
+class DecisionMemo:
+    """Bounded LRU + TTL memo of rule outcomes for one guideline snapshot
+
+    Entries are only valid for the snapshot version they were computed
+    under: ``sync_version`` empties the memo when the snapshot changes, and
+    lookups or stores for any other version are ignored. Stored values are
+    shared between requests and must be treated as read-only.
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl_seconds: Optional[float] = 3600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.version: Optional[str] = None
+
+        # key -> (stored at, value)
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'expirations': 0,
+            'invalidations': 0
+        }
+
+    def sync_version(self, version: str):
+        """Follow the current guideline snapshot, dropping every entry when it changes"""
+        if version == self.version:
+            return
+        with self._lock:
+            if version != self.version:
+                if self._entries:
+                    self.stats['invalidations'] += 1
+                self._entries.clear()
+                self.version = version
+
+    def get(self, key: Hashable, version: str) -> Optional[Any]:
+        """Memoized value for ``key`` under snapshot ``version``, or None"""
+        with self._lock:
+            entry = self._entries.get(key) if version == self.version else None
+            if entry is not None:
+                stored_at, value = entry
+                if self.ttl_seconds is not None and time.monotonic() - stored_at > self.ttl_seconds:
+                    del self._entries[key]
+                    self.stats['expirations'] += 1
+                else:
+                    self._entries.move_to_end(key)
+                    self.stats['hits'] += 1
+                    return value
+            self.stats['misses'] += 1
+            return None
+
+    def put(self, key: Hashable, version: str, value: Any):
+        """Store a value computed under snapshot ``version``"""
+        with self._lock:
+            if version != self.version:
+                return
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats['evictions'] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters, hit rate and current size"""
+        with self._lock:
+            lookups = self.stats['hits'] + self.stats['misses']
+            return {
+                **self.stats,
+                'hit_rate': self.stats['hits'] / lookups if lookups else 0.0,
+                'entries': len(self._entries),
+                'guidelines_version': self.version
+            }
+
+    def clear(self):
+        """Drop every entry"""
+        with self._lock:
+            self._entries.clear()
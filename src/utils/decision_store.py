@@ -0,0 +1,455 @@
+# src/utils/decision_store.py
+
+import atexit
+import json
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Tuple
+
+from utils.pa_records import DeferredAnalysis, state_to_dict
+
+logger = logging.getLogger(__name__)
+
+# Columns the dashboard filters on
+FILTER_COLUMNS = ('patient_id', 'decision', 'diagnosis')
+
+_COLUMNS = ('request_id', 'patient_id', 'diagnosis', 'medication', 'decision', 'reason', 'confidence',
+            'risk_level', 'guideline_compliant', 'cost', 'urgency', 'guidelines_version',
+            'workflow_status', 'processed_at', 'result', 'deferred_analysis')
+_DECISION, _RISK_LEVEL, _DIAGNOSIS, _COST, _CONFIDENCE = (
+    _COLUMNS.index(name) for name in ('decision', 'risk_level', 'diagnosis', 'cost', 'confidence')
+)
+
+# Running counts kept in decision_aggregates: metric -> bucket -> count and sums.
+# 'all' has a single '' bucket holding the overall totals.
+AGGREGATE_METRICS = ('all', 'decision', 'risk_level', 'diagnosis', 'cost_bin', 'confidence_bin')
+
+
+def _finite(value: Any) -> float:
+    """``value`` as a float, with missing, non-numeric, NaN and infinite values as 0"""
+    try:
+        value = float(value or 0)
+    except (TypeError, ValueError):
+        return 0.0
+    return value if math.isfinite(value) else 0.0
+
+
+def _bin(value: Any, width: float) -> str:
+    """Lower edge of the fixed-width bin holding ``value`` (the epsilon absorbs float error, 0.6 / 0.1)"""
+    return repr(round(int(_finite(value) / width + 1e-9) * width, 6))
+
+
+def _json_default(value: Any) -> Any:
+    """JSON fallback for records, numpy scalars and sets in a workflow result"""
+    if hasattr(value, 'to_dict'):
+        return value.to_dict()
+    if hasattr(value, 'item'):  # numpy scalar
+        return value.item()
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=str)
+    return str(value)
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, default=_json_default)
+
+
+class DecisionStore:
+    """Append-only SQLite (WAL) store of workflow decisions
+
+    ``append`` only buffers; rows are written ``batch_size`` at a time in one
+    transaction, or by the first append after the oldest buffered row turns
+    ``flush_seconds`` old. Every read flushes first, so callers always see
+    their own writes. The full result is kept as JSON next to indexed summary
+    columns, and a deferred emergency analysis is written into its row when
+    it completes, replacing the row's Deferred risk level and compliance
+    (and moving its risk-level aggregate) with the analysis outcome. A batch that fails to write is rolled back and retried one
+    row at a time; rows that still fail are dropped and counted in
+    ``rejected``. Each flush also updates running aggregates (counts and sums
+    per decision, risk level, diagnosis, cost bin and confidence bin) in the
+    same transaction, so dashboard reads never scan the decisions table; a
+    failed flush re-checks the aggregate total against the row count.
+    """
+
+    def __init__(self, db_path: str, batch_size: int = 100, flush_seconds: float = 2.0,
+                 cost_bin_width: float = 250, confidence_bin_width: float = 0.1):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.cost_bin_width = cost_bin_width
+        self.confidence_bin_width = confidence_bin_width
+
+        # Buffered writes dropped because they could not be stored
+        self.rejected = 0
+
+        self._lock = threading.Lock()
+        self._pending: List[Tuple] = []
+        # (deferred_analysis JSON, risk_level, guideline_compliant, request_id)
+        self._pending_updates: List[Tuple[str, Optional[str], Optional[int], str]] = []
+        self._oldest_pending: Optional[float] = None
+        self._flush_timer: Optional[threading.Timer] = None
+        self._closed = False
+
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS decisions (
+                   id INTEGER PRIMARY KEY AUTOINCREMENT,
+                   request_id TEXT NOT NULL UNIQUE,
+                   patient_id TEXT,
+                   diagnosis TEXT,
+                   medication TEXT,
+                   decision TEXT,
+                   reason TEXT,
+                   confidence REAL,
+                   risk_level TEXT,
+                   guideline_compliant INTEGER,
+                   cost REAL,
+                   urgency TEXT,
+                   guidelines_version TEXT,
+                   workflow_status TEXT,
+                   processed_at TEXT,
+                   result TEXT,
+                   deferred_analysis TEXT
+               )"""
+        )
+        for column in ('patient_id', 'decision', 'diagnosis', 'processed_at'):
+            self._conn.execute(f"CREATE INDEX IF NOT EXISTS idx_decisions_{column} ON decisions({column})")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS decision_aggregates (
+                   metric TEXT NOT NULL,
+                   bucket TEXT NOT NULL,
+                   count INTEGER NOT NULL,
+                   cost_sum REAL NOT NULL,
+                   confidence_sum REAL NOT NULL,
+                   PRIMARY KEY (metric, bucket)
+               )"""
+        )
+        self._conn.execute("CREATE TABLE IF NOT EXISTS store_meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self._conn.commit()
+        if self._aggregates_stale():
+            self.rebuild_aggregates()
+
+    def _bin_widths(self) -> str:
+        return json.dumps({'cost': self.cost_bin_width, 'confidence': self.confidence_bin_width})
+
+    def _aggregates_stale(self) -> bool:
+        """True if the aggregates miss stored rows or were built with other bin widths"""
+        row = self._conn.execute("SELECT value FROM store_meta WHERE key = 'bin_widths'").fetchone()
+        if row is None or row[0] != self._bin_widths():
+            return True
+        aggregated = self._conn.execute(
+            "SELECT count FROM decision_aggregates WHERE metric = 'all' AND bucket = ''"
+        ).fetchone()
+        stored = self._conn.execute("SELECT COUNT(*) FROM decisions").fetchone()[0]
+        return (aggregated[0] if aggregated else 0) != stored
+
+    def _accumulate(self, deltas: Dict[Tuple[str, str], List[float]], decision: str, risk_level: str,
+                    diagnosis: str, cost: float, confidence: float):
+        """Add one decision to pending aggregate deltas: a fixed number of counter updates"""
+        cost = _finite(cost)
+        confidence = _finite(confidence)
+        for key in (('all', ''), ('decision', decision or ''), ('risk_level', risk_level or ''),
+                    ('diagnosis', diagnosis or ''), ('cost_bin', _bin(cost, self.cost_bin_width)),
+                    ('confidence_bin', _bin(confidence, self.confidence_bin_width))):
+            delta = deltas[key]
+            delta[0] += 1
+            delta[1] += cost
+            delta[2] += confidence
+
+    def _apply_deltas(self, deltas: Dict[Tuple[str, str], List[float]]):
+        self._conn.executemany(
+            """INSERT INTO decision_aggregates (metric, bucket, count, cost_sum, confidence_sum)
+               VALUES (?, ?, ?, ?, ?)
+               ON CONFLICT (metric, bucket) DO UPDATE SET
+                   count = count + excluded.count,
+                   cost_sum = cost_sum + excluded.cost_sum,
+                   confidence_sum = confidence_sum + excluded.confidence_sum""",
+            [(metric, bucket, *delta) for (metric, bucket), delta in deltas.items()]
+        )
+
+    def rebuild_aggregates(self):
+        """Recompute the running aggregates from every stored decision (one full scan)"""
+        with self._lock:
+            self._rebuild_aggregates_locked()
+
+    def _rebuild_aggregates_locked(self):
+        deltas = defaultdict(lambda: [0, 0.0, 0.0])
+        cursor = self._conn.execute("SELECT decision, risk_level, diagnosis, cost, confidence FROM decisions")
+        for row in cursor:
+            self._accumulate(deltas, *row)
+        self._conn.execute("DELETE FROM decision_aggregates")
+        self._apply_deltas(deltas)
+        self._conn.execute("INSERT OR REPLACE INTO store_meta (key, value) VALUES ('bin_widths', ?)",
+                           (self._bin_widths(),))
+        self._conn.commit()
+
+    @staticmethod
+    def _row(result: Dict[str, Any], request_id: str) -> Tuple:
+        """Summary columns plus JSON payload for one workflow result"""
+        data = state_to_dict(result)
+        deferred = data.pop('deferred_analysis', None)
+        patient = data.get('patient_data', {})
+        final_decision = data.get('final_decision', {})
+        # Without the analysis sections (emergency fast path) the decision says why they are missing
+        evidence = final_decision.get('supporting_evidence', {})
+        compliant = data.get('guideline_compliance', {}).get('overall_compliant',
+                                                              evidence.get('guideline_compliant', False))
+        return (
+            request_id,
+            str(patient.get('patient_id', '')),
+            patient.get('diagnosis', ''),
+            patient.get('requested_medication', ''),
+            final_decision.get('decision', ''),
+            final_decision.get('reason', ''),
+            _finite(final_decision.get('confidence', 0.0)),
+            data.get('risk_assessment', {}).get('overall_risk') or evidence.get('risk_level') or 'Unknown',
+            None if compliant is None else int(bool(compliant)),
+            _finite(patient.get('cost_per_month', 0)),
+            patient.get('urgency', ''),
+            final_decision.get('guidelines_version', ''),
+            data.get('workflow_status', ''),
+            data.get('processed_at') or datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            _dumps(data),
+            _dumps(deferred) if deferred is not None else None
+        )
+
+    def append(self, result: Dict[str, Any]) -> str:
+        """Buffer one workflow result (dict or record sections) and return its request id"""
+        request_id = uuid.uuid4().hex
+        row = self._row(result, request_id)
+        with self._lock:
+            self._pending.append(row)
+            self._maybe_flush_locked()
+
+        deferred = result.get('deferred_analysis')
+        if isinstance(deferred, DeferredAnalysis):
+            deferred.add_done_callback(lambda analysis: self._update_deferred(request_id, analysis))
+        return request_id
+
+    def _update_deferred(self, request_id: str, analysis: DeferredAnalysis):
+        data = analysis.to_dict()
+        if data['status'] == 'completed':
+            risk_level = data.get('risk_assessment', {}).get('overall_risk') or 'Unknown'
+            compliant = int(bool(data.get('guideline_compliance', {}).get('overall_compliant', False)))
+        else:
+            # The analysis failed, so the row's risk is no longer pending, just unknown
+            risk_level, compliant = 'Unknown', None
+        with self._lock:
+            self._pending_updates.append((_dumps(data), risk_level, compliant, request_id))
+            self._maybe_flush_locked()
+
+    def _maybe_flush_locked(self):
+        """Flush once a full batch is buffered or the oldest buffered write is flush_seconds old
+
+        Otherwise a timer flushes the buffer later, so writes that arrive
+        with nothing behind them (a deferred analysis completing on an idle
+        store) are not held until exit.
+        """
+        if self._oldest_pending is None:
+            self._oldest_pending = time.monotonic()
+        if len(self._pending) + len(self._pending_updates) >= self.batch_size or \
+                time.monotonic() - self._oldest_pending >= self.flush_seconds:
+            self._flush_locked()
+        elif self._flush_timer is None:
+            self._flush_timer = threading.Timer(self.flush_seconds, self._timed_flush)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+
+    def _timed_flush(self):
+        with self._lock:
+            self._flush_timer = None
+            if not self._closed and (self._pending or self._pending_updates):
+                self._flush_locked()
+
+    def _move_risk_level(self, deltas: Dict[Tuple[str, str], List[float]], request_id: str, risk_level: str):
+        """Add the delta moving a stored row from its current risk_level bucket to ``risk_level``"""
+        row = self._conn.execute(
+            "SELECT risk_level, cost, confidence FROM decisions WHERE request_id = ?", (request_id,)
+        ).fetchone()
+        if row is None or row[0] == risk_level:
+            return
+        cost, confidence = _finite(row[1]), _finite(row[2])
+        for bucket, sign in ((row[0] or '', -1), (risk_level, 1)):
+            delta = deltas[('risk_level', bucket)]
+            delta[0] += sign
+            delta[1] += sign * cost
+            delta[2] += sign * confidence
+
+    def _write(self, rows: List[Tuple], updates: List[Tuple[str, Optional[str], Optional[int], str]]):
+        """Insert rows, fold them into the aggregates and apply deferred updates as one transaction"""
+        # Aggregates move in the same transaction as the rows they count
+        deltas = defaultdict(lambda: [0, 0.0, 0.0])
+        if rows:
+            placeholders = ', '.join('?' for _ in _COLUMNS)
+            self._conn.executemany(
+                f"INSERT INTO decisions ({', '.join(_COLUMNS)}) VALUES ({placeholders})", rows
+            )
+            for row in rows:
+                self._accumulate(deltas, row[_DECISION], row[_RISK_LEVEL], row[_DIAGNOSIS],
+                                 row[_COST], row[_CONFIDENCE])
+        for deferred_json, risk_level, compliant, request_id in updates:
+            # A deferred analysis replaces the fast-path placeholder risk level and compliance
+            self._move_risk_level(deltas, request_id, risk_level)
+            self._conn.execute(
+                """UPDATE decisions SET deferred_analysis = ?, risk_level = ?, guideline_compliant = ?
+                   WHERE request_id = ?""",
+                (deferred_json, risk_level, compliant, request_id)
+            )
+        if deltas:
+            self._apply_deltas(deltas)
+            self._conn.execute("DELETE FROM decision_aggregates WHERE count = 0")
+        self._conn.commit()
+
+    def _flush_locked(self):
+        rows, updates = self._pending, self._pending_updates
+        self._pending = []
+        self._pending_updates = []
+        self._oldest_pending = None
+        try:
+            self._write(rows, updates)
+        except (sqlite3.Error, ValueError, TypeError, OverflowError) as e:
+            # Roll back the whole batch, then write it one entry at a time so a
+            # bad entry is dropped on its own instead of blocking every later flush
+            self._conn.rollback()
+            logger.error("Decision store batch of %d rows failed (%s), retrying row by row", len(rows), e)
+            entries = [(row[0], [row], []) for row in rows] + [(update[-1], [], [update]) for update in updates]
+            for request_id, entry_rows, entry_updates in entries:
+                try:
+                    self._write(entry_rows, entry_updates)
+                except (sqlite3.Error, ValueError, TypeError, OverflowError) as e:
+                    self._conn.rollback()
+                    self.rejected += 1
+                    logger.error("Dropped decision store write for request %s: %s", request_id, e)
+            # Rows and aggregates commit together, so they can only disagree if a
+            # rollback went wrong; never let the dashboard drift from fetch_page
+            if self._aggregates_stale():
+                logger.error("Decision aggregates out of step with the stored rows, rebuilding")
+                self._rebuild_aggregates_locked()
+
+    def flush(self):
+        """Write every buffered row and update in one transaction"""
+        with self._lock:
+            if self._pending or self._pending_updates:
+                self._flush_locked()
+
+    @staticmethod
+    def _where(filters: Dict[str, Any]) -> Tuple[str, List[Any]]:
+        clauses, params = [], []
+        for column, value in filters.items():
+            if column not in FILTER_COLUMNS:
+                raise ValueError(f"Cannot filter decisions on {column!r}")
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def _query(self, sql: str, params: List[Any]) -> List[sqlite3.Row]:
+        with self._lock:
+            if self._pending or self._pending_updates:
+                self._flush_locked()
+            return self._conn.execute(sql, params).fetchall()
+
+    def count(self, **filters) -> int:
+        """Number of stored decisions matching the filters (unfiltered counts come from the aggregates)"""
+        if not any(value is not None for value in filters.values()):
+            return self.get_aggregates()['total']
+        where, params = self._where(filters)
+        return self._query(f"SELECT COUNT(*) FROM decisions{where}", params)[0][0]
+
+    def fetch_page(self, page: int = 0, page_size: int = 50, include_result: bool = False,
+                   **filters) -> List[Dict[str, Any]]:
+        """One page of decisions, newest first, as dicts (the full result JSON only on request)"""
+        columns = [c for c in _COLUMNS if c not in ('result', 'deferred_analysis') or include_result]
+        where, params = self._where(filters)
+        rows = self._query(
+            f"SELECT {', '.join(columns)} FROM decisions{where} ORDER BY id DESC LIMIT ? OFFSET ?",
+            params + [page_size, max(page, 0) * page_size]
+        )
+        records = []
+        for row in rows:
+            record = dict(row)
+            for key in ('result', 'deferred_analysis'):
+                if record.get(key):
+                    record[key] = json.loads(record[key])
+            records.append(record)
+        return records
+
+    def decision_counts(self, **filters) -> Dict[str, int]:
+        """Number of decisions per outcome (unfiltered counts come from the aggregates)"""
+        if not any(value is not None for value in filters.values()):
+            return self.get_aggregates()['decision']
+        where, params = self._where(filters)
+        rows = self._query(f"SELECT decision, COUNT(*) FROM decisions{where} GROUP BY decision", params)
+        return {row[0]: row[1] for row in rows}
+
+    def get_aggregates(self) -> Dict[str, Any]:
+        """Running totals for the dashboard; the cost read grows with the number of buckets, not decisions
+
+        Returns the total, mean cost and confidence, and per-bucket counts
+        for each of AGGREGATE_METRICS. The bin metrics are keyed by each
+        bin's lower edge.
+        """
+        rows = self._query("SELECT metric, bucket, count, cost_sum, confidence_sum FROM decision_aggregates", [])
+        aggregates = {metric: {} for metric in AGGREGATE_METRICS if metric != 'all'}
+        total, cost_sum, confidence_sum = 0, 0.0, 0.0
+        for metric, bucket, count, bucket_cost, bucket_confidence in rows:
+            if metric == 'all':
+                total, cost_sum, confidence_sum = count, bucket_cost, bucket_confidence
+            elif metric in ('cost_bin', 'confidence_bin'):
+                aggregates[metric][float(bucket)] = count
+            elif metric in aggregates:
+                aggregates[metric][bucket] = count
+        for metric in ('cost_bin', 'confidence_bin'):
+            aggregates[metric] = dict(sorted(aggregates[metric].items()))
+        return {
+            'total': total,
+            'mean_cost': cost_sum / total if total else 0.0,
+            'mean_confidence': confidence_sum / total if total else 0.0,
+            'cost_bin_width': self.cost_bin_width,
+            'confidence_bin_width': self.confidence_bin_width,
+            **aggregates
+        }
+
+    def close(self):
+        """Flush and close the connection"""
+        self.flush()
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            self._closed = True
+            self._conn.close()
+
+
+_shared_store: Optional[DecisionStore] = None
+_shared_store_lock = threading.Lock()
+
+
+def get_decision_store() -> DecisionStore:
+    """Return the process-wide decision store configured from Config"""
+    global _shared_store
+    if _shared_store is None:
+        with _shared_store_lock:
+            if _shared_store is None:
+                from config import Config
+                _shared_store = DecisionStore(
+                    Config.DECISION_STORE_FILE,
+                    batch_size=Config.DECISION_STORE_BATCH_SIZE,
+                    flush_seconds=Config.DECISION_STORE_FLUSH_SECONDS,
+                    cost_bin_width=Config.DASHBOARD_COST_BIN_WIDTH,
+                    confidence_bin_width=Config.DASHBOARD_CONFIDENCE_BIN_WIDTH
+                )
+                # Buffered rows must not be lost when the process exits
+                atexit.register(_shared_store.flush)
+    return _shared_store
@@ -0,0 +1,100 @@
+# src/utils/formulary.py
+
+import io
+from typing import Dict, Any, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from utils.patient_fields import normalize_name, normalize_names
+from utils.versioned_file import load_if_changed
+
+# Tier labels by code; code 0 means the tier is unknown
+TIER_LABELS = ('', 'Tier 1', 'Tier 2', 'Tier 3', 'Tier 4')
+_TIER_CODES = {label: code for code, label in enumerate(TIER_LABELS)}
+
+
+class FormularyService:
+    """Drug formulary held as compact columnar arrays keyed by normalized drug name
+
+    Each drug maps to a row position; tier is stored as an int8 code, cost as
+    float32 and generic availability as bool, so single lookups are one dict
+    access and ``lookup_many`` is a vectorized index join.
+    """
+
+    def __init__(self, formulary_df: Optional[pd.DataFrame] = None, version: str = "none"):
+        self.version = version
+        if formulary_df is None or formulary_df.empty:
+            formulary_df = pd.DataFrame(columns=['drug_name', 'tier', 'cost', 'generic_available'])
+
+        keys = formulary_df['drug_name'].map(normalize_name)
+        # Later rows win if a drug is listed twice
+        keep = ~keys.duplicated(keep='last').to_numpy()
+        formulary_df = formulary_df[keep]
+        keys = keys[keep]
+
+        self.drug_names = formulary_df['drug_name'].astype(str).to_numpy()
+        self.tier_codes = formulary_df['tier'].map(_TIER_CODES).fillna(0).astype(np.int8).to_numpy()
+        self.costs = pd.to_numeric(formulary_df['cost'], errors='coerce').astype(np.float32).to_numpy()
+        self.generic_available = formulary_df['generic_available'].map(
+            lambda v: str(v).strip().lower() in ('true', '1', 'yes')
+        ).astype(bool).to_numpy()
+
+        self._index = pd.Index(keys.to_numpy())
+        self._positions: Dict[str, int] = {key: pos for pos, key in enumerate(self._index)}
+
+    @classmethod
+    def from_csv(cls, path: str) -> Optional["FormularyService"]:
+        """Load a formulary CSV, reusing the parsed table while the file is unchanged
+
+        Returns None if the file does not exist.
+        """
+        return load_if_changed(path, _build_from_csv)
+
+    def __len__(self) -> int:
+        return len(self.drug_names)
+
+    def __contains__(self, drug_name: str) -> bool:
+        return normalize_name(drug_name) in self._positions
+
+    def lookup(self, drug_name: str) -> Optional[Dict[str, Any]]:
+        """Formulary entry for one drug, or None if it is not listed"""
+        pos = self._positions.get(normalize_name(drug_name))
+        if pos is None:
+            return None
+        cost = float(self.costs[pos])
+        return {
+            'drug_name': self.drug_names[pos],
+            'tier': TIER_LABELS[self.tier_codes[pos]],
+            # Whole-dollar costs come back as int, like caller-supplied costs
+            'cost': int(cost) if cost.is_integer() else cost,
+            'generic_available': bool(self.generic_available[pos])
+        }
+
+    def lookup_many(self, drug_names: Iterable[str]) -> pd.DataFrame:
+        """Vectorized lookup for a batch of drug names (one row per input name)"""
+        names = pd.Series(list(drug_names) if not isinstance(drug_names, pd.Series) else drug_names)
+        keys = normalize_names(names)
+        positions = self._index.get_indexer(keys)
+        found = positions >= 0
+        safe = np.where(found, positions, 0)
+
+        if len(self.drug_names):
+            tier = np.where(found, np.asarray(TIER_LABELS, dtype=object)[self.tier_codes[safe]], '')
+            cost = np.where(found, self.costs[safe], np.nan)
+            generic = np.where(found, self.generic_available[safe], False)
+        else:
+            tier = np.full(len(keys), '', dtype=object)
+            cost = np.full(len(keys), np.nan)
+            generic = np.zeros(len(keys), dtype=bool)
+
+        return pd.DataFrame({
+            'found': found,
+            'tier': tier,
+            'cost': cost,
+            'generic_available': generic
+        }, index=names.index)
+
+
+def _build_from_csv(raw: bytes, digest: str) -> FormularyService:
+    return FormularyService(pd.read_csv(io.BytesIO(raw)), version=digest[:12])
@@ -0,0 +1,158 @@
+# src/utils/model_registry.py
+
+import os
+import shutil
+import threading
+import time
+from typing import Dict, Any, Optional
+
+from config import Config
+
+try:
+    import psutil
+except ImportError:  # psutil is optional, fall back to the stdlib peak RSS
+    psutil = None
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+# Supported inference backends for transformers pipelines
+BACKENDS = ('torch', 'quantized', 'onnx')
+
+
+def get_resident_memory_mb() -> Optional[float]:
+    """Return the resident memory of the current process in MB, if measurable"""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    if resource is not None:
+        # ru_maxrss is the peak RSS, reported in KB on Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return None
+
+
+class ModelRegistry:
+    """Process-wide registry that lazily loads and shares transformers pipelines
+
+    A pipeline is built the first time it is requested and then reused by every
+    agent, workflow and Streamlit session in the process. Loading is guarded by a
+    per-model lock so concurrent first requests only load the model once.
+    """
+
+    def __init__(self):
+        self._pipelines: Dict[tuple, Any] = {}
+        self._stats: Dict[tuple, Dict[str, Any]] = {}
+        self._locks: Dict[tuple, threading.Lock] = {}
+        self._registry_lock = threading.Lock()
+
+    def _key(self, task: str, model: str, backend: str = 'torch', **kwargs) -> tuple:
+        return (task, model, backend, tuple(sorted(kwargs.items())))
+
+    def _load_pipeline(self, task: str, model: str, backend: str, **kwargs) -> Any:
+        """Build a pipeline for the requested inference backend"""
+        from transformers import pipeline
+
+        if backend == 'torch':
+            return pipeline(task, model=model, **kwargs)
+
+        if backend == 'quantized':
+            # Dynamic int8 quantization of the Linear layers, CPU only
+            import torch
+            loaded = pipeline(task, model=model, device=-1, **kwargs)
+            loaded.model = torch.quantization.quantize_dynamic(
+                loaded.model, {torch.nn.Linear}, dtype=torch.qint8
+            )
+            return loaded
+
+        if backend == 'onnx':
+            if task not in ('ner', 'token-classification'):
+                raise ValueError(f"ONNX backend only supports token classification, not '{task}'")
+            try:
+                from optimum.onnxruntime import ORTModelForTokenClassification
+            except ImportError as e:
+                raise ImportError(
+                    "The 'onnx' backend requires optimum with ONNX Runtime: "
+                    "pip install 'optimum[onnxruntime]'"
+                ) from e
+            from transformers import AutoTokenizer
+            export_dir = self._onnx_export_dir(model)
+            if not os.path.isdir(export_dir):
+                # Export once; later processes load the saved ONNX model directly
+                tmp_dir = f"{export_dir}.tmp-{os.getpid()}"
+                ort_model = ORTModelForTokenClassification.from_pretrained(model, export=True)
+                ort_model.save_pretrained(tmp_dir)
+                AutoTokenizer.from_pretrained(model).save_pretrained(tmp_dir)
+                try:
+                    os.replace(tmp_dir, export_dir)
+                except OSError:
+                    # Another process finished its export first
+                    shutil.rmtree(tmp_dir, ignore_errors=True)
+            ort_model = ORTModelForTokenClassification.from_pretrained(export_dir)
+            tokenizer = AutoTokenizer.from_pretrained(export_dir)
+            return pipeline(task, model=ort_model, tokenizer=tokenizer, **kwargs)
+
+        raise ValueError(f"Unknown backend '{backend}', expected one of {BACKENDS}")
+
+    @staticmethod
+    def _onnx_export_dir(model: str) -> str:
+        """Directory holding the ONNX export of ``model`` (a hub id or a local path)"""
+        name = model.strip('/').replace('/', '--').replace(os.sep, '--')
+        os.makedirs(Config.ONNX_EXPORT_DIR, exist_ok=True)
+        return os.path.join(Config.ONNX_EXPORT_DIR, name)
+
+    def get_pipeline(self, task: str, model: str, backend: str = 'torch', **kwargs) -> Any:
+        """Return the shared pipeline for ``task``/``model``/``backend``, loading it on first use"""
+        key = self._key(task, model, backend, **kwargs)
+        loaded = self._pipelines.get(key)
+        if loaded is not None:
+            return loaded
+
+        with self._registry_lock:
+            lock = self._locks.setdefault(key, threading.Lock())
+
+        with lock:
+            # Another thread may have finished loading while we waited
+            if key in self._pipelines:
+                return self._pipelines[key]
+
+            memory_before = get_resident_memory_mb()
+            start = time.perf_counter()
+            loaded = self._load_pipeline(task, model, backend, **kwargs)
+            load_time = time.perf_counter() - start
+            memory_after = get_resident_memory_mb()
+
+            self._stats[key] = {
+                'task': task,
+                'model': model,
+                'backend': backend,
+                'load_time_seconds': round(load_time, 3),
+                'resident_memory_mb': round(memory_after, 1) if memory_after is not None else None,
+                'memory_delta_mb': round(memory_after - memory_before, 1)
+                if memory_before is not None and memory_after is not None else None,
+                'loaded_at': time.strftime('%Y-%m-%d %H:%M:%S')
+            }
+            self._pipelines[key] = loaded
+            return loaded
+
+    def is_loaded(self, task: str, model: str, backend: str = 'torch', **kwargs) -> bool:
+        """Check whether a pipeline has already been loaded"""
+        return self._key(task, model, backend, **kwargs) in self._pipelines
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Report load time and memory for every loaded model"""
+        return {
+            'loaded_models': list(self._stats.values()),
+            'resident_memory_mb': get_resident_memory_mb()
+        }
+
+    def clear(self):
+        """Drop all loaded pipelines (mainly useful in tests and notebooks)"""
+        with self._registry_lock:
+            self._pipelines.clear()
+            self._stats.clear()
+            self._locks.clear()
+
+
+# Shared registry for the whole process
+model_registry = ModelRegistry()
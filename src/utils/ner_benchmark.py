@@ -0,0 +1,85 @@
+# src/utils/ner_benchmark.py
+
+import statistics
+import time
+from typing import Dict, List, Any, Iterable
+
+from utils.model_registry import model_registry, BACKENDS
+
+
+def entity_signature(entities: List[Dict]) -> List[tuple]:
+    """The part of the NER output that extract_medical_info consumes"""
+    return [(e['entity_group'], e['word']) for e in entities]
+
+
+def compare_ner_backends(notes: List[str], model: str, backends: Iterable[str] = BACKENDS,
+                         reference: str = 'torch', repeats: int = 5) -> Dict[str, Any]:
+    """Check entity parity and latency of each backend against a reference backend
+
+    Returns per-backend median/mean latency per note, load time, and the
+    notes whose ``entity_group``/``word`` output differs from the reference.
+    """
+    outputs = {}
+    report = {}
+
+    for backend in backends:
+        try:
+            ner = model_registry.get_pipeline("ner", model=model, backend=backend,
+                                              aggregation_strategy="simple")
+        except ImportError as e:
+            report[backend] = {'available': False, 'error': str(e)}
+            continue
+
+        # Warm-up run, also used for the parity check
+        outputs[backend] = [entity_signature(ner(note)) for note in notes]
+
+        timings = []
+        for _ in range(repeats):
+            for note in notes:
+                start = time.perf_counter()
+                ner(note)
+                timings.append(time.perf_counter() - start)
+
+        report[backend] = {
+            'available': True,
+            'median_ms': round(statistics.median(timings) * 1000, 2),
+            'mean_ms': round(statistics.mean(timings) * 1000, 2)
+        }
+
+    if reference in outputs:
+        for backend, signatures in outputs.items():
+            mismatches = [
+                {'note': note, 'reference': ref, 'backend': got}
+                for note, ref, got in zip(notes, outputs[reference], signatures)
+                if ref != got
+            ]
+            report[backend]['entities_match'] = not mismatches
+            report[backend]['mismatches'] = mismatches
+            report[backend]['speedup_vs_reference'] = round(
+                report[reference]['median_ms'] / report[backend]['median_ms'], 2
+            ) if report[backend]['median_ms'] else None
+
+    for stats in model_registry.get_stats()['loaded_models']:
+        if stats['model'] == model and stats['backend'] in report:
+            report[stats['backend']]['load_time_seconds'] = stats['load_time_seconds']
+
+    return report
+
+
+# Parity and latency check on the demo patients (run from src/: python -m utils.ner_benchmark)
+if __name__ == "__main__":
+    import json
+    import os
+    import sys
+
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+    from config import Config
+
+    sample_notes = [p['clinical_note'] for p in Config.SAMPLE_PATIENTS if p.get('clinical_note')]
+    results = compare_ner_backends(sample_notes, model=Config.NER_MODEL_NAME)
+    print(json.dumps(results, indent=2))
+
+    failed = [b for b, r in results.items() if r.get('available') and not r.get('entities_match', True)]
+    if failed:
+        print(f"Entity mismatch for backends: {', '.join(failed)}")
+        sys.exit(1)
@@ -0,0 +1,183 @@
+# src/utils/ner_cache.py
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional
+
+
+def normalize_note(text: str) -> str:
+    """Normalize a clinical note for cache keying (whitespace only, case is kept)"""
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def make_cache_key(text: str, model_id: str) -> str:
+    """Content-addressed key for a clinical note under a given model"""
+    payload = f"{model_id}\0{normalize_note(text)}".encode('utf-8')
+    return hashlib.sha256(payload).hexdigest()
+
+
+def _to_plain_entities(entities: List[Dict]) -> List[Dict]:
+    """Convert pipeline output (numpy scores) into plain JSON-friendly dicts"""
+    plain = []
+    for entity in entities:
+        item = {}
+        for key, value in entity.items():
+            if hasattr(value, 'item'):  # numpy scalar
+                value = value.item()
+            item[key] = value
+        plain.append(item)
+    return plain
+
+
+class NERCache:
+    """Two-tier cache for NER results: in-memory LRU plus optional SQLite on disk"""
+
+    def __init__(self, max_entries: int = 10000, db_path: Optional[str] = None,
+                 max_disk_bytes: int = 256 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.db_path = db_path
+        self.max_disk_bytes = max_disk_bytes
+
+        self._memory: "OrderedDict[str, List[Dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        self._disk_bytes = 0
+
+        self.stats = {
+            'memory_hits': 0,
+            'disk_hits': 0,
+            'misses': 0,
+            'memory_evictions': 0,
+            'disk_evictions': 0
+        }
+
+        if db_path:
+            self._open_disk_tier(db_path)
+
+    def _open_disk_tier(self, db_path: str):
+        """Open (or create) the SQLite tier"""
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS ner_cache (
+                   key TEXT PRIMARY KEY,
+                   entities TEXT NOT NULL,
+                   size INTEGER NOT NULL,
+                   last_access REAL NOT NULL
+               )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_ner_cache_access ON ner_cache(last_access)")
+        self._conn.commit()
+        row = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM ner_cache").fetchone()
+        self._disk_bytes = row[0]
+
+    def get(self, key: str) -> Optional[List[Dict]]:
+        """Return cached entities for ``key`` or None on a miss"""
+        with self._lock:
+            entities = self._memory.get(key)
+            if entities is not None:
+                self._memory.move_to_end(key)
+                self.stats['memory_hits'] += 1
+                return [dict(e) for e in entities]
+
+            if self._conn is not None:
+                row = self._conn.execute("SELECT entities FROM ner_cache WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    self._conn.execute("UPDATE ner_cache SET last_access = ? WHERE key = ?", (time.time(), key))
+                    self._conn.commit()
+                    entities = json.loads(row[0])
+                    self._put_memory(key, entities)
+                    self.stats['disk_hits'] += 1
+                    return [dict(e) for e in entities]
+
+            self.stats['misses'] += 1
+            return None
+
+    def put(self, key: str, entities: List[Dict]):
+        """Store entities in both tiers"""
+        entities = _to_plain_entities(entities)
+        with self._lock:
+            self._put_memory(key, entities)
+            if self._conn is not None:
+                self._put_disk(key, entities)
+
+    def _put_memory(self, key: str, entities: List[Dict]):
+        self._memory[key] = entities
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.stats['memory_evictions'] += 1
+
+    def _put_disk(self, key: str, entities: List[Dict]):
+        payload = json.dumps(entities)
+        size = len(payload)
+        previous = self._conn.execute("SELECT size FROM ner_cache WHERE key = ?", (key,)).fetchone()
+        if previous is not None:
+            self._disk_bytes -= previous[0]
+        self._conn.execute(
+            "INSERT OR REPLACE INTO ner_cache (key, entities, size, last_access) VALUES (?, ?, ?, ?)",
+            (key, payload, size, time.time())
+        )
+        self._disk_bytes += size
+
+        # Evict least recently used rows until we are back under the size budget
+        while self._disk_bytes > self.max_disk_bytes:
+            rows = self._conn.execute(
+                "SELECT key, size FROM ner_cache ORDER BY last_access ASC LIMIT 100"
+            ).fetchall()
+            if not rows:
+                break
+            for old_key, old_size in rows:
+                self._conn.execute("DELETE FROM ner_cache WHERE key = ?", (old_key,))
+                self._disk_bytes -= old_size
+                self.stats['disk_evictions'] += 1
+                if self._disk_bytes <= self.max_disk_bytes:
+                    break
+        self._conn.commit()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and tier sizes"""
+        with self._lock:
+            hits = self.stats['memory_hits'] + self.stats['disk_hits']
+            lookups = hits + self.stats['misses']
+            return {
+                **self.stats,
+                'hit_rate': hits / lookups if lookups else 0.0,
+                'memory_entries': len(self._memory),
+                'disk_bytes': self._disk_bytes if self._conn is not None else None
+            }
+
+    def clear(self):
+        """Empty both tiers"""
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM ner_cache")
+                self._conn.commit()
+                self._disk_bytes = 0
+
+
+_shared_cache: Optional[NERCache] = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_ner_cache() -> NERCache:
+    """Return the process-wide NER cache configured from Config"""
+    global _shared_cache
+    if _shared_cache is None:
+        with _shared_cache_lock:
+            if _shared_cache is None:
+                from config import Config
+                _shared_cache = NERCache(
+                    max_entries=Config.NER_CACHE_MAX_ENTRIES,
+                    db_path=Config.NER_CACHE_DB_FILE if Config.NER_CACHE_DISK_ENABLED else None,
+                    max_disk_bytes=Config.NER_CACHE_MAX_DISK_BYTES
+                )
+    return _shared_cache
@@ -0,0 +1,270 @@
+# src/utils/pa_records.py
+
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Any, Optional
+
+# Section keys of the workflow state that hold records
+RECORD_SECTIONS = ('extracted_evidence', 'guideline_compliance', 'risk_assessment', 'final_decision')
+
+
+@dataclass(slots=True)
+class ExtractedEvidence:
+    """Structured patient fields, plus BERT NER output when a clinical note was given"""
+    patient_id: str = ''
+    age: Any = 0
+    gender: str = ''
+    primary_diagnosis: str = ''
+    icd_code: str = ''
+    previous_treatments: List[str] = field(default_factory=list)
+    allergies: str = 'None'
+    medication: str = ''
+    dosage: str = ''
+    duration: str = ''
+    urgency: str = 'Routine'
+    insurance_tier: str = ''
+    prior_auth_history: str = 'None'
+    estimated_cost: Any = 0
+    # None when no clinical note went through NER
+    bert_entities: Optional[List[Dict[str, Any]]] = None
+    diagnosis_bert: List[str] = field(default_factory=list)
+    medications_bert: List[str] = field(default_factory=list)
+
+    @classmethod
+    def from_patient(cls, patient_data: Dict[str, Any]) -> 'ExtractedEvidence':
+        get = patient_data.get
+        return cls(
+            patient_id=get('patient_id', ''),
+            age=get('age', 0),
+            gender=get('gender', ''),
+            primary_diagnosis=get('diagnosis', ''),
+            icd_code=get('icd_code', ''),
+            previous_treatments=get('previous_treatments', []),
+            allergies=get('allergies', 'None'),
+            medication=get('requested_medication', ''),
+            dosage=get('dosage', ''),
+            duration=get('duration', ''),
+            urgency=get('urgency', 'Routine'),
+            insurance_tier=get('insurance_tier', ''),
+            prior_auth_history=get('prior_auth_history', 'None'),
+            estimated_cost=get('cost_per_month', 0)
+        )
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'ExtractedEvidence':
+        """Inverse of to_dict"""
+        demographics = data.get('demographics', {})
+        history = data.get('medical_history', {})
+        request = data.get('current_request', {})
+        insurance = data.get('insurance_info', {})
+        return cls(
+            patient_id=data.get('patient_id', ''),
+            age=demographics.get('age', 0),
+            gender=demographics.get('gender', ''),
+            primary_diagnosis=history.get('primary_diagnosis', ''),
+            icd_code=history.get('icd_code', ''),
+            previous_treatments=history.get('previous_treatments', []),
+            allergies=history.get('allergies', 'None'),
+            medication=request.get('medication', ''),
+            dosage=request.get('dosage', ''),
+            duration=request.get('duration', ''),
+            urgency=request.get('urgency', 'Routine'),
+            insurance_tier=insurance.get('tier', ''),
+            prior_auth_history=insurance.get('prior_auth_history', 'None'),
+            estimated_cost=insurance.get('estimated_cost', 0),
+            bert_entities=data.get('bert_entities'),
+            diagnosis_bert=data.get('diagnosis_bert', []),
+            medications_bert=data.get('medications_bert', [])
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Nested dict in the shape the UI and saved results use"""
+        data = {
+            'patient_id': self.patient_id,
+            'demographics': {
+                'age': self.age,
+                'gender': self.gender,
+            },
+            'medical_history': {
+                'primary_diagnosis': self.primary_diagnosis,
+                'icd_code': self.icd_code,
+                'previous_treatments': self.previous_treatments,
+                'allergies': self.allergies,
+            },
+            'current_request': {
+                'medication': self.medication,
+                'dosage': self.dosage,
+                'duration': self.duration,
+                'urgency': self.urgency,
+            },
+            'insurance_info': {
+                'tier': self.insurance_tier,
+                'prior_auth_history': self.prior_auth_history,
+                'estimated_cost': self.estimated_cost
+            }
+        }
+        if self.bert_entities is not None:
+            data['bert_entities'] = self.bert_entities
+            data['diagnosis_bert'] = self.diagnosis_bert
+            data['medications_bert'] = self.medications_bert
+        return data
+
+
+@dataclass(slots=True)
+class CheckResult:
+    """Outcome of one guideline check"""
+    compliant: bool
+    reason: str
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'compliant': self.compliant, 'reason': self.reason}
+
+
+@dataclass(slots=True)
+class GuidelineCompliance:
+    step_therapy: CheckResult
+    cost_limits: CheckResult
+    guidelines_version: str
+
+    @property
+    def overall_compliant(self) -> bool:
+        return self.step_therapy.compliant and self.cost_limits.compliant
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'step_therapy': self.step_therapy.to_dict(),
+            'cost_limits': self.cost_limits.to_dict(),
+            'overall_compliant': self.overall_compliant,
+            'guidelines_version': self.guidelines_version
+        }
+
+
+# Records may be shared between requests (the decision memo hands the same
+# objects to every hit), so to_dict copies their lists into each result
+@dataclass(slots=True)
+class ClinicalRisk:
+    clinical_risk_score: int
+    risk_level: str
+    risk_factors: List[str]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'clinical_risk_score': self.clinical_risk_score,
+            'risk_level': self.risk_level,
+            'risk_factors': list(self.risk_factors)
+        }
+
+
+@dataclass(slots=True)
+class FinancialRisk:
+    financial_risk: str
+    estimated_monthly_cost: Any
+    adjusted_cost: Any
+    tier: str
+    generic_available: Optional[bool]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'financial_risk': self.financial_risk,
+            'estimated_monthly_cost': self.estimated_monthly_cost,
+            'adjusted_cost': self.adjusted_cost,
+            'tier': self.tier,
+            'generic_available': self.generic_available
+        }
+
+
+@dataclass(slots=True)
+class RiskAssessment:
+    clinical_risk: ClinicalRisk
+    financial_risk: FinancialRisk
+    overall_risk: str
+
+    @property
+    def assessment_summary(self) -> str:
+        return f"Clinical: {self.clinical_risk.risk_level}, Financial: {self.financial_risk.financial_risk}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'clinical_risk': self.clinical_risk.to_dict(),
+            'financial_risk': self.financial_risk.to_dict(),
+            'overall_risk': self.overall_risk,
+            'assessment_summary': self.assessment_summary
+        }
+
+
+@dataclass(slots=True)
+class FinalDecision:
+    decision: str
+    reason: str
+    confidence: float
+    decision_date: str
+    recommendations: List[str]
+    guidelines_version: str
+    # supporting_evidence (guideline_compliant is None when the guidelines were not checked)
+    guideline_compliant: Optional[bool]
+    risk_level: str
+    key_factors: List[str]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'decision': self.decision,
+            'reason': self.reason,
+            'confidence': self.confidence,
+            'decision_date': self.decision_date,
+            'recommendations': list(self.recommendations),
+            'guidelines_version': self.guidelines_version,
+            'supporting_evidence': {
+                'guideline_compliant': self.guideline_compliant,
+                'risk_level': self.risk_level,
+                'key_factors': list(self.key_factors)
+            }
+        }
+
+
+class DeferredAnalysis:
+    """Handle on the background analysis of a request decided on the emergency fast path
+
+    The result is a dict with the record sections (extracted_evidence,
+    guideline_compliance, risk_assessment) plus reasoning_chain and
+    completed_at, filled in once the analysis finishes.
+    """
+    __slots__ = ('_future',)
+
+    def __init__(self, future: Future):
+        self._future = future
+
+    def done(self) -> bool:
+        return self._future.done()
+
+    def result(self, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Wait for the analysis (up to ``timeout`` seconds) and return it"""
+        return self._future.result(timeout)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Current status, with the analysis as dicts once it has completed"""
+        if not self._future.done():
+            return {'status': 'pending'}
+        error = self._future.exception()
+        if error is not None:
+            return {'status': 'failed', 'error_message': str(error)}
+        return {'status': 'completed', **state_to_dict(self._future.result())}
+
+    def add_done_callback(self, callback: Callable[['DeferredAnalysis'], None]):
+        """Call ``callback(self)`` once the analysis has finished (at once if it already has)"""
+        self._future.add_done_callback(lambda _: callback(self))
+
+
+def state_to_dict(state: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy of a workflow state with every record section converted to a dict (missing sections become {})
+
+    Sections that are already dicts are kept as they are.
+    """
+    result = dict(state)
+    for key in RECORD_SECTIONS:
+        if key in result:
+            section = result[key]
+            if section is None:
+                result[key] = {}
+            elif not isinstance(section, dict):
+                result[key] = section.to_dict()
+    return result
@@ -0,0 +1,77 @@
+# src/utils/patient_fields.py
+
+import ast
+import re
+from functools import lru_cache
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Everything except letters, digits and '/' (combination products) separates words
+_NAME_SEPARATORS = r'[^a-z0-9/]+'
+
+# read_csv options for patient files: only empty cells are missing, so text
+# values such as allergies="None" or "NA" are kept as written
+PATIENT_CSV_OPTIONS = {'keep_default_na': False, 'na_values': ['']}
+
+
+def normalize_name(name: Any) -> str:
+    """Normalize a drug or diagnosis name for lookups (case, spacing and punctuation)"""
+    if not isinstance(name, str):
+        return ''
+    return re.sub(_NAME_SEPARATORS, ' ', name.lower()).strip()
+
+
+def normalize_names(names):
+    """Vectorized normalize_name for a pandas Series"""
+    return names.astype(str).str.lower().str.replace(_NAME_SEPARATORS, ' ', regex=True).str.strip()
+
+
+@lru_cache(maxsize=4096)
+def _parse_treatment_text(text: str) -> Tuple[str, ...]:
+    """Parse the text form of a treatment list (cached, files repeat the same lists)"""
+    text = text.strip()
+    if not text:
+        return ()
+    try:
+        parsed = ast.literal_eval(text)
+        if isinstance(parsed, (list, tuple)):
+            return tuple(str(item) for item in parsed)
+    except (ValueError, SyntaxError):
+        pass
+    return tuple(t.strip() for t in text.split(',') if t.strip())
+
+
+def parse_previous_treatments(value: Any) -> List[str]:
+    """Normalize a previous_treatments cell into a list of drug names
+
+    Patient CSV files store the list as its Python repr (``"['A', 'B']"``),
+    custom entries use comma-separated text, and Parquet/Arrow gives arrays.
+    """
+    if value is None:
+        return []
+    if isinstance(value, list):
+        return value
+    if isinstance(value, float):  # NaN from a missing CSV cell
+        return []
+    if isinstance(value, str):
+        return list(_parse_treatment_text(value))
+    return [str(item) for item in value]
+
+
+def row_to_patient(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Turn a patient file row into the dict shape process_pa_request expects"""
+    patient = {}
+    for key, value in row.items():
+        if isinstance(value, np.generic):
+            value = value.item()
+        # Missing cells fall back to the agents' own defaults
+        if value is None or (isinstance(value, float) and pd.isna(value)):
+            continue
+        patient[key] = value
+
+    if 'previous_treatments' in patient:
+        patient['previous_treatments'] = parse_previous_treatments(patient['previous_treatments'])
+
+    return patient
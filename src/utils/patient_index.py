@@ -0,0 +1,139 @@
+# src/utils/patient_index.py
+
+from typing import Dict, List, Any, Iterator, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils.patient_fields import normalize_name, normalize_names
+
+# Columns with a hashed primary index (value -> row positions)
+KEY_COLUMNS = ('patient_id', 'member_id')
+# Columns with an inverted index (normalized value -> sorted row positions)
+INDEXED_COLUMNS = ('diagnosis', 'requested_medication', 'insurance_tier', 'urgency')
+
+_EMPTY = np.empty(0, dtype=np.int64)
+
+
+class _InvertedIndex:
+    """Posting lists for one column, plus sorted keys for prefix matching"""
+
+    def __init__(self, values: pd.Series):
+        # Normalize each distinct value once, then map the row codes onto the normalized keys
+        raw_codes, raw_uniques = pd.factorize(values)
+        key_codes, keys = pd.factorize(normalize_names(pd.Series(raw_uniques, dtype=object)).to_numpy(), sort=True)
+        codes = np.where(raw_codes >= 0, key_codes[raw_codes], -1) if len(key_codes) else raw_codes
+
+        # Stable sort keeps the positions inside each posting list in row order
+        order = np.argsort(codes, kind='stable')
+        counts = np.bincount(codes[codes >= 0], minlength=len(keys))
+        # Rows with a missing value (code -1) sort first; skip them
+        postings = np.split(order[int((codes < 0).sum()):], np.cumsum(counts)[:-1])
+
+        self.keys = np.asarray(keys, dtype=object)
+        self.postings: Dict[str, np.ndarray] = dict(zip(keys, postings))
+
+    def exact(self, value: Any) -> np.ndarray:
+        return self.postings.get(normalize_name(str(value)), _EMPTY)
+
+    def prefix(self, value: Any) -> np.ndarray:
+        prefix = normalize_name(str(value))
+        lo = np.searchsorted(self.keys, prefix, side='left')
+        hi = np.searchsorted(self.keys, prefix + '\uffff', side='right')
+        if hi - lo == 1:
+            return self.postings[self.keys[lo]]
+        if hi == lo:
+            return _EMPTY
+        return np.sort(np.concatenate([self.postings[key] for key in self.keys[lo:hi]]))
+
+
+class _KeyIndex:
+    """Hashed exact-match index for an ID column (IDs may repeat, e.g. member_id)"""
+
+    def __init__(self, values: pd.Series):
+        self.index = pd.Index(values.astype(str).to_numpy())
+
+    def exact(self, value: Any) -> np.ndarray:
+        if str(value) not in self.index:
+            return _EMPTY
+        positions = self.index.get_indexer_non_unique([str(value)])[0]
+        return np.sort(positions)
+
+
+class PatientIndex:
+    """Hash and inverted indexes over a patient table
+
+    ``patient_id``/``member_id`` lookups are a single hash lookup; searches on
+    indexed columns intersect posting lists smallest-first before any row is
+    read, and only the surviving rows are checked against unindexed criteria.
+    """
+
+    def __init__(self, patients_df: pd.DataFrame):
+        self.df = patients_df
+        self.primary: Dict[str, _KeyIndex] = {
+            column: _KeyIndex(patients_df[column])
+            for column in KEY_COLUMNS if column in patients_df.columns
+        }
+        self.indexes: Dict[str, _InvertedIndex] = {
+            column: _InvertedIndex(patients_df[column])
+            for column in INDEXED_COLUMNS if column in patients_df.columns
+        }
+
+    def get(self, value: str, column: str = 'patient_id') -> Optional[Dict]:
+        """First row whose key column equals ``value``, or None"""
+        index = self.primary.get(column)
+        positions = index.exact(value) if index is not None else _EMPTY
+        if not len(positions):
+            return None
+        return self.df.iloc[int(positions[0])].to_dict()
+
+    def plan(self, criteria: Dict[str, Any], prefix: bool = False) -> Tuple[np.ndarray, List[str]]:
+        """Candidate row positions from the indexed criteria, plus the criteria left to filter"""
+        postings = []
+        residual = []
+        for column, value in criteria.items():
+            if column in self.indexes:
+                index = self.indexes[column]
+                postings.append(index.prefix(value) if prefix else index.exact(value))
+            elif column in self.primary and not prefix:
+                postings.append(self.primary[column].exact(value))
+            else:
+                residual.append(column)
+
+        if not postings:
+            return np.arange(len(self.df)), residual
+
+        # Intersect smallest-first so every step works on the shortest list
+        postings.sort(key=len)
+        candidates = postings[0]
+        for posting in postings[1:]:
+            if not len(candidates):
+                break
+            # Posting lists are sorted: binary-search each candidate in the longer list
+            found = np.searchsorted(posting, candidates)
+            found[found == len(posting)] = 0
+            candidates = candidates[posting[found] == candidates] if len(posting) else _EMPTY
+        return candidates, residual
+
+    def search(self, prefix: bool = False, chunk_size: int = 1000, **criteria) -> Iterator[Dict]:
+        """Lazily yield the rows matching every criterion
+
+        Indexed columns match the normalized value exactly, or as a prefix when
+        ``prefix`` is True. Other string columns fall back to a case-insensitive
+        substring (or prefix) match and non-strings to equality, on candidate
+        rows only.
+        """
+        criteria = {key: value for key, value in criteria.items() if key in self.df.columns}
+        candidates, residual = self.plan(criteria, prefix)
+
+        for start in range(0, len(candidates), chunk_size):
+            chunk = self.df.iloc[candidates[start:start + chunk_size]]
+            for column in residual:
+                value = criteria[column]
+                if isinstance(value, str):
+                    text = chunk[column].astype(str).str.lower()
+                    matched = text.str.startswith(value.lower()) if prefix else text.str.contains(value.lower(), regex=False)
+                    chunk = chunk[matched]
+                else:
+                    chunk = chunk[chunk[column] == value]
+            yield from chunk.to_dict('records')
@@ -0,0 +1,166 @@
+# src/utils/patient_store.py
+
+import os
+import threading
+from typing import Dict, Any, Optional
+
+import pandas as pd
+
+from config import Config
+from utils.patient_fields import PATIENT_CSV_OPTIONS, parse_previous_treatments
+from utils.patient_index import PatientIndex
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet is optional; the store falls back to pickle
+    pa = None
+    pq = None
+
+# Low-cardinality columns stored as categoricals (codes + one copy of each label)
+CATEGORICAL_COLUMNS = ('gender', 'diagnosis', 'icd_code', 'insurance_tier',
+                       'prior_auth_history', 'urgency', 'duration', 'allergies')
+INTEGER_COLUMNS = ('age', 'cost_per_month')
+
+
+def normalize_patient_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Give a raw patient table typed columns: categoricals, integers and list-typed treatments"""
+    df = df.copy()
+    for column in CATEGORICAL_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].astype('category')
+    for column in INTEGER_COLUMNS:
+        if column in df.columns:
+            df[column] = pd.to_numeric(df[column], errors='coerce', downcast='integer')
+    if 'previous_treatments' in df.columns:
+        df['previous_treatments'] = df['previous_treatments'].map(parse_previous_treatments)
+    return df
+
+
+def patient_overview(df: pd.DataFrame) -> Dict[str, Any]:
+    """Headline figures for a patient table: size, mean age and cost, urgent cases"""
+    return {
+        'total_patients': len(df),
+        'average_age': float(df['age'].mean()) if 'age' in df.columns and len(df) else 0.0,
+        'average_cost': float(df['cost_per_month'].mean()) if 'cost_per_month' in df.columns and len(df) else 0.0,
+        'urgent_count': int((df['urgency'] == 'Urgent').sum()) if 'urgency' in df.columns else 0
+    }
+
+
+class PatientStore:
+    """Typed, columnar copy of the patient CSV
+
+    The CSV is converted once into a Parquet file (or a pickle when pyarrow is
+    not installed) and re-converted only when the CSV is newer. Loads read the
+    columnar file memory-mapped and keep the resulting DataFrame in memory, so
+    repeated loads only cost an mtime check.
+    """
+
+    def __init__(self, source_path: str, store_path: Optional[str] = None):
+        self.source_path = source_path
+        if store_path is None:
+            store_path = os.path.splitext(source_path)[0] + ('.parquet' if pq is not None else '.pkl')
+        self.store_path = store_path
+
+        self._lock = threading.Lock()
+        self._df: Optional[pd.DataFrame] = None
+        self._mtime: Optional[float] = None
+        self._index: Optional[PatientIndex] = None
+        # (table the overview was computed from, overview)
+        self._overview: Optional[tuple] = None
+
+    @property
+    def use_parquet(self) -> bool:
+        return pq is not None and self.store_path.endswith('.parquet')
+
+    @staticmethod
+    def _mtime_of(path: str) -> Optional[float]:
+        try:
+            return os.stat(path).st_mtime
+        except FileNotFoundError:
+            return None
+
+    def exists(self) -> bool:
+        """True if either the CSV or its columnar copy is on disk"""
+        return os.path.exists(self.store_path) or os.path.exists(self.source_path)
+
+    def needs_conversion(self) -> bool:
+        """True if the columnar copy is missing or older than the CSV"""
+        source_mtime = self._mtime_of(self.source_path)
+        if source_mtime is None:
+            return False
+        store_mtime = self._mtime_of(self.store_path)
+        return store_mtime is None or store_mtime < source_mtime
+
+    def convert(self) -> str:
+        """Convert the CSV into the columnar store and return the store path"""
+        df = normalize_patient_frame(pd.read_csv(self.source_path, **PATIENT_CSV_OPTIONS))
+        self.write(df)
+        print(f"Converted {len(df)} patient records to {self.store_path}")
+        return self.store_path
+
+    def write(self, df: pd.DataFrame):
+        """Write a patient table to the store (atomically, via a temp file)"""
+        tmp_path = f"{self.store_path}.tmp"
+        if self.use_parquet:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            pq.write_table(table, tmp_path)
+        else:
+            df.to_pickle(tmp_path)
+        os.replace(tmp_path, self.store_path)
+
+    def _read(self) -> pd.DataFrame:
+        if self.use_parquet:
+            return pq.read_table(self.store_path, memory_map=True).to_pandas()
+        return pd.read_pickle(self.store_path)
+
+    def load(self) -> Optional[pd.DataFrame]:
+        """Patient table, converting the CSV first if needed; None if there is no data"""
+        with self._lock:
+            if self.needs_conversion():
+                self.convert()
+            mtime = self._mtime_of(self.store_path)
+            if mtime is None:
+                return None
+            if self._df is None or mtime != self._mtime:
+                self._df = self._read()
+                self._mtime = mtime
+            return self._df
+
+    def index(self) -> Optional[PatientIndex]:
+        """Lookup/search index over the current table, rebuilt when the table reloads"""
+        df = self.load()
+        if df is None:
+            return None
+        index = self._index
+        if index is None or index.df is not df:
+            index = self._index = PatientIndex(df)
+        return index
+
+
+    def overview(self) -> Optional[Dict[str, Any]]:
+        """patient_overview of the current table, recomputed only when the table reloads"""
+        df = self.load()
+        if df is None:
+            return None
+        cached = self._overview
+        if cached is None or cached[0] is not df:
+            cached = self._overview = (df, patient_overview(df))
+        return cached[1]
+
+_stores: Dict[str, PatientStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_patient_store(source_path: Optional[str] = None) -> PatientStore:
+    """Process-wide store for a patient CSV (defaults to Config.SYNTHETIC_PATIENTS_FILE)"""
+    source_path = source_path or Config.SYNTHETIC_PATIENTS_FILE
+    store = _stores.get(source_path)
+    if store is None:
+        with _stores_lock:
+            store = _stores.get(source_path)
+            if store is None:
+                store = PatientStore(source_path)
+                _stores[source_path] = store
+    return store
+
@@ -0,0 +1,172 @@
+# src/utils/profiling.py
+
+import cProfile
+import functools
+import io
+import math
+import pstats
+import threading
+import time
+import tracemalloc
+from collections import deque
+from typing import Dict, List, Any, Callable, Optional
+
+# Metrics recorded for every node run
+METRIC_NAMES = ('wall_ms', 'cpu_ms', 'peak_alloc_kb')
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = math.ceil(pct / 100 * len(sorted_values))
+    return sorted_values[min(max(rank, 1), len(sorted_values)) - 1]
+
+
+class NodeProfiler:
+    """Per-node timing for the LangGraph workflow
+
+    Each instrumented node records wall time, CPU time and (optionally) peak
+    Python allocation into the request's ``node_metrics`` and into a rolling
+    window per node, from which p50/p95/p99 are reported.
+    """
+
+    def __init__(self, window_size: int = 1000, track_memory: bool = False):
+        self.window_size = window_size
+        self.track_memory = track_memory
+        self._samples: Dict[str, Dict[str, deque]] = {}
+        self._lock = threading.Lock()
+
+    def _window(self, node_name: str) -> Dict[str, deque]:
+        samples = self._samples.get(node_name)
+        if samples is None:
+            with self._lock:
+                samples = self._samples.setdefault(
+                    node_name, {name: deque(maxlen=self.window_size) for name in METRIC_NAMES}
+                )
+        return samples
+
+    def record(self, node_name: str, metrics: Dict[str, Optional[float]]):
+        """Add one node run to the rolling window"""
+        window = self._window(node_name)
+        for name in METRIC_NAMES:
+            if metrics.get(name) is not None:
+                window[name].append(metrics[name])
+
+    def instrument(self, node_name: str, node_func: Callable[[Dict], Dict]) -> Callable[[Dict], Dict]:
+        """Wrap a node function so every call is measured"""
+
+        @functools.wraps(node_func)
+        def wrapper(state: Dict) -> Dict:
+            # tracemalloc is process-wide, so peaks overlap when requests run concurrently
+            started_tracing = False
+            if self.track_memory:
+                if not tracemalloc.is_tracing():
+                    tracemalloc.start()
+                    started_tracing = True
+                tracemalloc.reset_peak()
+
+            wall_start = time.perf_counter()
+            cpu_start = time.thread_time()
+            result = node_func(state)
+            cpu_ms = (time.thread_time() - cpu_start) * 1000
+            wall_ms = (time.perf_counter() - wall_start) * 1000
+
+            peak_alloc_kb = None
+            if self.track_memory:
+                peak_alloc_kb = tracemalloc.get_traced_memory()[1] / 1024
+                if started_tracing:
+                    tracemalloc.stop()
+
+            metrics = {
+                'wall_ms': round(wall_ms, 3),
+                'cpu_ms': round(cpu_ms, 3),
+                'peak_alloc_kb': round(peak_alloc_kb, 1) if peak_alloc_kb is not None else None
+            }
+            self.record(node_name, metrics)
+            node_metrics = result.get('node_metrics') or {}
+            # Keep any metrics the node reported about itself
+            result['node_metrics'] = {**node_metrics, node_name: {**node_metrics.get(node_name, {}), **metrics}}
+            return result
+
+        return wrapper
+
+    def get_percentiles(self) -> Dict[str, Dict[str, Any]]:
+        """p50/p95/p99 per node and metric over the rolling window"""
+        report = {}
+        with self._lock:
+            nodes = list(self._samples.items())
+        for node_name, window in nodes:
+            node_report = {'count': len(window['wall_ms'])}
+            for name in METRIC_NAMES:
+                values = sorted(window[name])
+                if values:
+                    node_report[name] = {
+                        'p50': percentile(values, 50),
+                        'p95': percentile(values, 95),
+                        'p99': percentile(values, 99)
+                    }
+            report[node_name] = node_report
+        return report
+
+    def reset(self):
+        """Forget all recorded samples"""
+        with self._lock:
+            self._samples.clear()
+
+
+def profile_call(func: Callable, *args, output_path: Optional[str] = None,
+                 engine: str = 'cprofile', **kwargs) -> Dict[str, Any]:
+    """Run ``func`` once under cProfile or pyinstrument and dump the profile
+
+    Returns the function result and a short text report. With ``output_path``
+    the raw cProfile stats (or the pyinstrument HTML report) are written there.
+    """
+    if engine == 'pyinstrument':
+        try:
+            from pyinstrument import Profiler
+        except ImportError as e:
+            raise ImportError("pyinstrument is not installed: pip install pyinstrument") from e
+        profiler = Profiler()
+        profiler.start()
+        try:
+            result = func(*args, **kwargs)
+        finally:
+            profiler.stop()
+        if output_path:
+            with open(output_path, 'w') as f:
+                f.write(profiler.output_html())
+        return {'result': result, 'report': profiler.output_text()}
+
+    if engine != 'cprofile':
+        raise ValueError(f"Unknown profiling engine '{engine}', expected 'cprofile' or 'pyinstrument'")
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        result = func(*args, **kwargs)
+    finally:
+        profiler.disable()
+    if output_path:
+        profiler.dump_stats(output_path)
+    stream = io.StringIO()
+    pstats.Stats(profiler, stream=stream).sort_stats('cumulative').print_stats(25)
+    return {'result': result, 'report': stream.getvalue()}
+
+
+_shared_profiler: Optional[NodeProfiler] = None
+_shared_profiler_lock = threading.Lock()
+
+
+def get_workflow_profiler() -> NodeProfiler:
+    """Return the process-wide profiler shared by every workflow"""
+    global _shared_profiler
+    if _shared_profiler is None:
+        with _shared_profiler_lock:
+            if _shared_profiler is None:
+                from config import Config
+                _shared_profiler = NodeProfiler(
+                    window_size=Config.PROFILE_WINDOW_SIZE,
+                    track_memory=Config.PROFILE_TRACK_MEMORY
+                )
+    return _shared_profiler
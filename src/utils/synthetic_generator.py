@@ -0,0 +1,391 @@
+# src/utils/synthetic_generator.py
+
+import argparse
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from itertools import permutations
+from typing import Dict, List, Any, Optional
+
+import numpy as np
+import pandas as pd
+
+from config import Config
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet output is optional
+    pa = None
+    pq = None
+
+# Medical conditions with realistic treatment patterns
+MEDICAL_SCENARIOS = [
+    {
+        'diagnosis': 'Rheumatoid Arthritis',
+        'icd_code': 'M05.9',
+        'medications': ['Methotrexate', 'Adalimumab', 'Etanercept', 'Rituximab'],
+        'typical_age_range': (25, 70),
+        'common_allergies': ['None', 'Penicillin', 'Sulfa']
+    },
+    {
+        'diagnosis': 'Type 2 Diabetes',
+        'icd_code': 'E11.9',
+        'medications': ['Metformin', 'Insulin', 'Semaglutide', 'Liraglutide'],
+        'typical_age_range': (35, 80),
+        'common_allergies': ['None', 'NKDA']
+    },
+    {
+        'diagnosis': 'Hypertension',
+        'icd_code': 'I10',
+        'medications': ['Lisinopril', 'Amlodipine', 'Losartan', 'Metoprolol'],
+        'typical_age_range': (40, 85),
+        'common_allergies': ['None', 'ACE inhibitor allergy']
+    },
+    {
+        'diagnosis': 'Asthma',
+        'icd_code': 'J45.9',
+        'medications': ['Albuterol', 'Fluticasone', 'Montelukast', 'Budesonide'],
+        'typical_age_range': (5, 75),
+        'common_allergies': ['None', 'Aspirin', 'Beta-blocker allergy']
+    },
+    {
+        'diagnosis': 'Depression',
+        'icd_code': 'F32.9',
+        'medications': ['Sertraline', 'Escitalopram', 'Bupropion', 'Venlafaxine'],
+        'typical_age_range': (18, 80),
+        'common_allergies': ['None', 'SSRI intolerance']
+    },
+    {
+        'diagnosis': 'COPD',
+        'icd_code': 'J44.1',
+        'medications': ['Tiotropium', 'Budesonide/Formoterol', 'Albuterol', 'Roflumilast'],
+        'typical_age_range': (45, 85),
+        'common_allergies': ['None', 'Beta-agonist allergy']
+    },
+    {
+        'diagnosis': 'Migraine',
+        'icd_code': 'G43.9',
+        'medications': ['Sumatriptan', 'Topiramate', 'Propranolol', 'Botox'],
+        'typical_age_range': (15, 65),
+        'common_allergies': ['None', 'Triptan allergy']
+    },
+    {
+        'diagnosis': 'High Cholesterol',
+        'icd_code': 'E78.5',
+        'medications': ['Atorvastatin', 'Simvastatin', 'Rosuvastatin', 'Ezetimibe'],
+        'typical_age_range': (30, 80),
+        'common_allergies': ['None', 'Statin intolerance']
+    }
+]
+
+DOSAGE_MAP = {
+    'Methotrexate': '15mg weekly',
+    'Adalimumab': '40mg subcutaneous bi-weekly',
+    'Metformin': '500mg twice daily',
+    'Insulin': '20 units subcutaneous daily',
+    'Semaglutide': '1mg subcutaneous weekly',
+    'Lisinopril': '10mg daily',
+    'Amlodipine': '5mg daily',
+    'Albuterol': '2 puffs every 4-6 hours as needed',
+    'Sertraline': '50mg daily',
+    'Atorvastatin': '20mg daily'
+}
+
+COST_MAP = {
+    'Methotrexate': 25,
+    'Adalimumab': 2500,
+    'Metformin': 15,
+    'Insulin': 200,
+    'Semaglutide': 800,
+    'Lisinopril': 10,
+    'Amlodipine': 12,
+    'Albuterol': 30,
+    'Sertraline': 20,
+    'Atorvastatin': 18
+}
+
+# Value -> relative weight; diagnosis weights default to uniform
+DEFAULT_DISTRIBUTIONS = {
+    'diagnosis': {scenario['diagnosis']: 1 for scenario in MEDICAL_SCENARIOS},
+    'insurance_tier': {'Tier 1': 40, 'Tier 2': 30, 'Tier 3': 20, 'Tier 4': 10},
+    'prior_auth_history': {'None': 50, 'Approved': 30, 'Denied': 15, 'Pending': 5},
+    'urgency': {'Routine': 80, 'Urgent': 15, 'Emergency': 5},
+}
+
+GENDERS = np.array(['M', 'F'], dtype=object)
+DURATIONS = np.array(['3 months', '6 months', '12 months', '18 months'], dtype=object)
+PROVIDERS = np.array([f'Dr. {name}' for name in ["Smith", "Johnson", "Williams", "Brown", "Jones"]], dtype=object)
+MAX_PREVIOUS_TREATMENTS = 3
+
+
+class _ScenarioTables:
+    """Scenario attributes as arrays so a whole chunk is sampled with fancy indexing"""
+
+    def __init__(self, distributions: Dict[str, Dict[str, float]]):
+        scenarios = [s for s in MEDICAL_SCENARIOS if s['diagnosis'] in distributions['diagnosis']]
+        n_meds = len(scenarios[0]['medications'])
+        max_allergies = max(len(s['common_allergies']) for s in scenarios)
+
+        self.diagnosis = np.array([s['diagnosis'] for s in scenarios], dtype=object)
+        self.icd_code = np.array([s['icd_code'] for s in scenarios], dtype=object)
+        self.medications = np.array([s['medications'] for s in scenarios], dtype=object)
+        self.age_min = np.array([s['typical_age_range'][0] for s in scenarios])
+        self.age_max = np.array([s['typical_age_range'][1] for s in scenarios])
+        self.allergies = np.array(
+            [s['common_allergies'] + [''] * (max_allergies - len(s['common_allergies'])) for s in scenarios],
+            dtype=object
+        )
+        self.n_allergies = np.array([len(s['common_allergies']) for s in scenarios])
+        # Dosage and cost follow each scenario's first medication
+        self.dosage = np.array([DOSAGE_MAP.get(s['medications'][0], '1 tablet daily') for s in scenarios], dtype=object)
+        self.cost = np.array([COST_MAP.get(s['medications'][0], -1) for s in scenarios])
+        self.n_meds = n_meds
+        self.weights = _probabilities([distributions['diagnosis'][d] for d in self.diagnosis])
+
+        # Text of every ordered treatment list, indexed by [scenario, treatment_code(...)]
+        self.treatment_text = np.empty((len(scenarios), (n_meds + 1) ** MAX_PREVIOUS_TREATMENTS), dtype=object)
+        for row, s in enumerate(scenarios):
+            for picks in _ordered_subsets(n_meds, MAX_PREVIOUS_TREATMENTS):
+                code = sum((pick + 1) * (n_meds + 1) ** j for j, pick in enumerate(picks))
+                self.treatment_text[row, code] = str([s['medications'][pick] for pick in picks])
+
+
+def _ordered_subsets(n: int, max_len: int):
+    """Every ordered selection of up to ``max_len`` distinct indices out of ``n``"""
+    for length in range(max_len + 1):
+        yield from permutations(range(n), length)
+
+
+def _probabilities(weights: List[float]) -> np.ndarray:
+    weights = np.asarray(weights, dtype=float)
+    return weights / weights.sum()
+
+
+def _sample(rng: np.random.Generator, distribution: Dict[str, float], size: int) -> np.ndarray:
+    values = np.array(list(distribution), dtype=object)
+    return values[rng.choice(len(values), size=size, p=_probabilities(list(distribution.values())))]
+
+
+def _join(*parts) -> np.ndarray:
+    """Element-wise string concatenation of arrays and scalars"""
+    result = pd.Series(parts[0]) if isinstance(parts[0], np.ndarray) else parts[0]
+    for part in parts[1:]:
+        result = result + (pd.Series(part) if isinstance(part, np.ndarray) else part)
+    return result.to_numpy(dtype=object)
+
+
+def generate_chunk(start: int, size: int, seed: Optional[int] = None,
+                   distributions: Optional[Dict[str, Dict[str, float]]] = None,
+                   id_width: int = 6) -> Dict[str, Any]:
+    """Sample ``size`` patients numbered from ``start + 1``, as column arrays
+
+    Each chunk draws from its own generator seeded with ``(seed, start)``, so
+    a seeded run produces the same rows however many processes generate it.
+    ``previous_treatments`` is returned flattened with ``offsets`` (Arrow list
+    layout) alongside its text form.
+    """
+    distributions = {**DEFAULT_DISTRIBUTIONS, **(distributions or {})}
+    tables = _ScenarioTables(distributions)
+    rng = np.random.default_rng(None if seed is None else [seed, start])
+
+    scenario = rng.choice(len(tables.diagnosis), size=size, p=tables.weights)
+    numbers = np.arange(start + 1, start + size + 1)
+    meds = tables.medications[scenario]
+
+    # Previous treatments: 0-3 distinct medications of the scenario, in random order
+    order = np.argsort(rng.random((size, tables.n_meds)), axis=1)
+    n_previous = rng.integers(0, MAX_PREVIOUS_TREATMENTS + 1, size=size)
+    taken = np.arange(tables.n_meds) < n_previous[:, None]
+    flat_treatments = np.take_along_axis(meds, order, axis=1)[taken]
+    offsets = np.concatenate([[0], np.cumsum(n_previous)]).astype(np.int64)
+    # Encode each row's picks in base (n_meds + 1) to look up the CSV text
+    place_values = (tables.n_meds + 1) ** np.arange(MAX_PREVIOUS_TREATMENTS)
+    codes = ((order[:, :MAX_PREVIOUS_TREATMENTS] + 1) * taken[:, :MAX_PREVIOUS_TREATMENTS]) @ place_values
+    treatments_text = tables.treatment_text[scenario, codes]
+
+    # Note: one prescribed medication, two prior treatments and one allergy, drawn independently
+    note_order = np.argsort(rng.random((size, tables.n_meds)), axis=1)[:, :2]
+    note_prior = np.take_along_axis(meds, note_order, axis=1)
+    allergy = tables.allergies[scenario, (rng.random(size) * tables.n_allergies[scenario]).astype(int)]
+    note_allergy = tables.allergies[scenario, (rng.random(size) * tables.n_allergies[scenario]).astype(int)]
+    note_med = meds[np.arange(size), rng.integers(0, tables.n_meds, size=size)]
+
+    cost = tables.cost[scenario]
+    cost = np.where(cost < 0, rng.integers(20, 501, size=size), cost)
+
+    today = datetime.now()
+    dates = np.array([(today - timedelta(days=d)).strftime('%Y-%m-%d') for d in range(31)], dtype=object)
+    ids = pd.Series(numbers).astype(str).str.zfill(id_width).to_numpy(dtype=object)
+
+    return {
+        'patient_id': _join('PT', ids),
+        'name': _join('Patient ', numbers.astype(str)),
+        'age': rng.integers(tables.age_min[scenario], tables.age_max[scenario] + 1),
+        'gender': GENDERS[rng.integers(0, 2, size=size)],
+        'diagnosis': tables.diagnosis[scenario],
+        'icd_code': tables.icd_code[scenario],
+        'requested_medication': meds[np.arange(size), rng.integers(0, tables.n_meds, size=size)],
+        'dosage': tables.dosage[scenario],
+        'duration': DURATIONS[rng.integers(0, len(DURATIONS), size=size)],
+        'previous_treatments': treatments_text,
+        'allergies': allergy,
+        'insurance_tier': _sample(rng, distributions['insurance_tier'], size),
+        'prior_auth_history': _sample(rng, distributions['prior_auth_history'], size),
+        'cost_per_month': cost,
+        'urgency': _sample(rng, distributions['urgency'], size),
+        'provider_name': PROVIDERS[rng.integers(0, len(PROVIDERS), size=size)],
+        'submission_date': dates[rng.integers(0, len(dates), size=size)],
+        'member_id': _join('MBR', rng.integers(100000, 1000000, size=size).astype(str)),
+        'clinical_note': _join(
+            'Patient with ', tables.diagnosis[scenario], ' on ', note_med,
+            '. Prior treatments: ', note_prior[:, 0], ', ', note_prior[:, 1],
+            '. Allergies: ', note_allergy, '.'
+        ),
+        'flat_treatments': flat_treatments,
+        'offsets': offsets,
+    }
+
+
+def _to_frame(chunk: Dict[str, Any]) -> pd.DataFrame:
+    return pd.DataFrame({k: v for k, v in chunk.items() if k not in ('flat_treatments', 'offsets')})
+
+
+def _to_table(chunk: Dict[str, Any]):
+    columns = {k: v for k, v in chunk.items() if k not in ('flat_treatments', 'offsets', 'previous_treatments')}
+    table = pa.table(columns)
+    treatments = pa.ListArray.from_arrays(pa.array(chunk['offsets'], type=pa.int32()),
+                                          pa.array(chunk['flat_treatments'], type=pa.string()))
+    # Keep the CSV column order
+    return table.add_column(list(chunk).index('previous_treatments'), 'previous_treatments', treatments)
+
+
+def _write_part(path: str, start: int, size: int, seed: Optional[int],
+                distributions: Optional[Dict], id_width: int) -> str:
+    """Generate one chunk into its own part file (runs in a worker process)"""
+    chunk = generate_chunk(start, size, seed, distributions, id_width)
+    if path.endswith('.parquet'):
+        pq.write_table(_to_table(chunk), path)
+    else:
+        _to_frame(chunk).to_csv(path, index=False, header=start == 0)
+    return path
+
+
+class _OutputWriter:
+    """Append chunks to a CSV or Parquet file, one row group per chunk"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.parquet = path.endswith('.parquet')
+        if self.parquet and pq is None:
+            raise ImportError("pyarrow is required to write Parquet files")
+        self._writer = None
+        self._file = None
+
+    def write_chunk(self, chunk: Dict[str, Any]):
+        if self.parquet:
+            table = _to_table(chunk)
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.path, table.schema)
+            self._writer.write_table(table)
+        else:
+            if self._file is None:
+                self._file = open(self.path, 'w', newline='')
+            _to_frame(chunk).to_csv(self._file, index=False, header=self._file.tell() == 0)
+
+    def append_part(self, part_path: str):
+        if self.parquet:
+            # Each part holds one chunk, so memory stays at one chunk here too
+            table = pq.read_table(part_path)
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.path, table.schema)
+            self._writer.write_table(table)
+        else:
+            if self._file is None:
+                self._file = open(self.path, 'w', newline='')
+            with open(part_path, 'r', newline='') as part:
+                shutil.copyfileobj(part, self._file)
+        os.remove(part_path)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+        if self._file is not None:
+            self._file.close()
+
+
+def generate_patients(output_path: str, n_rows: int,
+                      chunk_size: int = Config.SYNTHETIC_CHUNK_SIZE,
+                      seed: Optional[int] = None,
+                      distributions: Optional[Dict[str, Dict[str, float]]] = None,
+                      workers: int = 1) -> int:
+    """Stream ``n_rows`` synthetic patients to a CSV or Parquet file
+
+    Rows are sampled and written one chunk at a time, so memory stays flat
+    however many rows are written. With ``workers > 1`` chunks are generated
+    into part files by a process pool and appended in order as they finish.
+    Returns the number of rows written.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    id_width = max(6, len(str(n_rows)))
+    starts = range(0, n_rows, chunk_size)
+    writer = _OutputWriter(output_path)
+
+    try:
+        if workers <= 1:
+            for start in starts:
+                writer.write_chunk(generate_chunk(start, min(chunk_size, n_rows - start), seed, distributions, id_width))
+            return n_rows
+
+        suffix = '.parquet' if writer.parquet else '.csv'
+        parts_dir = f"{output_path}.parts"
+        os.makedirs(parts_dir, exist_ok=True)
+        # Bound the chunks in flight so finished-but-unwritten parts do not pile up
+        max_in_flight = workers * 2
+        pending = {}
+        next_start = iter(starts)
+        expected = 0
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            def submit():
+                start = next(next_start, None)
+                if start is not None:
+                    part_path = os.path.join(parts_dir, f"part-{start // chunk_size:06d}{suffix}")
+                    pending[start] = executor.submit(_write_part, part_path, start, min(chunk_size, n_rows - start),
+                                                     seed, distributions, id_width)
+
+            for _ in range(max_in_flight):
+                submit()
+            while expected < n_rows:
+                # Parts are appended in order so the output matches a single-process run
+                pending.pop(expected).result()
+                writer.append_part(os.path.join(parts_dir, f"part-{expected // chunk_size:06d}{suffix}"))
+                expected += chunk_size
+                submit()
+
+        shutil.rmtree(parts_dir, ignore_errors=True)
+        return n_rows
+    finally:
+        writer.close()
+
+
+def main(argv: Optional[List[str]] = None):
+    """Command line entry point for generating load-test patient files"""
+    parser = argparse.ArgumentParser(description="Generate synthetic patients for load testing")
+    parser.add_argument("rows", type=int, help="Number of patients to generate")
+    parser.add_argument("-o", "--output", default=os.path.join(Config.DATA_DIR, "load_test_patients.parquet"),
+                        help="CSV or Parquet output file")
+    parser.add_argument("--chunk-size", type=int, default=Config.SYNTHETIC_CHUNK_SIZE, help="Rows per chunk")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for reproducible output")
+    parser.add_argument("-w", "--workers", type=int, default=1, help="Number of worker processes")
+    args = parser.parse_args(argv)
+
+    start = datetime.now()
+    generate_patients(args.output, args.rows, chunk_size=args.chunk_size, seed=args.seed, workers=args.workers)
+    elapsed = (datetime.now() - start).total_seconds()
+    print(f"Generated {args.rows} synthetic patient records in {elapsed:.1f}s ({args.output})")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,10 +2,17 @@
 
 import re
 import json
-from typing import Dict, List, Any, Optional
+from bisect import bisect_right
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import accumulate, islice
+from typing import Dict, List, Any, IO, Iterable, Iterator, Optional, Tuple, Union
 from datetime import datetime
+import numpy as np
 import pandas as pd
 
+from utils.patient_fields import parse_previous_treatments
+
 class MedicalTextProcessor:
     """Lightweight text processing for medical documents and data"""
     
@@ -48,6 +55,47 @@ class MedicalTextProcessor:
         
         # Drug name patterns (common prefixes/suffixes)
         self.drug_suffixes = ['mab', 'nib', 'tide', 'pril', 'sartan', 'olol', 'pine', 'statin']
+        
+        self.date_patterns = [
+            r'\b\d{1,2}/\d{1,2}/\d{4}\b',  # MM/DD/YYYY
+            r'\b\d{1,2}-\d{1,2}-\d{4}\b',  # MM-DD-YYYY
+            r'\b\d{4}-\d{1,2}-\d{1,2}\b',  # YYYY-MM-DD
+            r'\b(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\s+\d{1,2},?\s+\d{4}\b'  # Month DD, YYYY
+        ]
+        
+        self.allergy_keywords = ['allergic to', 'allergy', 'allergies', 'adverse reaction', 'nkda', 'no known drug allergies']
+        
+        self._compile_patterns()
+    
+    def _compile_patterns(self):
+        """Compile every pattern once so each document is scanned a fixed number of times"""
+        self._whitespace_re = re.compile(r'\s+')
+        # One alternation for all abbreviations (longest first) instead of one pass per abbreviation
+        abbreviations = sorted(self.medical_abbreviations, key=len, reverse=True)
+        self._abbreviation_re = re.compile(
+            r'\b(?:' + '|'.join(re.escape(abbrev) for abbrev in abbreviations) + r')\b', re.IGNORECASE
+        )
+        self._expansions = {abbrev.upper(): expansion for abbrev, expansion in self.medical_abbreviations.items()}
+        self._abbreviations_lower = frozenset(abbrev.lower() for abbrev in self.medical_abbreviations)
+        
+        # Field patterns run over the whole text; sentences hold no '.', so a
+        # decimal dosage never matched within one and is left out here
+        self._field_res: Tuple[Tuple[str, Any], ...] = tuple(
+            (field, re.compile(pattern.replace(r'(?:\.\d+)?', ''), re.IGNORECASE))
+            for field, pattern in self.medication_patterns.items()
+        )
+        
+        # A whitespace/period-delimited word whose word characters end with a drug suffix
+        non_word = r'[^\w\s.]*'
+        suffixes = '|'.join(non_word.join(re.escape(c) for c in suffix) for suffix in self.drug_suffixes)
+        self._drug_word_re = re.compile(
+            r'(?<![^\s.])[^\s.]*?(?:' + suffixes + r')' + non_word + r'(?![^\s.])', re.IGNORECASE
+        )
+        
+        self._icd_re = re.compile(self.icd_pattern, re.IGNORECASE)
+        self._date_res = [re.compile(pattern, re.IGNORECASE) for pattern in self.date_patterns]
+        self._allergy_keyword_re = re.compile('|'.join(re.escape(keyword) for keyword in self.allergy_keywords))
+        self._allergy_keywords = frozenset(self.allergy_keywords)
     
     def clean_text(self, text: str) -> str:
         """Clean and normalize medical text"""
@@ -55,86 +103,78 @@ class MedicalTextProcessor:
             return ""
         
         # Remove extra whitespace
-        text = re.sub(r'\s+', ' ', text.strip())
-        
-        # Normalize common medical abbreviations
-        for abbrev, expansion in self.medical_abbreviations.items():
-            text = re.sub(rf'\b{abbrev}\b', expansion, text, flags=re.IGNORECASE)
+        text = self._whitespace_re.sub(' ', text.strip())
         
-        return text
+        # Normalize common medical abbreviations in a single pass
+        return self._abbreviation_re.sub(lambda m: self._expansions[m.group().upper()], text)
+    
+    def _first_match_per_sentence(self, pattern, text: str, sentence_starts: List[int]) -> Dict[int, Any]:
+        """First match of ``pattern`` in each sentence, keyed by sentence index"""
+        first = {}
+        match = pattern.search(text)
+        while match:
+            index = bisect_right(sentence_starts, match.start()) - 1
+            first[index] = match
+            # Later matches in the same sentence are never used: resume at the next sentence
+            if index + 1 >= len(sentence_starts):
+                break
+            match = pattern.search(text, sentence_starts[index + 1])
+        return first
     
     def extract_medications(self, text: str) -> List[Dict[str, Any]]:
         """Extract medication information from text"""
         medications = []
         
-        # Simple medication extraction based on patterns
+        # Simple medication extraction based on patterns, one scan of the text per pattern
         sentences = text.split('.')
+        sentence_starts = [0] + list(accumulate(len(sentence) + 1 for sentence in sentences))[:-1]
         
-        for sentence in sentences:
-            sentence = sentence.strip()
-            if not sentence:
-                continue
-            
-            # Look for medication patterns
-            dosage_match = re.search(self.medication_patterns['dosage'], sentence, re.IGNORECASE)
-            frequency_match = re.search(self.medication_patterns['frequency'], sentence, re.IGNORECASE)
-            route_match = re.search(self.medication_patterns['route'], sentence, re.IGNORECASE)
-            duration_match = re.search(self.medication_patterns['duration'], sentence, re.IGNORECASE)
-            
-            # Extract potential drug names (words ending with common drug suffixes)
-            drug_candidates = []
-            words = sentence.split()
-            for word in words:
-                word_clean = re.sub(r'[^\w]', '', word.lower())
-                if any(word_clean.endswith(suffix) for suffix in self.drug_suffixes):
-                    drug_candidates.append(word.title())
-            
-            if dosage_match or frequency_match or drug_candidates:
-                medication = {
-                    'raw_text': sentence,
-                    'drug_name': drug_candidates[0] if drug_candidates else 'Unknown',
-                    'dosage': dosage_match.group() if dosage_match else '',
-                    'frequency': frequency_match.group() if frequency_match else '',
-                    'route': route_match.group() if route_match else '',
-                    'duration': duration_match.group() if duration_match else ''
-                }
-                medications.append(medication)
+        fields = {
+            field: self._first_match_per_sentence(pattern, text, sentence_starts)
+            for field, pattern in self._field_res
+        }
+        # Potential drug names (words ending with common drug suffixes)
+        drug_words = self._first_match_per_sentence(self._drug_word_re, text, sentence_starts)
+        
+        candidates = sorted(set(fields['dosage']) | set(fields['frequency']) | set(drug_words))
+        for index in candidates:
+            matches = {field: found.get(index) for field, found in fields.items()}
+            drug_word = drug_words.get(index)
+            medications.append({
+                'raw_text': sentences[index].strip(),
+                'drug_name': drug_word.group().title() if drug_word else 'Unknown',
+                'dosage': matches['dosage'].group() if matches['dosage'] else '',
+                'frequency': matches['frequency'].group() if matches['frequency'] else '',
+                'route': matches['route'].group() if matches['route'] else '',
+                'duration': matches['duration'].group() if matches['duration'] else ''
+            })
         
         return medications
     
     def extract_icd_codes(self, text: str) -> List[str]:
         """Extract ICD-10 codes from text"""
-        icd_codes = re.findall(self.icd_pattern, text, re.IGNORECASE)
+        icd_codes = self._icd_re.findall(text)
         return list(set(icd_codes))  # Remove duplicates
     
     def extract_dates(self, text: str) -> List[str]:
         """Extract dates from text"""
-        date_patterns = [
-            r'\b\d{1,2}/\d{1,2}/\d{4}\b',  # MM/DD/YYYY
-            r'\b\d{1,2}-\d{1,2}-\d{4}\b',  # MM-DD-YYYY
-            r'\b\d{4}-\d{1,2}-\d{1,2}\b',  # YYYY-MM-DD
-            r'\b(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\s+\d{1,2},?\s+\d{4}\b'  # Month DD, YYYY
-        ]
-        
         dates = []
-        for pattern in date_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            dates.extend(matches)
+        for pattern in self._date_res:
+            dates.extend(pattern.findall(text))
         
         return dates
     
     def extract_allergies(self, text: str) -> List[str]:
         """Extract allergy information from text"""
-        allergy_keywords = ['allergic to', 'allergy', 'allergies', 'adverse reaction', 'nkda', 'no known drug allergies']
         allergies = []
         
         sentences = text.lower().split('.')
         for sentence in sentences:
-            if any(keyword in sentence for keyword in allergy_keywords):
+            if self._allergy_keyword_re.search(sentence):
                 # Extract potential allergens (capitalize first letter of each word)
                 words = sentence.split()
                 for i, word in enumerate(words):
-                    if word in allergy_keywords and i < len(words) - 1:
+                    if word in self._allergy_keywords and i < len(words) - 1:
                         potential_allergen = words[i + 1].strip(',')
                         if potential_allergen not in ['to', 'the', 'a', 'an']:
                             allergies.append(potential_allergen.title())
@@ -153,10 +193,10 @@ class MedicalTextProcessor:
             'word_count': len(words),
             'sentence_count': len(sentences),
             'avg_words_per_sentence': len(words) / max(len(sentences), 1),
-            'medical_terms_count': sum(1 for word in words if word.lower() in [abbrev.lower() for abbrev in self.medical_abbreviations.keys()])
+            'medical_terms_count': sum(1 for word in words if word.lower() in self._abbreviations_lower)
         }
     
-    def parse_pa_document(self, document_text: str) -> Dict[str, Any]:
+    def parse_pa_document(self, document_text: str, include_text: bool = True) -> Dict[str, Any]:
         """Parse a prior authorization document and extract structured information"""
         
         # Clean the text
@@ -169,7 +209,7 @@ class MedicalTextProcessor:
         allergies = self.extract_allergies(clean_text)
         complexity = self.calculate_text_complexity(clean_text)
         
-        return {
+        result = {
             'original_text': document_text,
             'cleaned_text': clean_text,
             'extracted_medications': medications,
@@ -179,6 +219,193 @@ class MedicalTextProcessor:
             'text_complexity': complexity,
             'processing_timestamp': datetime.now().isoformat()
         }
+        if not include_text:
+            del result['original_text'], result['cleaned_text']
+        return result
+    
+    @staticmethod
+    def iter_sentence_chunks(stream: IO[str], block_size: int = 65536) -> Iterator[str]:
+        """Read a text stream incrementally and yield chunks that end on a sentence boundary
+        
+        A boundary is a '.' followed by whitespace, so decimals and ICD codes
+        such as "E11.9" are never split. Text with no boundary for several
+        blocks is cut at whitespace to keep the buffer bounded.
+        """
+        carry = ''
+        while True:
+            block = stream.read(block_size)
+            if not block:
+                break
+            buffer = carry + block
+            cut = max(buffer.rfind('.' + ws) for ws in ' \n\t\r')
+            if cut < 0 and len(buffer) > 4 * block_size:
+                cut = max(buffer.rfind(ws) for ws in ' \n\t\r') - 1
+            if cut < 0:
+                carry = buffer
+                continue
+            yield buffer[:cut + 1]
+            carry = buffer[cut + 1:]
+        if carry:
+            yield carry
+    
+    def stream_pa_document(self, source: Union[str, IO[str]],
+                           block_size: int = 65536) -> Iterator[Tuple[str, Any]]:
+        """Parse a document incrementally, yielding ``(kind, value)`` events as they are found
+        
+        ``source`` is a file path or an open text stream. Kinds are
+        'medication', 'icd_code', 'date' and 'allergy' (codes and allergies
+        are reported once), plus one 'chunk' event per chunk carrying its
+        cleaned text and word/sentence/term counts. Only one chunk is held
+        in memory at a time. Events come chunk by chunk, so 'date' events are
+        in document order per chunk rather than grouped by date pattern as in
+        ``extract_dates``; ``parse_pa_stream`` regroups them.
+        """
+        for kind, value in self._stream_events(source, block_size):
+            yield kind, value[1] if kind == 'date' else value
+    
+    def _stream_events(self, source: Union[str, IO[str]], block_size: int) -> Iterator[Tuple[str, Any]]:
+        """stream_pa_document events, with each date as (date pattern index, date)"""
+        if isinstance(source, str):
+            with open(source, 'r', encoding='utf-8', errors='replace') as stream:
+                yield from self._stream_events(stream, block_size)
+            return
+        
+        seen_codes = set()
+        seen_allergies = set()
+        for raw_chunk in self.iter_sentence_chunks(source, block_size):
+            chunk = self.clean_text(raw_chunk)
+            for medication in self.extract_medications(chunk):
+                yield 'medication', medication
+            for code in self.extract_icd_codes(chunk):
+                if code not in seen_codes:
+                    seen_codes.add(code)
+                    yield 'icd_code', code
+            for index, pattern in enumerate(self._date_res):
+                for date in pattern.findall(chunk):
+                    yield 'date', (index, date)
+            for allergy in self.extract_allergies(chunk):
+                if allergy not in seen_allergies:
+                    seen_allergies.add(allergy)
+                    yield 'allergy', allergy
+            words = chunk.split()
+            yield 'chunk', {
+                'raw_text': raw_chunk,
+                'cleaned_text': chunk,
+                'word_count': len(words),
+                'period_count': chunk.count('.'),
+                'medical_terms_count': sum(1 for word in words if word.lower() in self._abbreviations_lower)
+            }
+    
+    def parse_pa_stream(self, source: Union[str, IO[str]], include_text: bool = False,
+                        block_size: int = 65536) -> Dict[str, Any]:
+        """Streaming ``parse_pa_document`` for very large documents
+        
+        Returns the same structure, built chunk by chunk. Without
+        ``include_text`` the raw and cleaned text are left out, so peak memory
+        is bounded by the chunk size rather than the document size.
+        """
+        result = {
+            'extracted_medications': [],
+            'icd_codes': [],
+            'dates': [],
+            'allergies': []
+        }
+        # Dates per pattern, concatenated at the end in extract_dates order
+        dates_by_pattern = [[] for _ in self._date_res]
+        raw_parts, clean_parts = [], []
+        word_count = period_count = terms_count = 0
+        
+        for kind, value in self._stream_events(source, block_size):
+            if kind == 'medication':
+                result['extracted_medications'].append(value)
+            elif kind == 'icd_code':
+                result['icd_codes'].append(value)
+            elif kind == 'date':
+                dates_by_pattern[value[0]].append(value[1])
+            elif kind == 'allergy':
+                result['allergies'].append(value)
+            elif kind == 'chunk':
+                word_count += value['word_count']
+                period_count += value['period_count']
+                terms_count += value['medical_terms_count']
+                if include_text:
+                    raw_parts.append(value['raw_text'])
+                    clean_parts.append(value['cleaned_text'])
+        
+        result['dates'] = [date for dates in dates_by_pattern for date in dates]
+        if word_count:
+            sentence_count = period_count + 1
+            result['text_complexity'] = {
+                'word_count': word_count,
+                'sentence_count': sentence_count,
+                'avg_words_per_sentence': word_count / sentence_count,
+                'medical_terms_count': terms_count
+            }
+        else:
+            result['text_complexity'] = self.calculate_text_complexity('')
+        if include_text:
+            result = {'original_text': ''.join(raw_parts), 'cleaned_text': ' '.join(clean_parts), **result}
+        result['processing_timestamp'] = datetime.now().isoformat()
+        return result
+    
+    def _parse_or_error(self, document_text: str) -> Dict[str, Any]:
+        """parse_pa_document that reports a failure instead of raising"""
+        try:
+            return self.parse_pa_document(document_text)
+        except Exception as e:
+            return {
+                'original_text': document_text,
+                'error': f"{type(e).__name__}: {e}",
+                'processing_timestamp': datetime.now().isoformat()
+            }
+    
+    def parse_pa_documents(self, documents: Iterable[str], workers: int = 1,
+                           chunk_size: int = 32) -> Iterator[Dict[str, Any]]:
+        """Parse many documents, yielding one result per document in input order
+        
+        With ``workers > 1`` chunks of documents are parsed by a process pool.
+        Each worker receives this processor once at start-up, and results come
+        back without ``original_text`` (it is re-attached from the input), so
+        no document crosses the process boundary twice. Only a bounded window
+        of chunks is in flight. A document that fails to parse yields a result
+        with an ``error`` key and does not stop the batch.
+        """
+        if workers <= 1:
+            for document_text in documents:
+                yield self._parse_or_error(document_text)
+            return
+        
+        documents = iter(documents)
+        max_in_flight = workers * 2
+        pending = deque()
+        
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_parse_worker, initargs=(self,)) as executor:
+            def submit() -> bool:
+                chunk = list(islice(documents, chunk_size))
+                if not chunk:
+                    return False
+                try:
+                    future = executor.submit(_parse_chunk, chunk)
+                except Exception:  # the pool is broken; the chunk is parsed here instead
+                    future = None
+                pending.append((chunk, future))
+                return True
+            
+            while len(pending) < max_in_flight and submit():
+                pass
+            while pending:
+                chunk, future = pending.popleft()
+                try:
+                    results = future.result() if future is not None else None
+                except Exception:
+                    results = None
+                if results is None:
+                    # The worker itself died: parse the chunk here so the batch still completes
+                    results = [self._parse_or_error(document_text) for document_text in chunk]
+                submit()
+                for document_text, result in zip(chunk, results):
+                    result['original_text'] = document_text
+                    yield result
     
     def format_pa_summary(self, parsed_data: Dict[str, Any]) -> str:
         """Format parsed PA data into a readable summary"""
@@ -216,6 +443,27 @@ class MedicalTextProcessor:
         
         return "\n".join(summary_parts) if summary_parts else "No structured information could be extracted from the document."
 
+_worker_processor: Optional[MedicalTextProcessor] = None
+
+def _init_parse_worker(processor: MedicalTextProcessor):
+    """Keep the parent's processor (and its compiled patterns) in each worker process"""
+    global _worker_processor
+    _worker_processor = processor
+
+def _parse_chunk(chunk: List[str]) -> List[Dict[str, Any]]:
+    """Parse a chunk in a worker; the caller already holds the original text"""
+    results = [_worker_processor._parse_or_error(document_text) for document_text in chunk]
+    for result in results:
+        result.pop('original_text', None)
+    return results
+
+def _is_empty(value: Any) -> bool:
+    """Falsy, or an empty list/array (arrays have no truth value)"""
+    if hasattr(value, '__len__') and not isinstance(value, str):
+        return len(value) == 0
+    return not value
+
+
 class PARequestValidator:
     """Validate prior authorization request data"""
     
@@ -228,6 +476,18 @@ class PARequestValidator:
             'age', 'gender', 'dosage', 'duration', 'previous_treatments',
             'allergies', 'insurance_tier', 'urgency'
         ]
+        
+        self.valid_genders = ['M', 'F', 'Male', 'Female', 'Other']
+        
+        # One bit per issue for validate_batch
+        self.issue_bits: Dict[str, int] = {}
+        for field in self.required_fields:
+            self.issue_bits[f'missing_required:{field}'] = 1 << len(self.issue_bits)
+        for field in self.optional_fields:
+            self.issue_bits[f'missing_optional:{field}'] = 1 << len(self.issue_bits)
+        for issue in ('Age seems unrealistic', 'Age is not a valid number', 'Gender field has unexpected value'):
+            self.issue_bits[issue] = 1 << len(self.issue_bits)
+        self.required_mask = sum(self.issue_bits[f'missing_required:{field}'] for field in self.required_fields)
     
     def validate_pa_request(self, pa_data: Dict[str, Any]) -> Dict[str, Any]:
         """Validate PA request data and return validation results"""
@@ -242,13 +502,13 @@ class PARequestValidator:
         
         # Check required fields
         for field in self.required_fields:
-            if field not in pa_data or not pa_data[field]:
+            if field not in pa_data or _is_empty(pa_data[field]):
                 validation_results['missing_required_fields'].append(field)
                 validation_results['is_valid'] = False
         
         # Check optional fields
         for field in self.optional_fields:
-            if field not in pa_data or not pa_data[field]:
+            if field not in pa_data or _is_empty(pa_data[field]):
                 validation_results['missing_optional_fields'].append(field)
         
         # Data quality checks
@@ -260,7 +520,7 @@ class PARequestValidator:
             except (ValueError, TypeError):
                 validation_results['data_quality_issues'].append("Age is not a valid number")
         
-        if 'gender' in pa_data and pa_data['gender'] not in ['M', 'F', 'Male', 'Female', 'Other']:
+        if 'gender' in pa_data and pa_data['gender'] not in self.valid_genders:
             validation_results['data_quality_issues'].append("Gender field has unexpected value")
         
         # Generate recommendations
@@ -275,6 +535,100 @@ class PARequestValidator:
         
         return validation_results
 
+    @staticmethod
+    def _missing(df: pd.DataFrame, field: str) -> np.ndarray:
+        """Vectorized "field not in pa_data or not pa_data[field]" for one column"""
+        if field not in df.columns:
+            return np.ones(len(df), dtype=bool)
+        column = df[field]
+        missing = column.isna().to_numpy().copy()
+        if pd.api.types.is_numeric_dtype(column) or pd.api.types.is_bool_dtype(column):
+            return missing | (column == 0).to_numpy()
+        missing |= (column.astype(str) == '').to_numpy()
+        if field == 'previous_treatments':
+            # Empty once parsed the way row_to_patient does ("[]" text or an empty Parquet array)
+            missing |= column.map(lambda value: not parse_previous_treatments(value)).to_numpy(dtype=bool)
+        return missing
+    
+    def validate_batch(self, df: pd.DataFrame) -> Dict[str, Any]:
+        """Validate every row of a patient table with column operations
+        
+        Gives each row the same result as ``validate_pa_request`` on
+        ``row_to_patient(row)``, the dict the workflow receives: missing
+        cells count as absent fields and previous_treatments is missing when
+        it parses to an empty list. Read patient CSVs with
+        PATIENT_CSV_OPTIONS so text such as allergies "None" is not turned
+        into a missing cell. Returns ``issues``, one bitmask per row using
+        ``issue_bits``, ``is_valid`` (no required field missing) to filter the
+        table before it reaches the workflow, and a ``summary`` of issue counts.
+        """
+        issues = np.zeros(len(df), dtype=np.uint16)
+        for field in self.required_fields:
+            issues |= self._missing(df, field) * np.uint16(self.issue_bits[f'missing_required:{field}'])
+        for field in self.optional_fields:
+            issues |= self._missing(df, field) * np.uint16(self.issue_bits[f'missing_optional:{field}'])
+        
+        # Data quality checks
+        if 'age' in df.columns:
+            age = df['age']
+            present = age.notna().to_numpy()
+            if pd.api.types.is_numeric_dtype(age):
+                values = age.astype(float).to_numpy()
+                invalid = present & ~np.isfinite(values)
+            else:
+                # int() only accepts integer literals from strings
+                text = age.astype(str).str.strip()
+                is_int = text.str.fullmatch(r'[+-]?\d+').fillna(False).to_numpy(dtype=bool)
+                invalid = present & ~is_int
+                values = pd.to_numeric(text.where(is_int), errors='coerce').to_numpy(dtype=float)
+            with np.errstate(invalid='ignore'):
+                ages = np.trunc(values)
+                unrealistic = present & ~invalid & ((ages < 0) | (ages > 120))
+            issues |= unrealistic * np.uint16(self.issue_bits['Age seems unrealistic'])
+            issues |= invalid * np.uint16(self.issue_bits['Age is not a valid number'])
+        
+        if 'gender' in df.columns:
+            gender = df['gender']
+            unexpected = gender.notna().to_numpy() & ~gender.isin(self.valid_genders).to_numpy()
+            issues |= unexpected * np.uint16(self.issue_bits['Gender field has unexpected value'])
+        
+        is_valid = (issues & self.required_mask) == 0
+        counts = {
+            name: int(np.count_nonzero(issues & bit))
+            for name, bit in self.issue_bits.items()
+        }
+        summary = {
+            'total_rows': len(df),
+            'valid_rows': int(is_valid.sum()),
+            'invalid_rows': int((~is_valid).sum()),
+            'issue_counts': {name: count for name, count in counts.items() if count}
+        }
+        return {'issues': issues, 'is_valid': is_valid, 'summary': summary}
+    
+    def describe_issues(self, issues: int) -> Dict[str, Any]:
+        """Expand one row's bitmask back into the validate_pa_request result"""
+        validation_results = {
+            'is_valid': not (int(issues) & self.required_mask),
+            'missing_required_fields': [f for f in self.required_fields
+                                        if int(issues) & self.issue_bits[f'missing_required:{f}']],
+            'missing_optional_fields': [f for f in self.optional_fields
+                                        if int(issues) & self.issue_bits[f'missing_optional:{f}']],
+            'data_quality_issues': [name for name, bit in self.issue_bits.items()
+                                    if ':' not in name and int(issues) & bit],
+            'recommendations': []
+        }
+        
+        if validation_results['missing_required_fields']:
+            validation_results['recommendations'].append("Please provide all required fields before processing")
+        
+        if len(validation_results['missing_optional_fields']) > 3:
+            validation_results['recommendations'].append("Consider providing more patient information for better decision accuracy")
+        
+        if validation_results['data_quality_issues']:
+            validation_results['recommendations'].append("Please review and correct data quality issues")
+        
+        return validation_results
+
 # Example usage
 if __name__ == "__main__":
     processor = MedicalTextProcessor()
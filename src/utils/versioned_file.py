@@ -0,0 +1,53 @@
+# src/utils/versioned_file.py
+
+import hashlib
+import os
+import threading
+from typing import Any, Callable, Dict, NamedTuple, Optional
+
+
+class _CacheEntry(NamedTuple):
+    mtime: float
+    digest: str
+    value: Any
+
+
+_cache: Dict[tuple, _CacheEntry] = {}
+_cache_lock = threading.Lock()
+
+
+def load_if_changed(path: str, build: Callable[[bytes, str], Any]) -> Optional[Any]:
+    """Return ``build(raw_bytes, digest)`` for a file, rebuilding only when it changed
+
+    The file's mtime is checked on every call; the file is only re-read and
+    hashed when the mtime moved, and ``build`` only runs again when the
+    content hash differs. The same object is returned while the content is
+    unchanged. Returns None if the file does not exist.
+    """
+    try:
+        mtime = os.stat(path).st_mtime
+    except FileNotFoundError:
+        return None
+
+    key = (path, build)
+    entry = _cache.get(key)
+    if entry is not None and entry.mtime == mtime:
+        return entry.value
+
+    with _cache_lock:
+        entry = _cache.get(key)
+        if entry is not None and entry.mtime == mtime:
+            return entry.value
+
+        with open(path, 'rb') as f:
+            raw = f.read()
+        digest = hashlib.sha256(raw).hexdigest()
+
+        if entry is not None and entry.digest == digest:
+            # Touched but unchanged: keep the built value
+            value = entry.value
+        else:
+            value = build(raw, digest)
+
+        _cache[key] = _CacheEntry(mtime, digest, value)
+        return value